@@ -1,4 +1,7 @@
+from slark.client._middleware import Middleware
+from slark.client._ratelimit import RateLimiter
+from slark.client._retry import RetryPolicy
 from slark.client.lark import AsyncLark
 from slark.event.event_manager import EventManager
 
-__all__ = ["AsyncLark", "EventManager"]
+__all__ = ["AsyncLark", "EventManager", "Middleware", "RateLimiter", "RetryPolicy"]
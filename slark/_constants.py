@@ -8,5 +8,11 @@ DEFAULT_CONNECTION_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_con
 INITIAL_RETRY_DELAY = 0.5
 DEFAULT_RETRY_DELAY = 1.0
 MAX_RETRY_DELAY = 8.0
+# 单次调用（含所有重试）的总时间预算，单位为秒
+DEFAULT_RETRY_BUDGET = 60.0
+# 访问凭证在过期前多少秒开始后台刷新
+DEFAULT_TOKEN_REFRESH_AHEAD = 300.0
+# 元数据缓存中每类条目的最大数量
+DEFAULT_METADATA_CACHE_SIZE = 1024
 DEFAULT_WRITE_ROW_BATCH_SIZE = 4000
 DEFAULT_WRITE_COL_BATCH_SIZE = 90
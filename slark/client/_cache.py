@@ -0,0 +1,172 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from slark._constants import DEFAULT_METADATA_CACHE_SIZE
+from slark.types._common import BaseModel
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    """命中次数"""
+    misses: int = 0
+    """未命中次数（含过期）"""
+    expirations: int = 0
+    """因过期被丢弃的条目数"""
+    evictions: int = 0
+    """因超出容量被淘汰的条目数"""
+    size: int = 0
+    """当前条目数"""
+
+
+class TTLCache(Generic[_K, _V]):
+    """带过期时间的 LRU 缓存，线程安全。
+
+    `ttl` 或 `maxsize` 不大于 0 时缓存关闭，`get` 总是返回 None，`set` 不做任何操作。
+
+    Args:
+        ttl (float): 条目的有效期，单位为秒
+        maxsize (int, optional): 最大条目数，超出时淘汰最久未使用的条目. \
+            Defaults to DEFAULT_METADATA_CACHE_SIZE.
+    """
+
+    def __init__(self, *, ttl: float, maxsize: int = DEFAULT_METADATA_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[_K, Tuple[float, _V]]" = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: _K) -> Union[_V, None]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def set(self, key: _K, value: _V) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats.evictions += 1
+
+    async def get_or_load(self, key: _K, load: Callable[[], Awaitable[_V]]) -> _V:
+        """读取缓存，未命中时调用 load 并写入缓存"""
+        value = self.get(key)
+        if value is None:
+            value = await load()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: _K) -> Union[_V, None]:
+        """丢弃指定条目，返回被丢弃的值"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry is not None else None
+
+    def invalidate_where(self, predicate: Callable[[_K], bool]) -> int:
+        """丢弃所有满足 predicate 的条目，返回丢弃的条目数"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return self._stats.model_copy(update={"size": len(self._data)})
+
+
+class MetadataCache:
+    """客户端级别的元数据缓存，减少每次读写前解析链接、查询表结构的请求。
+
+    - `wiki_nodes`: 知识库节点，键为 (token, obj_type)
+    - `bitable_info`: 多维表格链接解析结果 BitableInfo，键为 url
+    - `sheet_info`: 电子表格链接解析结果 SheetInfo，键为 url
+    - `document_info`: 文档链接解析结果 DocumentInfo，键为 url
+    - `fields`: 数据表字段列表，键为 (app_token, table_id)
+
+    通过本客户端修改字段或写入电子表格时会自动丢弃相关条目，
+    其他途径的修改需要等待条目过期或调用 `invalidate` 显式丢弃。
+
+    Args:
+        ttl (float, optional): 条目的有效期，单位为秒，0 表示不缓存. Defaults to 0.
+        maxsize (int, optional): 每类缓存的最大条目数. Defaults to DEFAULT_METADATA_CACHE_SIZE.
+    """
+
+    def __init__(self, *, ttl: float = 0, maxsize: int = DEFAULT_METADATA_CACHE_SIZE):
+        self.wiki_nodes: TTLCache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.bitable_info: TTLCache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.sheet_info: TTLCache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.document_info: TTLCache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.fields: TTLCache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    @property
+    def _caches(self) -> Dict[str, TTLCache]:
+        return {
+            "wiki_nodes": self.wiki_nodes,
+            "bitable_info": self.bitable_info,
+            "sheet_info": self.sheet_info,
+            "document_info": self.document_info,
+            "fields": self.fields,
+        }
+
+    def invalidate(self, url: str) -> None:
+        """丢弃与分享链接相关的所有条目"""
+        info = self.bitable_info.invalidate(url)
+        if info is not None:
+            self.invalidate_fields(info.app_token, info.table_id)
+        self.sheet_info.invalidate(url)
+        self.document_info.invalidate(url)
+        tokens: List[str] = re.findall(r"\/(?:wiki|base|sheets|docx)\/([^\/\?]+)", url)
+        for token in tokens:
+            self.wiki_nodes.invalidate_where(lambda key: key[0] == token)
+            self.fields.invalidate_where(lambda key: key[0] == token)
+
+    def invalidate_fields(self, app_token: str, table_id: str) -> None:
+        self.fields.invalidate((app_token, table_id))
+
+    def clear(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    def stats(self) -> Dict[str, CacheStats]:
+        return {name: cache.stats() for name, cache in self._caches.items()}
@@ -1,24 +1,48 @@
+import asyncio
+import concurrent.futures
+import functools
 import inspect
-from typing import TYPE_CHECKING, Dict, Type, TypeVar, Union, cast
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple, Type, TypeVar, Union, cast
 
 import anyio
+import anyio.to_thread
 import httpx
 import pydantic
 from httpx import URL
 from loguru import logger
 
 from slark._constants import (
+    DEFAULT_CONNECTION_LIMITS,
     DEFAULT_MAX_RETRIES,
     DEFAULT_TIMEOUT,
-    INITIAL_RETRY_DELAY,
-    MAX_RETRY_DELAY,
 )
+from slark.client._coalesce import RequestCoalescer
+from slark.client._decode import TIMINGS_EXTENSION, dumps, loads
+from slark.client._loop import LoopLocal
+from slark.client._metrics import MetricsCollector
+from slark.client._middleware import MiddlewareType, compose_middlewares
+from slark.client._ratelimit import RateLimiter
+from slark.client._retry import RetryPolicy, RetryState
 from slark.types._request.request import FinalRequestOptions, RequestOptions
 from slark.types.exceptions import errors as err
 
 if TYPE_CHECKING:
     from slark.types.response import BaseResponse
 
+INVALID_TOKEN_CODES = frozenset(
+    {
+        err.LarkStatusCode.INVALID_ACCESS_TOKEN,
+        err.LarkStatusCode.PASSTIME_ACCESS_TOKEN,
+        err.LarkStatusCode.TENANT_ACCESS_TOKEN_INVALID,
+        err.LarkStatusCode.USER_ACCESS_TOKEN_INVALID,
+        err.LarkStatusCode.ACCESS_TOKEN_EXPIRED,
+    }
+)
+
+# 关闭其他线程中的事件循环的连接池时最多等待的时间，单位为秒
+CLOSE_TIMEOUT = 5.0
+
 ResponseT = TypeVar(
     "ResponseT",
     bound=Union[
@@ -31,8 +55,13 @@ ResponseT = TypeVar(
 
 
 class AsyncAPIClient:
-    _client: httpx.AsyncClient
+    _clients: LoopLocal[httpx.AsyncClient]
     max_retries: int
+    rate_limiter: Union[RateLimiter, None]
+    retry_policy: RetryPolicy
+    coalescer: Union[RequestCoalescer, None]
+    middlewares: List[MiddlewareType]
+    metrics: MetricsCollector
     auth_headers: dict
 
     def __init__(
@@ -42,13 +71,97 @@ class AsyncAPIClient:
         max_retries: int = DEFAULT_MAX_RETRIES,
         timeout: httpx.Timeout = DEFAULT_TIMEOUT,
         proxies: Union[None, httpx._types.ProxyTypes] = None,
+        limits: httpx.Limits = DEFAULT_CONNECTION_LIMITS,
+        http2: bool = False,
+        rate_limiter: Union[RateLimiter, None] = None,
+        retry_policy: Union[RetryPolicy, None] = None,
+        coalesce_requests: bool = False,
+        middlewares: Union[Iterable[MiddlewareType], None] = None,
+        metrics: Union[MetricsCollector, None] = None,
     ):
-        self._client = httpx.AsyncClient(base_url=base_url, timeout=timeout, proxies=proxies)
+        self._base_url = base_url
+        self._timeout = timeout
+        self._proxies = proxies
+        self._limits = limits
+        self._http2 = http2
+        # 连接池绑定在创建它的事件循环上，每个事件循环各自持有一个 httpx.AsyncClient
+        self._clients = LoopLocal(self._make_client)
         self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.coalescer = RequestCoalescer() if coalesce_requests else None
+        self.middlewares = list(middlewares or [])
+        self.metrics = metrics or MetricsCollector()
+
+    def _make_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self._base_url,
+            timeout=self._timeout,
+            proxies=self._proxies,
+            limits=self._limits,
+            http2=self._http2,
+        )
+
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        return self._clients.get()
+
+    async def aclose(self) -> None:
+        """关闭所有事件循环的连接池。
+
+        连接池只能在所属的事件循环中关闭：当前事件循环的连接池直接关闭，
+        其他线程中正在运行的事件循环的连接池提交到所属循环中关闭，最多等待 CLOSE_TIMEOUT 秒，
+        空闲的事件循环在工作线程中运行一次以关闭连接池。已关闭的事件循环和其他异步后端的连接池
+        无法再关闭，只会被丢弃。
+        """
+        current = self._clients.pop()
+        others = list(self._clients.items())
+        self._clients.clear()
+        futures = []
+        for loop, client in others:
+            if loop is None or loop.is_closed():
+                continue
+            if loop.is_running():
+                futures.append(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+                continue
+            try:
+                await anyio.to_thread.run_sync(loop.run_until_complete, client.aclose())
+            except RuntimeError as e:
+                # 事件循环在此期间被所属线程启动或关闭
+                logger.debug(f"Failed to close client of another event loop: {e}")
+        if futures:
+            await anyio.to_thread.run_sync(
+                functools.partial(concurrent.futures.wait, futures, timeout=CLOSE_TIMEOUT)
+            )
+        if current is not None:
+            await current.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    def add_middleware(self, middleware: MiddlewareType) -> None:
+        """注册中间件，后注册的中间件位于调用链内层"""
+        self.middlewares.append(middleware)
+
+    async def _send(self, options: FinalRequestOptions, request: httpx.Request) -> httpx.Response:
+        send = self._client.send
+        if options.stream:
+            send = functools.partial(send, stream=True)
+        if not self.middlewares:
+            return await send(request)
+        handler = compose_middlewares(self.middlewares, options, send)
+        return await handler(request)
 
     async def get_auth_headers(self) -> dict:
         return {}
 
+    async def invalidate_auth(self, request: httpx.Request) -> None:
+        """服务端返回 token 无效时调用，丢弃 request 使用的 token"""
+        pass
+
     @property
     def default_headers(self) -> dict:
         return {
@@ -58,7 +171,9 @@ class AsyncAPIClient:
     async def _build_headers(self, options: FinalRequestOptions) -> httpx.Headers:
         headers = {**self.default_headers, **options.headers}
         if not options.no_auth:
+            start = time.perf_counter()
             auth_headers = await self.get_auth_headers()
+            self.metrics.observe(options.url, "token_wait", time.perf_counter() - start)
             headers = {**headers, **auth_headers}
         return httpx.Headers(headers)
 
@@ -69,65 +184,154 @@ class AsyncAPIClient:
             headers["Content-Type"] = "application/json; charset=utf-8"
         if options.files is not None or options.data is not None:
             headers["Content-Type"] = "multipart/form-data"
-        # httpx uses connection pooling, uncompatible with asyncio
-        headers["Connection"] = "close"
         kwargs = {}
         if options.timeout is not None:
             kwargs["timeout"] = options.timeout
+        content = options.content
+        if options.json_data is not None:
+            # 紧凑的 UTF-8 JSON，中文不转义为 \uXXXX，与 `payload_size` 的估计一致
+            content = dumps(options.json_data)
         return self._client.build_request(
             method=options.method,
             url=options.url,
             params=options.params,
             headers=headers,
-            json=options.json_data,
             files=options.files,
             data=options.data,
-            content=options.content,
+            content=content,
             **kwargs,
         )
 
-    def _make_status_error_from_response(self, response: httpx.Response) -> err.LarkException:
+    def _make_status_error_from_response(
+        self, response: httpx.Response, body: Any
+    ) -> err.LarkException:
+        """根据已解析的响应体构造异常，body 为 None 表示响应体不是 JSON"""
+        if isinstance(body, dict) and "code" in body:
+            return err.LarkException(code=body["code"], msg=body.get("msg", ""), context=body)
+        if response.is_error:
+            # 网关等返回的非 JSON 错误，如 413 Request Entity Too Large
+            return err.HttpStatusError(
+                response.status_code,
+                response.reason_phrase,
+                context={"response": response.text},
+            )
+        return err.BadResponseError(msg="No code in response", context={"response": response.text})
+
+    @staticmethod
+    def _decode_error_body(response: httpx.Response) -> Any:
+        """解析出错响应的响应体，不是 JSON 时返回 None"""
         try:
-            body = response.json()
-            if "code" not in body:
-                raise ValueError("No code in response")
-        except Exception as e:
-            return err.BadResponseError(msg=str(e), context={"response": response.text})
-        return err.LarkException(code=body["code"], msg=body.get("msg", ""), context=body)
+            return loads(response.content)
+        except ValueError:
+            return None
+
+    def _decode_response(
+        self, cast_to: Type[ResponseT], response: httpx.Response
+    ) -> Tuple[Any, Any]:
+        """解码响应体，每个响应体只解析一次。
+
+        cast_to 为 pydantic 模型时直接从 bytes 校验（model_validate_json），
+        仅在校验失败或错误码非 0 时才解析为 dict 用于错误处理；其余情况使用 orjson（若已安装）解析。
+        解码和校验耗时记录在 `response.extensions[TIMINGS_EXTENSION]` 中。
+
+        Returns:
+            Tuple[Any, Any]: (result, body)，result 为 None 时需要根据 body 处理错误
+        """
+        timings: Dict[str, float] = {}
+        response.extensions[TIMINGS_EXTENSION] = timings
+        is_model = inspect.isclass(cast_to) and issubclass(cast_to, pydantic.BaseModel)
+        if is_model:
+            start = time.perf_counter()
+            try:
+                result = cast_to.model_validate_json(response.content)
+            except pydantic.ValidationError:
+                result = None
+            timings["validate"] = time.perf_counter() - start
+            if result is not None and getattr(result, "code", 0) == 0:
+                logger.debug(f"Validated {response.url.path} in {timings['validate']:.4f} seconds")
+                return result, None
+        start = time.perf_counter()
+        try:
+            body = loads(response.content)
+        except ValueError as e:
+            raise err.BadResponseError(str(e), context={"response": response.text}) from e
+        timings["decode"] = time.perf_counter() - start
+        if not is_model and isinstance(body, dict) and body.get("code") == 0:
+            logger.debug(f"Decoded {response.url.path} in {timings['decode']:.4f} seconds")
+            return body, body
+        return None, body
+
+    def _should_reauthenticate(
+        self, options: FinalRequestOptions, retry_state: RetryState, code: Union[int, None]
+    ) -> bool:
+        return (
+            not options.no_auth and not retry_state.reauthenticated and code in INVALID_TOKEN_CODES
+        )
+
+    async def _reauthenticate_request(
+        self,
+        cast_to: Type[ResponseT],
+        options: FinalRequestOptions,
+        request: httpx.Request,
+        remaining_retries: int,
+        retry_state: RetryState,
+    ) -> ResponseT:
+        logger.info(f"Access token rejected, retrying {options.url} with a new token")
+        retry_state.reauthenticated = True
+        await self.invalidate_auth(request)
+        return await self._request(
+            cast_to=cast_to,
+            options=options,
+            remaining_retries=remaining_retries,
+            retry_state=retry_state,
+        )
+
+    def _retry_delay(
+        self,
+        options: FinalRequestOptions,
+        remaining_retries: int,
+        retry_state: RetryState,
+        response: Union[httpx.Response, None] = None,
+        code: Union[int, None] = None,
+    ) -> Union[float, None]:
+        """返回下一次重试前的等待时间，不应重试时返回 None"""
+        if remaining_retries <= 0:
+            return None
+        policy = options.retry_policy or self.retry_policy
+        if response is not None and not policy.is_retryable(response, code):
+            return None
+        return policy.next_delay(retry_state, response)
 
     async def _retry_request(
         self,
         cast_to: Type[ResponseT],
         options: FinalRequestOptions,
         remaining_retries: int,
+        retry_state: RetryState,
+        delay: float,
     ) -> ResponseT:
         remaining = remaining_retries - 1
         if remaining == 1:
             logger.debug("1 retry left")
         else:
             logger.debug(f"{remaining} retries left")
-        max_retries = options.get_max_retries(self.max_retries)
-        retry_timeout = min(INITIAL_RETRY_DELAY * 2 ** (max_retries - remaining), MAX_RETRY_DELAY)
-        logger.info(f"Retrying {options.url} in {retry_timeout} seconds")
-        await anyio.sleep(retry_timeout)
+        logger.info(f"Retrying {options.url} in {delay:.2f} seconds")
+        self.metrics.record_retry(options.url)
+        await anyio.sleep(delay)
 
         return await self._request(
             cast_to=cast_to,
             options=options,
             remaining_retries=remaining,
+            retry_state=retry_state,
         )
 
-    def _should_retry(self, response: httpx.Response) -> bool:
-        logger.debug(f"Server error {response.status_code}")
-        if response.status_code >= 500:
-            return True
-        return False
-
     async def _request(
         self,
         cast_to: Type[ResponseT],
         options: FinalRequestOptions,
         remaining_retries: Union[None, int] = None,
+        retry_state: Union[RetryState, None] = None,
     ) -> ResponseT:
         request = await self._build_request(options)
         retries = (
@@ -135,38 +339,77 @@ class AsyncAPIClient:
             if remaining_retries is not None
             else options.get_max_retries(self.max_retries)
         )
+        retry_state = retry_state or RetryState()
 
+        if self.rate_limiter is not None:
+            waited = await self.rate_limiter.acquire(options.url)
+            self.metrics.observe(options.url, "queue_wait", waited)
+        self.metrics.record_request(options.url, _content_length(request))
+        start = time.perf_counter()
         try:
-            response = await self._client.send(request)
+            response = await self._send(options, request)
         except httpx.TimeoutException as e:
             logger.debug(f"Request timed out: {e}")
-            if retries > 0:
-                return await self._retry_request(cast_to, options, retries)
+            self.metrics.record_error(options.url, "timeout")
+            delay = self._retry_delay(options, retries, retry_state)
+            if delay is not None:
+                return await self._retry_request(cast_to, options, retries, retry_state, delay)
             raise err.APITimeoutError(context={"request": request}) from e
         except Exception as e:
             logger.debug(f"Request failed: {e}")
-            if retries > 0:
-                return await self._retry_request(cast_to, options, retries)
+            self.metrics.record_error(options.url, "connection")
+            delay = self._retry_delay(options, retries, retry_state)
+            if delay is not None:
+                return await self._retry_request(cast_to, options, retries, retry_state, delay)
             raise err.APIConnectionError(context={"request": request}) from e
+        self.metrics.observe(options.url, "network", time.perf_counter() - start)
+        self.metrics.record_response(options.url, _content_length(response))
 
+        if options.stream and response.is_error:
+            # 流式响应出错时读取响应体用于错误处理
+            await response.aread()
         try:
             response.raise_for_status()
         except httpx.HTTPStatusError as e:
             logger.debug(f"Request failed: {e}")
-            if retries > 0 and self._should_retry(response):
-                return await self._retry_request(cast_to, options, retries)
-            raise self._make_status_error_from_response(e.response) from e
-        if options.raw_response:
+            body = self._decode_error_body(response)
+            code = body.get("code") if isinstance(body, dict) else None
+            self.metrics.record_error(
+                options.url, code if code is not None else response.status_code
+            )
+            if self._should_reauthenticate(options, retry_state, code):
+                return await self._reauthenticate_request(
+                    cast_to, options, request, retries, retry_state
+                )
+            delay = self._retry_delay(options, retries, retry_state, response, code)
+            if delay is not None:
+                return await self._retry_request(cast_to, options, retries, retry_state, delay)
+            raise self._make_status_error_from_response(response, body) from e
+        if options.raw_response or options.stream:
             return cast(ResponseT, response)
-        if response.json()["code"] != 0:
-            raise self._make_status_error_from_response(response)
+        result, body = self._decode_response(cast_to, response)
+        for phase, seconds in response.extensions[TIMINGS_EXTENSION].items():
+            self.metrics.observe(options.url, phase, seconds)
+        if result is not None:
+            return cast(ResponseT, result)
+        code = body.get("code") if isinstance(body, dict) else None
+        if code != 0:
+            self.metrics.record_error(options.url, code)
+            if self._should_reauthenticate(options, retry_state, code):
+                return await self._reauthenticate_request(
+                    cast_to, options, request, retries, retry_state
+                )
+            delay = self._retry_delay(options, retries, retry_state, response, code)
+            if delay is not None:
+                return await self._retry_request(cast_to, options, retries, retry_state, delay)
+            raise self._make_status_error_from_response(response, body)
         try:
-            if inspect.isclass(cast_to) and issubclass(cast_to, pydantic.BaseModel):
-                return cast(ResponseT, cast_to.model_validate(response.json()))
-            return cast(ResponseT, response.json())
+            # 只有从 bytes 校验失败时才会走到这里，重新校验以得到具体的错误信息
+            return cast(ResponseT, cast_to.model_validate(body))
         except Exception as e:
-            logger.error(f"Encountered Bad Response: {response.json()}")
-            raise err.BadResponseError(str(e), context={"response": response.json()})
+            logger.error(f"Encountered Bad Response: {response.text}")
+            self.metrics.record_error(options.url, "bad_response")
+            raise err.BadResponseError(str(e), context={"response": body})
 
     async def request(
         self,
@@ -174,7 +417,25 @@ class AsyncAPIClient:
         options: FinalRequestOptions,
         remaining_retries: Union[int, None] = None,
     ):
-        return await self._request(cast_to, options, remaining_retries)
+        key = self._coalesce_key(cast_to, options)
+        if key is None:
+            return await self._request(cast_to, options, remaining_retries)
+        return await self.coalescer.run(
+            key, lambda: self._request(cast_to, options, remaining_retries)
+        )
+
+    def _coalesce_key(self, cast_to: Type[ResponseT], options: FinalRequestOptions):
+        """返回用于合并请求的键，不合并时返回 None。
+
+        客户端开启 coalesce_requests 后，默认只合并 GET 请求；
+        幂等的 POST 请求（如查询记录）通过 `coalesce=True` 显式开启。
+        """
+        if self.coalescer is None:
+            return None
+        coalesce = options.coalesce if options.coalesce is not None else options.method == "get"
+        if not coalesce:
+            return None
+        return self.coalescer.make_key(options, cast_to)
 
     async def get(
         self,
@@ -228,3 +489,11 @@ class AsyncAPIClient:
     ) -> ResponseT:
         opts = FinalRequestOptions(method="patch", json_data=body, url=path, **options)
         return await self.request(cast_to, opts)
+
+
+def _content_length(message: Union[httpx.Request, httpx.Response]) -> int:
+    """已读取的消息体字节数，流式消息体返回 0"""
+    try:
+        return len(message.content)
+    except (httpx.RequestNotRead, httpx.ResponseNotRead):
+        return 0
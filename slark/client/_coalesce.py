@@ -0,0 +1,88 @@
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Type, TypeVar, Union
+
+import anyio
+
+from slark.client._loop import LoopLocal
+from slark.types._common import BaseModel
+from slark.types._request.request import FinalRequestOptions
+
+_T = TypeVar("_T")
+
+
+class CoalesceStats(BaseModel):
+    leaders: int = 0
+    """实际发出的请求数"""
+    followers: int = 0
+    """复用进行中请求结果的调用数"""
+
+
+class _InflightCall:
+    def __init__(self):
+        self.event = anyio.Event()
+        self.result: Any = None
+        self.error: Union[BaseException, None] = None
+        self.cancelled = False
+
+
+class RequestCoalescer:
+    """合并并发的相同请求：相同请求进行中时，后来的调用方等待并共享同一个解析结果。
+
+    共享的结果是同一个对象，调用方不应修改返回的模型。
+    """
+
+    def __init__(self):
+        self._inflight: LoopLocal[Dict[Hashable, _InflightCall]] = LoopLocal(dict)
+        self._stats = CoalesceStats()
+
+    @staticmethod
+    def make_key(options: FinalRequestOptions, cast_to: Type) -> Union[Hashable, None]:
+        """生成请求的键，无法合并的请求返回 None"""
+        if (
+            options.raw_response
+            or options.stream
+            or options.files
+            or options.data
+            or options.content
+        ):
+            return None
+        try:
+            payload = json.dumps(
+                [options.params, options.json_data, options.headers],
+                sort_keys=True,
+                default=str,
+            )
+        except (TypeError, ValueError):
+            return None
+        return (options.method, options.url, payload, cast_to)
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[_T]]) -> _T:
+        inflight = self._inflight.get()
+        call = inflight.get(key)
+        if call is not None:
+            self._stats.followers += 1
+            await call.event.wait()
+            if call.cancelled:
+                # 发起请求的调用方被取消，由当前调用方重新发起
+                return await self.run(key, fn)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._stats.leaders += 1
+        call = inflight[key] = _InflightCall()
+        try:
+            call.result = await fn()
+            return call.result
+        except anyio.get_cancelled_exc_class():
+            call.cancelled = True
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            del inflight[key]
+            call.event.set()
+
+    def stats(self) -> CoalesceStats:
+        return self._stats.model_copy()
@@ -0,0 +1,24 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+TIMINGS_EXTENSION = "slark.timings"
+"""httpx.Response.extensions 中记录解码耗时的键，值为 {"decode": 秒, "validate": 秒}"""
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    """解析 JSON，安装了 orjson 时使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(obj: Any) -> bytes:
+    """序列化为 JSON bytes，安装了 orjson 时使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
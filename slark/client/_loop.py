@@ -0,0 +1,70 @@
+import asyncio
+import weakref
+from typing import Callable, Generic, Iterator, Tuple, TypeVar, Union
+
+_T = TypeVar("_T")
+
+
+def current_loop() -> Union[asyncio.AbstractEventLoop, None]:
+    """返回当前正在运行的 asyncio 事件循环，非 asyncio 环境（如 trio）返回 None"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class LoopLocal(Generic[_T]):
+    """按事件循环隔离的对象容器。
+
+    httpx 连接池、锁等异步对象都绑定在创建它们的事件循环上，
+    而 `EventManager` 会在新线程中通过 `asyncio.run` 执行回调，
+    因此每个事件循环需要持有独立的实例。事件循环被回收后对应的实例随之释放。
+    """
+
+    def __init__(self, factory: Callable[[], _T]):
+        self._factory = factory
+        self._values: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _T]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._default: Union[_T, None] = None
+
+    def get(self) -> _T:
+        loop = current_loop()
+        if loop is None:
+            if self._default is None:
+                self._default = self._factory()
+            return self._default
+        value = self._values.get(loop)
+        if value is None:
+            value = self._values[loop] = self._factory()
+        return value
+
+    def peek(self) -> Union[_T, None]:
+        """返回当前事件循环已创建的实例，不存在时不创建"""
+        loop = current_loop()
+        if loop is None:
+            return self._default
+        return self._values.get(loop)
+
+    def pop(self) -> Union[_T, None]:
+        """移除并返回当前事件循环的实例"""
+        loop = current_loop()
+        if loop is None:
+            value, self._default = self._default, None
+            return value
+        return self._values.pop(loop, None)
+
+    def items(self) -> Iterator[Tuple[Union[asyncio.AbstractEventLoop, None], _T]]:
+        """各事件循环及其实例，非 asyncio 环境的实例对应的事件循环为 None"""
+        yield from list(self._values.items())
+        if self._default is not None:
+            yield None, self._default
+
+    def values(self) -> Iterator[_T]:
+        yield from list(self._values.values())
+        if self._default is not None:
+            yield self._default
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._default = None
@@ -0,0 +1,198 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple, Union
+
+from slark.resources.api_path import resolve_api_path
+from slark.types._common import BaseModel
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+"""延迟直方图的桶上界，单位为秒"""
+
+PHASES = ("token_wait", "queue_wait", "network", "decode", "validate")
+"""请求耗时的各个阶段：等待 token、等待限流、网络传输、解析响应体、校验响应模型"""
+
+UNKNOWN_PATH = "unknown"
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """返回 (le, 累计数) 列表，最后一项为 +Inf"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((repr(float(bound)), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class EndpointStats(BaseModel):
+    requests: int = 0
+    """发出的请求数（含重试）"""
+    retries: int = 0
+    """重试次数"""
+    request_bytes: int = 0
+    """请求体字节数"""
+    response_bytes: int = 0
+    """响应体字节数"""
+    errors: Dict[str, int] = {}
+    """按错误码统计的失败次数，网络错误记为 timeout / connection"""
+    latency_sum: Dict[str, float] = {}
+    """各阶段累计耗时，单位为秒"""
+
+
+class _Endpoint:
+    def __init__(self, buckets: Sequence[float]):
+        self.histograms = {phase: Histogram(buckets) for phase in PHASES}
+        self.requests = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+
+
+class MetricsCollector:
+    """按 API_PATH 模板统计请求耗时、重试、流量和错误码，可导出为 Prometheus 文本格式。
+
+    无法匹配 API_PATH 模板的请求归入 `unknown`，避免标签数量随 URL 无限增长。
+
+    Args:
+        buckets (Sequence[float], optional): 延迟直方图的桶上界. Defaults to DEFAULT_LATENCY_BUCKETS.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints: Dict[str, _Endpoint] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_of(url: str) -> str:
+        return resolve_api_path(url) or UNKNOWN_PATH
+
+    def _endpoint(self, url: str) -> _Endpoint:
+        path = self.path_of(url)
+        endpoint = self._endpoints.get(path)
+        if endpoint is None:
+            endpoint = self._endpoints[path] = _Endpoint(self.buckets)
+        return endpoint
+
+    def observe(self, url: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._endpoint(url).histograms[phase].observe(seconds)
+
+    def record_request(self, url: str, request_bytes: int) -> None:
+        with self._lock:
+            endpoint = self._endpoint(url)
+            endpoint.requests += 1
+            endpoint.request_bytes += request_bytes
+
+    def record_response(self, url: str, response_bytes: int) -> None:
+        with self._lock:
+            self._endpoint(url).response_bytes += response_bytes
+
+    def record_retry(self, url: str) -> None:
+        with self._lock:
+            self._endpoint(url).retries += 1
+
+    def record_error(self, url: str, code: Union[int, str, None]) -> None:
+        with self._lock:
+            self._endpoint(url).errors[str(code)] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def stats(self) -> Dict[str, EndpointStats]:
+        with self._lock:
+            return {
+                path: EndpointStats(
+                    requests=endpoint.requests,
+                    retries=endpoint.retries,
+                    request_bytes=endpoint.request_bytes,
+                    response_bytes=endpoint.response_bytes,
+                    errors=dict(endpoint.errors),
+                    latency_sum={
+                        phase: histogram.sum for phase, histogram in endpoint.histograms.items()
+                    },
+                )
+                for path, endpoint in self._endpoints.items()
+            }
+
+    def render_prometheus(self, prefix: str = "slark") -> str:
+        """导出为 Prometheus 文本格式"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_: str) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            header("request_duration_seconds", "histogram", "Request latency by phase.")
+            for path, endpoint in endpoints:
+                for phase, histogram in endpoint.histograms.items():
+                    if histogram.count == 0:
+                        continue
+                    labels = f'path="{_escape(path)}",phase="{phase}"'
+                    for le, count in histogram.cumulative():
+                        lines.append(
+                            f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {count}'
+                        )
+                    lines.append(
+                        f"{prefix}_request_duration_seconds_sum{{{labels}}} {histogram.sum}"
+                    )
+                    lines.append(
+                        f"{prefix}_request_duration_seconds_count{{{labels}}} {histogram.count}"
+                    )
+
+            counters = (
+                ("requests_total", "Requests sent, including retries.", "requests"),
+                ("retries_total", "Retried requests.", "retries"),
+                ("request_bytes_total", "Request body bytes sent.", "request_bytes"),
+                ("response_bytes_total", "Response body bytes received.", "response_bytes"),
+            )
+            for name, help_, attr in counters:
+                header(name, "counter", help_)
+                for path, endpoint in endpoints:
+                    value = getattr(endpoint, attr)
+                    lines.append(f'{prefix}_{name}{{path="{_escape(path)}"}} {value}')
+
+            header("errors_total", "counter", "Failed requests by Lark error code.")
+            for path, endpoint in endpoints:
+                for code, count in sorted(endpoint.errors.items()):
+                    lines.append(
+                        f'{prefix}_errors_total{{path="{_escape(path)}",code="{_escape(code)}"}} '
+                        f"{count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,64 @@
+from typing import Awaitable, Callable, Iterable, Union
+
+import httpx
+
+from slark.types._request.request import FinalRequestOptions
+
+CallNext = Callable[[httpx.Request], Awaitable[httpx.Response]]
+"""调用链中的下一个处理函数，最内层为 httpx.AsyncClient.send"""
+
+
+class Middleware:
+    """请求中间件基类。
+
+    中间件按注册顺序由外到内组成调用链，每次发送请求（包括每次重试）都会经过调用链。
+    中间件可以修改 request 后调用 `call_next`，也可以直接返回一个 httpx.Response 跳过后续处理。
+
+    Example:
+        >>> class LoggingMiddleware(Middleware):
+        ...     async def __call__(self, options, request, call_next):
+        ...         response = await call_next(request)
+        ...         logger.info(f"{request.url} {response.status_code}")
+        ...         return response
+        >>> lark.add_middleware(LoggingMiddleware())
+    """
+
+    async def __call__(
+        self, options: FinalRequestOptions, request: httpx.Request, call_next: CallNext
+    ) -> httpx.Response:
+        return await call_next(request)
+
+
+MiddlewareType = Union[
+    Middleware,
+    Callable[[FinalRequestOptions, httpx.Request, CallNext], Awaitable[httpx.Response]],
+]
+
+
+def compose_middlewares(
+    middlewares: Iterable[MiddlewareType], options: FinalRequestOptions, send: CallNext
+) -> CallNext:
+    """将中间件组合为一个处理函数，先注册的中间件在外层"""
+
+    def wrap(middleware: MiddlewareType, call_next: CallNext) -> CallNext:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            response = await middleware(options, request, call_next)
+            if not _has_request(response):
+                # 中间件直接构造的响应没有关联请求，补上以便后续 raise_for_status 等处理
+                response.request = request
+            return response
+
+        return handler
+
+    handler = send
+    for middleware in reversed(list(middlewares)):
+        handler = wrap(middleware, handler)
+    return handler
+
+
+def _has_request(response: httpx.Response) -> bool:
+    try:
+        response.request
+    except RuntimeError:
+        return False
+    return True
@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Dict, Union
+
+import anyio
+from loguru import logger
+
+from slark.resources.api_path import API_PATH, normalize_api_path, resolve_api_path
+from slark.types._common import BaseModel
+
+DEFAULT_RATE_LIMITS: Dict[str, float] = {
+    # 文档中注明的单应用频率上限，超过时返回 HTTP 400 及错误码 99991400
+    API_PATH.documents.get_raw_content: 5,
+    API_PATH.documents.get_blocks: 5,
+}
+"""按 API_PATH 模板配置的默认频率限制，单位为次/秒"""
+
+
+class TokenBucket:
+    """令牌桶。
+
+    调用方按到达顺序预约令牌：令牌不足时令牌数记为负值，等待时间即为偿还欠额所需时间，
+    因此先到的调用方总是先被放行。预约本身是同步的，不依赖某个事件循环。
+    """
+
+    def __init__(self, rate: float, burst: Union[float, None] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(self.rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimitStats(BaseModel):
+    acquired: int = 0
+    """放行的请求数"""
+    throttled: int = 0
+    """需要等待的请求数"""
+    total_wait: float = 0.0
+    """累计等待时间，单位为秒"""
+    max_wait: float = 0.0
+    """最长等待时间，单位为秒"""
+
+
+class RateLimiter:
+    """按应用和 API_PATH 模板限流的令牌桶注册表。
+
+    Example:
+        >>> limiter = RateLimiter(
+        ...     app_rate=50,
+        ...     endpoint_rates={API_PATH.bitables.search_record: 20},
+        ... )
+        >>> waited = await limiter.acquire("/bitable/v1/apps/xxx/tables/yyy/records/search")
+    """
+
+    def __init__(
+        self,
+        *,
+        app_rate: Union[float, None] = None,
+        endpoint_rates: Union[Dict[str, float], None] = None,
+    ):
+        self._app_bucket = TokenBucket(app_rate) if app_rate else None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, RateLimitStats] = {}
+        for path, rate in (endpoint_rates or {}).items():
+            self.set_limit(path, rate)
+
+    def set_limit(self, path: str, rate: Union[float, None], burst: Union[float, None] = None):
+        """设置某个 API_PATH 模板的频率限制，rate 为 None 时取消限制"""
+        key = normalize_api_path(path)
+        if rate is None:
+            self._buckets.pop(key, None)
+        else:
+            self._buckets[key] = TokenBucket(rate, burst)
+
+    def set_app_limit(self, rate: Union[float, None], burst: Union[float, None] = None):
+        """设置应用整体的频率限制，rate 为 None 时取消限制"""
+        self._app_bucket = TokenBucket(rate, burst) if rate else None
+
+    def _bucket_for(self, url: str) -> Union[str, None]:
+        if not self._buckets:
+            return None
+        template = resolve_api_path(url)
+        if template is None:
+            return None
+        key = normalize_api_path(template)
+        return key if key in self._buckets else None
+
+    async def acquire(self, url: str) -> float:
+        """等待直到请求可以发出，返回等待的秒数"""
+        key = self._bucket_for(url)
+        delay = 0.0
+        if self._app_bucket is not None:
+            delay = self._app_bucket.reserve()
+        if key is not None:
+            delay = max(delay, self._buckets[key].reserve())
+        if delay > 0:
+            logger.debug(f"Rate limited {url}, waiting {delay:.3f} seconds")
+            await anyio.sleep(delay)
+        stats = self._stats.setdefault(key or "*", RateLimitStats())
+        stats.acquired += 1
+        if delay > 0:
+            stats.throttled += 1
+            stats.total_wait += delay
+            stats.max_wait = max(stats.max_wait, delay)
+        return delay
+
+    def stats(self) -> Dict[str, RateLimitStats]:
+        """按 API_PATH 模板统计的等待情况，未单独限流的请求统计在 `*` 下"""
+        return {key: value.model_copy() for key, value in self._stats.items()}
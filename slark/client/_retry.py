@@ -0,0 +1,117 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Iterable, Union
+
+import httpx
+
+from slark._constants import DEFAULT_RETRY_BUDGET, INITIAL_RETRY_DELAY, MAX_RETRY_DELAY
+from slark.types.exceptions.errors import LarkStatusCode
+
+RETRYABLE_STATUS_CODES: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+RETRYABLE_LARK_CODES: FrozenSet[int] = frozenset(
+    {
+        LarkStatusCode.TOO_MANY_REQUESTS,
+        LarkStatusCode.BITABLE_TOO_MANY_REQUESTS,
+        LarkStatusCode.BITABLE_WRITE_CONFLICT,
+        LarkStatusCode.BITABLE_DATA_NOT_READY,
+        LarkStatusCode.BITABLE_INTERNAL_ERROR,
+        LarkStatusCode.BITABLE_RPC_ERROR,
+        LarkStatusCode.BITABLE_TIMEOUT,
+    }
+)
+
+RATE_LIMIT_RESET_HEADERS = ("x-ogw-ratelimit-reset", "retry-after")
+
+
+class RetryState:
+    """单次调用在多次重试之间共享的状态"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.attempts = 0
+        self.last_delay = 0.0
+        self.reauthenticated = False
+        """是否已因 token 失效重新获取过 token"""
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class RetryPolicy:
+    """重试策略：判断响应是否可重试，并计算下一次重试的等待时间。
+
+    - 可重试的 HTTP 状态码和飞书错误码分别由 `retry_statuses` 和 `retry_codes` 指定
+    - 服务端返回 `x-ogw-ratelimit-reset` 或 `Retry-After` 时按服务端提示等待
+    - 否则使用 decorrelated jitter 退避，避免多个调用方在同一时刻重试
+    - 从首次请求开始累计的时间超过 `total_budget` 秒后不再重试
+
+    Args:
+        initial_delay (float, optional): 初始等待时间. Defaults to INITIAL_RETRY_DELAY.
+        max_delay (float, optional): 退避等待时间上限. Defaults to MAX_RETRY_DELAY.
+        total_budget (Union[float, None], optional): 重试总时间预算，None 表示不限制. \
+            Defaults to DEFAULT_RETRY_BUDGET.
+        retry_statuses (Iterable[int], optional): 可重试的 HTTP 状态码. \
+            Defaults to RETRYABLE_STATUS_CODES.
+        retry_codes (Iterable[int], optional): 可重试的飞书错误码. Defaults to RETRYABLE_LARK_CODES.
+        respect_reset_headers (bool, optional): 是否遵循服务端的限流重置时间. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_delay: float = INITIAL_RETRY_DELAY,
+        max_delay: float = MAX_RETRY_DELAY,
+        total_budget: Union[float, None] = DEFAULT_RETRY_BUDGET,
+        retry_statuses: Iterable[int] = RETRYABLE_STATUS_CODES,
+        retry_codes: Iterable[int] = RETRYABLE_LARK_CODES,
+        respect_reset_headers: bool = True,
+    ):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.total_budget = total_budget
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_codes = frozenset(retry_codes)
+        self.respect_reset_headers = respect_reset_headers
+
+    def is_retryable(self, response: httpx.Response, code: Union[int, None] = None) -> bool:
+        if code is not None and code in self.retry_codes:
+            return True
+        return response.status_code in self.retry_statuses
+
+    def server_delay(self, response: Union[httpx.Response, None]) -> Union[float, None]:
+        """解析服务端返回的限流重置时间，单位为秒"""
+        if response is None or not self.respect_reset_headers:
+            return None
+        for header in RATE_LIMIT_RESET_HEADERS:
+            value = response.headers.get(header)
+            if value is None:
+                continue
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                pass
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                continue
+        return None
+
+    def next_delay(
+        self, state: RetryState, response: Union[httpx.Response, None] = None
+    ) -> Union[float, None]:
+        """计算下一次重试前的等待时间，超出时间预算时返回 None"""
+        hint = self.server_delay(response)
+        if hint is not None:
+            # 在服务端重置时间之后再错开一小段，避免所有调用方同时重试
+            delay = hint + random.uniform(0, self.initial_delay)
+        else:
+            upper = max(self.initial_delay, state.last_delay * 3)
+            delay = min(self.max_delay, random.uniform(self.initial_delay, upper))
+        if self.total_budget is not None and state.elapsed + delay > self.total_budget:
+            return None
+        state.attempts += 1
+        state.last_delay = delay
+        return delay
@@ -1,12 +1,23 @@
 import os
-from typing import Union
+from typing import Dict, Iterable, Union
 
 import httpx
 from loguru import logger
 
 from slark import resources
-from slark._constants import DEFAULT_MAX_RETRIES, DEFAULT_TIMEOUT
+from slark._constants import (
+    DEFAULT_CONNECTION_LIMITS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_METADATA_CACHE_SIZE,
+    DEFAULT_TIMEOUT,
+    DEFAULT_TOKEN_REFRESH_AHEAD,
+)
+from slark.client._cache import MetadataCache
 from slark.client._client import AsyncAPIClient
+from slark.client._metrics import MetricsCollector
+from slark.client._middleware import MiddlewareType
+from slark.client._ratelimit import DEFAULT_RATE_LIMITS, RateLimiter
+from slark.client._retry import RetryPolicy
 from slark.types.auth import CredentailTypes, TokenBase
 
 
@@ -25,8 +36,9 @@ class AsyncLark(AsyncAPIClient):
     _app_id: Union[str, None]
     _app_secret: Union[str, None]
     _webhook_url: Union[str, None]
-    _token: Union[TokenBase, None]
+    _token_manager: resources.TokenManager
     _token_type: CredentailTypes
+    metadata_cache: MetadataCache
 
     def __init__(
         self,
@@ -40,21 +52,49 @@ class AsyncLark(AsyncAPIClient):
         max_retries: int = DEFAULT_MAX_RETRIES,
         timeout: httpx.Timeout = DEFAULT_TIMEOUT,
         proxies: Union[httpx._types.ProxyTypes, None] = None,
+        limits: httpx.Limits = DEFAULT_CONNECTION_LIMITS,
+        http2: bool = False,
+        app_rate_limit: Union[float, None] = None,
+        rate_limits: Union[Dict[str, float], None] = None,
+        retry_policy: Union[RetryPolicy, None] = None,
         token_type: CredentailTypes = "tenant",
+        token_refresh_ahead: float = DEFAULT_TOKEN_REFRESH_AHEAD,
+        token_store: Union[resources.TokenStore, None] = None,
+        coalesce_requests: bool = False,
+        metadata_cache_ttl: float = 0,
+        metadata_cache_size: int = DEFAULT_METADATA_CACHE_SIZE,
+        middlewares: Union[Iterable[MiddlewareType], None] = None,
+        metrics: Union[MetricsCollector, None] = None,
     ):
         self._app_id = app_id or os.getenv("APP_ID", None)
         self._app_secret = app_secret or os.getenv("APP_SECRET", None)
         self._webhook_url = webhook or os.getenv("WEBHOOK_URL", None)
         self._verification_token = verification_token or os.getenv("VERIFICATION_TOKEN", None)
         self._encrypt_key = encrypt_key or os.getenv("ENCRYPT_KEY", None)
-        self._token = None
         self._token_type = token_type
+        self._token_manager = resources.TokenManager(
+            self._fetch_token,
+            refresh_ahead=token_refresh_ahead,
+            store=token_store,
+            key=f"{self._app_id}-{self._token_type}",
+        )
+        self.metadata_cache = MetadataCache(ttl=metadata_cache_ttl, maxsize=metadata_cache_size)
 
         super().__init__(
             base_url=base_url,
             max_retries=max_retries,
             timeout=timeout,
             proxies=proxies,
+            limits=limits,
+            http2=http2,
+            rate_limiter=RateLimiter(
+                app_rate=app_rate_limit,
+                endpoint_rates={**DEFAULT_RATE_LIMITS, **(rate_limits or {})},
+            ),
+            retry_policy=retry_policy,
+            coalesce_requests=coalesce_requests,
+            middlewares=middlewares,
+            metrics=metrics,
         )
 
         self.auth = resources.AsyncAuth(self)
@@ -77,13 +117,21 @@ class AsyncLark(AsyncAPIClient):
             "app_secret": self._app_secret,
         }
 
+    async def _fetch_token(self) -> TokenBase:
+        if self._token_type == "tenant":
+            logger.debug("Refreshing tenant access token")
+            return await self.auth.token.get_tenant_access_token()
+        raise NotImplementedError(f"{self._token_type} token is not supported")
+
     async def get_auth_headers(self) -> dict:
-        if self._token is None or self._token.is_expired:
-            if self._token_type == "tenant":
-                logger.debug("Refreshing tenant access token")
-                self._token = await self.auth.token.get_tenant_access_token()
-            else:
-                raise NotImplementedError(f"{self._token_type} token is not supported")
+        token = await self._token_manager.get()
         return {
-            "Authorization": f"Bearer {self._token.access_token}",
+            "Authorization": f"Bearer {token.access_token}",
         }
+
+    async def invalidate_auth(self, request: httpx.Request) -> None:
+        authorization = request.headers.get("Authorization", "")
+        access_token = (
+            authorization[len("Bearer ") :] if authorization.startswith("Bearer ") else None
+        )
+        self._token_manager.invalidate(access_token)
@@ -44,7 +44,7 @@ class EventManager:
 
         return json.loads(cipher.decrypt_string(encrypt_data))
 
-    def _make_app(self, path: t.Union[str, None] = None):
+    def _make_app(self, path: t.Union[str, None] = None, metrics_path: t.Union[str, None] = None):
         import fastapi
 
         assert self._client._encrypt_key, "ENCRYPT_KEY is necessary"
@@ -86,6 +86,15 @@ class EventManager:
                 logger.warning(f"Unhandled event: {event_type}")
             return Response()
 
+        if metrics_path is not None:
+
+            @app.get(metrics_path)
+            async def metrics_handler():
+                return Response(
+                    content=self._client.metrics.render_prometheus(),
+                    media_type="text/plain; version=0.0.4; charset=utf-8",
+                )
+
         return app
 
     def listen(
@@ -93,9 +102,19 @@ class EventManager:
         host: str = "127.0.0.1",
         port: int = 8000,
         path: t.Union[str, None] = None,
+        metrics_path: t.Union[str, None] = None,
     ):
+        """启动事件回调服务
+
+        Args:
+            host (str, optional): 监听地址. Defaults to "127.0.0.1".
+            port (int, optional): 监听端口. Defaults to 8000.
+            path (t.Union[str, None], optional): 事件回调路径. Defaults to None.
+            metrics_path (t.Union[str, None], optional): Prometheus 指标路径，如 "/metrics"，\
+                为 None 时不暴露指标. Defaults to None.
+        """
         import uvicorn
 
-        app = self._make_app(path)
+        app = self._make_app(path, metrics_path=metrics_path)
 
         uvicorn.run(app, host=host, port=port)
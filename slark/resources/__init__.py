@@ -1,5 +1,5 @@
 from .assets.assets import AsyncAssets
-from .auth import AsyncAuth
+from .auth import AsyncAuth, TokenManager, TokenStore
 from .bitable.bitable import AsyncBiTable
 from .board.board import AsyncBoard
 from .documents.documents import AsyncDocuments
@@ -11,6 +11,8 @@ from .webhook.webhook import AsyncWebhook
 
 __all__ = [
     "AsyncAuth",
+    "TokenManager",
+    "TokenStore",
     "AsyncWebhook",
     "KnowledgeSpace",
     "AsyncSpreadsheets",
@@ -1,4 +1,6 @@
-from typing import final
+import functools
+import re
+from typing import Iterator, List, Pattern, Tuple, Union, final
 
 
 @final
@@ -144,3 +146,47 @@ class API_PATH:
     image = IMAGE
     message = MESSAGE
     drive = DRIVE
+
+
+def _iter_templates(namespace: type) -> Iterator[str]:
+    for name, value in vars(namespace).items():
+        if name.startswith("_"):
+            continue
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, type):
+            yield from _iter_templates(value)
+
+
+def normalize_api_path(path: str) -> str:
+    """去掉路径首尾的 `/`，API_PATH 中部分模板不以 `/` 开头"""
+    return path.strip("/")
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_templates() -> List[Tuple[Pattern, str]]:
+    compiled = []
+    for template in set(_iter_templates(API_PATH)):
+        parts = re.split(r"(\{[^}]+\})", normalize_api_path(template))
+        pattern = "".join(
+            "[^/]+" if part.startswith("{") else re.escape(part) for part in parts if part
+        )
+        compiled.append((re.compile(f"^{pattern}$"), template, len(parts) // 2, -len(template)))
+    # 优先匹配占位符更少、字面量更长的模板，例如 records/search 优先于 records/{record_id}
+    compiled.sort(key=lambda item: (item[2], item[3]))
+    return [(regex, template) for regex, template, *_ in compiled]
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve_api_path(url: str) -> Union[str, None]:
+    """将格式化后的请求路径还原为 API_PATH 中的模板，无法匹配时返回 None
+
+    Example:
+        >>> resolve_api_path("/bitable/v1/apps/xxx/tables/yyy/records/search")
+        '/bitable/v1/apps/{app_token}/tables/{table_id}/records/search'
+    """
+    path = normalize_api_path(url.split("?", 1)[0])
+    for regex, template in _compiled_templates():
+        if regex.match(path):
+            return template
+    return None
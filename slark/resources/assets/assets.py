@@ -1,3 +1,4 @@
+import os
 import re
 from typing import Union
 
@@ -45,3 +46,43 @@ class AsyncAssets(AsyncAPIResource):
             filename=filename,
             filetype=mime_type,
         )
+
+    async def download_to(
+        self,
+        file_token: str,
+        path: Union[str, os.PathLike],
+        *,
+        chunk_size: int = 1024 * 1024,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> int:
+        """流式下载素材到 path，先写入临时文件，下载完成后再重命名，中断时不会留下不完整的文件
+
+        Args:
+            file_token (str): 素材的 file_token
+            path (Union[str, os.PathLike]): 保存路径
+            chunk_size (int, optional): 每次写入的字节数. Defaults to 1024 * 1024.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Returns:
+            int: 下载的字节数
+        """
+        response = await self._get(
+            API_PATH.assets.download.format(file_token=file_token),
+            options={"timeout": timeout, "stream": True},
+            cast_to=Response,
+        )
+        path = anyio.Path(path)
+        part = path.with_name(path.name + ".part")
+        await path.parent.mkdir(parents=True, exist_ok=True)
+        size = 0
+        try:
+            async with await anyio.open_file(part, "wb") as f:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    await f.write(chunk)
+                    size += len(chunk)
+            await part.replace(path)
+        finally:
+            await response.aclose()
+            if await part.exists():
+                await part.unlink()
+        return size
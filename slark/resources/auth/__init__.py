@@ -1,3 +1,11 @@
 from .auth import AsyncAuth
+from .manager import TokenManager
+from .store import FileTokenStore, MemoryTokenStore, TokenStore
 
-__all__ = ["AsyncAuth"]
+__all__ = [
+    "AsyncAuth",
+    "TokenManager",
+    "TokenStore",
+    "MemoryTokenStore",
+    "FileTokenStore",
+]
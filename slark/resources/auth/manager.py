@@ -0,0 +1,130 @@
+import asyncio
+from time import time
+from typing import Awaitable, Callable, Set, Union
+
+import anyio
+from loguru import logger
+
+from slark._constants import DEFAULT_TOKEN_REFRESH_AHEAD
+from slark.client._loop import LoopLocal, current_loop
+from slark.types.auth import TokenBase
+
+from .store import TokenStore
+
+# 两次后台刷新之间的最小间隔，避免服务端返回同一个即将过期的 token 时反复刷新
+MIN_BACKGROUND_REFRESH_INTERVAL = 10.0
+
+
+class TokenManager:
+    """管理访问凭证的获取与刷新。
+
+    - 同一时刻只有一个刷新请求在进行，其余调用方等待其结果
+    - token 进入过期前 `refresh_ahead` 秒的窗口后，在后台提前刷新，调用方继续使用当前 token
+    - 服务端返回 token 无效时，通过 `invalidate` 丢弃当前 token
+    - 指定 `store` 时，多个进程/实例通过存储共享 token，只有一个实例负责刷新
+
+    Args:
+        fetch (Callable[[], Awaitable[TokenBase]]): 获取新 token 的协程函数
+        refresh_ahead (float, optional): 提前刷新的时间，单位为秒. \
+            Defaults to DEFAULT_TOKEN_REFRESH_AHEAD.
+        store (Union[TokenStore, None], optional): 共享存储. Defaults to None.
+        key (str, optional): token 在共享存储中的键. Defaults to "default".
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[TokenBase]],
+        *,
+        refresh_ahead: float = DEFAULT_TOKEN_REFRESH_AHEAD,
+        store: Union[TokenStore, None] = None,
+        key: str = "default",
+    ):
+        self._fetch = fetch
+        self._token: Union[TokenBase, None] = None
+        self._rejected: Union[str, None] = None
+        self.refresh_ahead = refresh_ahead
+        self.store = store
+        self.key = key
+        self._locks: LoopLocal[anyio.Lock] = LoopLocal(anyio.Lock)
+        self._background_tasks: LoopLocal[Set[asyncio.Task]] = LoopLocal(set)
+        self._last_background_refresh = 0.0
+
+    @property
+    def token(self) -> Union[TokenBase, None]:
+        return self._token
+
+    def _is_stale(self, token: TokenBase) -> bool:
+        return token.expires_at - time() < self.refresh_ahead
+
+    async def get(self) -> TokenBase:
+        """获取可用的 token，必要时刷新"""
+        token = self._token
+        if token is None or token.is_expired:
+            return await self.refresh()
+        if self._is_stale(token):
+            self._refresh_in_background()
+        return token
+
+    async def refresh(self) -> TokenBase:
+        """刷新 token，并发调用时只会发出一次请求"""
+        previous = self._token
+        async with self._locks.get():
+            token = self._token
+            if token is not None and token is not previous and not token.is_expired:
+                # 等待锁期间已由其他调用方刷新
+                return token
+            if self.store is None:
+                logger.debug("Refreshing access token")
+                self._token = await self._fetch()
+            else:
+                self._token = await self._refresh_with_store()
+            return self._token
+
+    def _is_usable(self, token: Union[TokenBase, None]) -> bool:
+        return (
+            token is not None
+            and token.access_token != self._rejected
+            and not token.is_expired
+            and not self._is_stale(token)
+        )
+
+    async def _refresh_with_store(self) -> TokenBase:
+        async with self.store.lock(self.key):
+            # 其他进程可能已经刷新过
+            token = await self.store.load(self.key)
+            if self._is_usable(token):
+                logger.debug("Loaded access token from token store")
+                return token
+            logger.debug("Refreshing access token")
+            token = await self._fetch()
+            await self.store.save(self.key, token)
+            return token
+
+    def invalidate(self, access_token: Union[str, None] = None) -> None:
+        """丢弃当前 token。指定 access_token 时，仅当其仍是当前 token 时才丢弃"""
+        token = self._token
+        if token is None:
+            return
+        if access_token is None or token.access_token == access_token:
+            logger.debug("Invalidating access token")
+            self._rejected = token.access_token
+            self._token = None
+
+    def _refresh_in_background(self) -> None:
+        loop = current_loop()
+        if loop is None or self._locks.get().locked():
+            return
+        now = time()
+        if now - self._last_background_refresh < MIN_BACKGROUND_REFRESH_INTERVAL:
+            return
+        self._last_background_refresh = now
+        tasks = self._background_tasks.get()
+        task = loop.create_task(self._background_refresh())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Background token refresh failed: {e}")
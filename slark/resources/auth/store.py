@@ -0,0 +1,165 @@
+import os
+import re
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncContextManager, AsyncIterator, Dict, Type, Union
+
+import anyio
+import anyio.to_thread
+
+from slark.client._loop import LoopLocal
+from slark.types.auth import TenantAccessToken, TokenBase
+
+DEFAULT_TOKEN_STORE_DIR = os.path.join(tempfile.gettempdir(), "slark-tokens")
+
+
+class TokenStore:
+    """访问凭证的共享存储接口。
+
+    TokenManager 刷新 token 前会持有 `lock(key)`，并先从存储中读取，
+    只有存储中的 token 不可用时才向服务端请求，请求结果写回存储供其他实例使用。
+    """
+
+    async def load(self, key: str) -> Union[TokenBase, None]:
+        raise NotImplementedError
+
+    async def save(self, key: str, token: TokenBase) -> None:
+        raise NotImplementedError
+
+    def lock(self, key: str) -> AsyncContextManager[None]:
+        """跨实例互斥锁，保证同一时刻只有一个实例在刷新 key 对应的 token"""
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """进程内共享的存储，适用于同一进程中的多个 AsyncLark 实例"""
+
+    def __init__(self):
+        self._tokens: Dict[str, TokenBase] = {}
+        self._locks: LoopLocal[Dict[str, anyio.Lock]] = LoopLocal(dict)
+
+    async def load(self, key: str) -> Union[TokenBase, None]:
+        return self._tokens.get(key)
+
+    async def save(self, key: str, token: TokenBase) -> None:
+        self._tokens[key] = token
+
+    @asynccontextmanager
+    async def lock(self, key: str) -> AsyncIterator[None]:
+        locks = self._locks.get()
+        if key not in locks:
+            locks[key] = anyio.Lock()
+        async with locks[key]:
+            yield
+
+
+class FileTokenStore(TokenStore):
+    """基于文件锁的存储，同一主机上的多个进程共享 token，只有一个进程负责刷新。
+
+    token 以 JSON 保存在 `directory/{key}.json`，刷新时通过 `directory/{key}.lock` 加锁，
+    文件权限为 0600。
+
+    Args:
+        directory (Union[str, os.PathLike, None], optional): 存储目录. \
+            Defaults to DEFAULT_TOKEN_STORE_DIR.
+        token_cls (Type[TokenBase], optional): token 类型. Defaults to TenantAccessToken.
+    """
+
+    LOCK_POLL_INTERVAL = 0.05
+    """等待文件锁时的轮询间隔，单位为秒"""
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]", None] = None,
+        *,
+        token_cls: Type[TokenBase] = TenantAccessToken,
+    ):
+        self.directory = Path(directory or DEFAULT_TOKEN_STORE_DIR)
+        self.token_cls = token_cls
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', key)}{suffix}"
+
+    def _ensure_directory(self) -> None:
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    async def load(self, key: str) -> Union[TokenBase, None]:
+        path = self._path(key, ".json")
+
+        def read() -> Union[bytes, None]:
+            try:
+                return path.read_bytes()
+            except FileNotFoundError:
+                return None
+
+        content = await anyio.to_thread.run_sync(read)
+        if not content:
+            return None
+        try:
+            return self.token_cls.model_validate_json(content)
+        except ValueError:
+            return None
+
+    async def save(self, key: str, token: TokenBase) -> None:
+        path = self._path(key, ".json")
+
+        def write() -> None:
+            self._ensure_directory()
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=path.name, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(token.model_dump_json())
+                os.chmod(tmp, 0o600)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+        await anyio.to_thread.run_sync(write)
+
+    def _try_lock(self, fd: int) -> bool:
+        """以非阻塞方式尝试加锁，锁被其他进程持有时返回 False"""
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def _release(self, fd: int) -> None:
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    @asynccontextmanager
+    async def lock(self, key: str) -> AsyncIterator[None]:
+        # 轮询非阻塞的文件锁，等待中被取消时不会在后台线程中继续加锁
+        self._ensure_directory()
+        fd = os.open(self._path(key, ".lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            while not self._try_lock(fd):
+                await anyio.sleep(self.LOCK_POLL_INTERVAL)
+        except BaseException:
+            os.close(fd)
+            raise
+        try:
+            yield
+        finally:
+            # 同步释放，取消时也能执行
+            self._release(fd)
@@ -0,0 +1,212 @@
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import anyio
+from loguru import logger
+
+from slark.client._decode import dumps
+from slark.types.bitables.record.batch import BatchChunkResult, BatchReport
+from slark.types.exceptions import errors as err
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def chunked(items: Sequence[_T], chunk_size: int) -> Iterator[Sequence[_T]]:
+    """将 items 按 chunk_size 切分"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    for offset in range(0, len(items), chunk_size):
+        yield items[offset : offset + chunk_size]
+
+
+PAYLOAD_OVERHEAD = 16
+"""每条记录在请求体中除自身外的开销，如 {"fields": ...} 和分隔符"""
+
+
+def payload_size(item: Any) -> int:
+    """item 在请求体中占用的字节数，与客户端发送请求体时的 UTF-8 JSON 序列化方式一致"""
+    return len(dumps(item)) + PAYLOAD_OVERHEAD
+
+
+def pack(
+    items: Iterable[_T],
+    *,
+    max_items: int,
+    max_bytes: Union[int, None] = None,
+    size: Callable[[_T], int] = payload_size,
+) -> Iterator[List[_T]]:
+    """按顺序将 items 装入分块，每块不超过 max_items 条且估计大小不超过 max_bytes，items 按需逐个读取。
+
+    单条超过 max_bytes 的 item 单独成块，由服务端决定是否接受。
+
+    Args:
+        items (Iterable[_T]): 待处理的数据
+        max_items (int): 每块的最大条数
+        max_bytes (Union[int, None], optional): 每块的最大字节数，为 None 时只按条数分块. Defaults to None.
+        size (Callable[[_T], int], optional): 估计单条数据的字节数. Defaults to payload_size.
+
+    Yields:
+        List[_T]: 分块
+    """
+    if max_items < 1:
+        raise ValueError("max_items must be at least 1")
+    chunk: List[_T] = []
+    chunk_bytes = 0
+    for item in items:
+        item_bytes = size(item) if max_bytes is not None else 0
+        if chunk and (
+            len(chunk) >= max_items
+            or (max_bytes is not None and chunk_bytes + item_bytes > max_bytes)
+        ):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(item)
+        chunk_bytes += item_bytes
+    if chunk:
+        yield chunk
+
+
+def halve(chunk: Sequence[_T]) -> List[Sequence[_T]]:
+    """将分块对半拆分"""
+    middle = (len(chunk) + 1) // 2
+    return [chunk[:middle], chunk[middle:]]
+
+
+async def run_chunks(
+    chunks: Iterable[Sequence[_T]],
+    func: Callable[[Sequence[_T]], Awaitable[_R]],
+    *,
+    concurrency: int = 1,
+    split: Union[Callable[[Sequence[_T], Exception], Union[List[Sequence[_T]], None]], None] = None,
+) -> List[_R]:
+    """最多 concurrency 个分块并发执行 func，chunks 按需逐个读取，可以是惰性生成的分块。
+
+    同一时刻最多只有 concurrency 个分块在内存中等待或执行。请求频率由客户端的限流器控制。
+    单个分块失败不会中断其他分块，全部分块结束后若有失败，抛出包含各分块结果的 BatchOperationError。
+    读取 chunks 时抛出的异常在已提交的分块结束后原样抛出。
+
+    分块失败时若 split 返回拆分后的分块，依次执行各部分，结果和 BatchReport 中以拆分后的分块为单位，
+    各部分可以继续拆分，因此一条无法写入的数据只会导致它所在的最小分块失败。
+
+    Args:
+        chunks (Iterable[Sequence[_T]]): 待处理的分块
+        func (Callable[[Sequence[_T]], Awaitable[_R]]): 处理单个分块的协程函数
+        concurrency (int, optional): 最大并发分块数. Defaults to 1.
+        split (Union[Callable[[Sequence[_T], Exception], Union[List[Sequence[_T]], None]], None], optional): \
+            多于一条数据的分块失败时调用，返回拆分后的分块，返回 None 表示不拆分. Defaults to None.
+
+    Raises:
+        BatchOperationError: 部分分块失败
+
+    Returns:
+        List[_R]: 按分块顺序排列的结果
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    # 每个输入分块的执行结果，拆分后包含多个部分
+    outcomes: List[List[Tuple[BatchChunkResult, Union[_R, None]]]] = []
+    semaphore = anyio.Semaphore(concurrency)
+
+    async def execute(
+        report: BatchChunkResult, chunk: Sequence[_T]
+    ) -> List[Tuple[BatchChunkResult, Union[_R, None]]]:
+        try:
+            result = await func(chunk)
+        except Exception as e:
+            parts = split(chunk, e) if split is not None and len(chunk) > 1 else None
+            if parts:
+                logger.info(f"Chunk {report.index} split into {len(parts)} parts: {e}")
+                executed: List[Tuple[BatchChunkResult, Union[_R, None]]] = []
+                offset = report.offset
+                for part in parts:
+                    sub = BatchChunkResult(
+                        index=report.index, offset=offset, size=len(part), success=False
+                    )
+                    offset += len(part)
+                    executed.extend(await execute(sub, part))
+                return executed
+            logger.warning(f"Chunk {report.index} failed: {e}")
+            if isinstance(e, err.LarkException):
+                report.code, report.msg = e.code, e.msg
+            else:
+                report.msg = str(e)
+            return [(report, None)]
+        report.success = True
+        return [(report, result)]
+
+    async def run(report: BatchChunkResult, chunk: Sequence[_T]) -> None:
+        try:
+            outcomes[report.index] = await execute(report, chunk)
+        finally:
+            semaphore.release()
+
+    offset = 0
+    error: Union[Exception, None] = None
+    iterator = iter(chunks)
+    async with anyio.create_task_group() as tg:
+        while True:
+            # 有空闲的并发位置时才读取下一个分块
+            await semaphore.acquire()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            except Exception as e:
+                # 读取分块出错时不再提交新的分块，等待已提交的分块结束后抛出
+                error = e
+                break
+            report = BatchChunkResult(
+                index=len(outcomes), offset=offset, size=len(chunk), success=False
+            )
+            outcomes.append([(report, None)])
+            offset += len(chunk)
+            tg.start_soon(run, report, chunk)
+    if error is not None:
+        raise error
+
+    reports: List[BatchChunkResult] = []
+    results: List[Union[_R, None]] = []
+    for outcome in outcomes:
+        for chunk_report, result in outcome:
+            chunk_report.index = len(reports)
+            reports.append(chunk_report)
+            results.append(result)
+    report = BatchReport(chunks=reports)
+    if report.failed:
+        raise err.BatchOperationError(report, results)
+    return results
+
+
+async def run_in_chunks(
+    items: Sequence[_T],
+    func: Callable[[Sequence[_T]], Awaitable[_R]],
+    *,
+    chunk_size: int,
+    concurrency: int = 1,
+) -> List[_R]:
+    """将 items 按 chunk_size 分块，最多 concurrency 个分块并发执行 func，参见 `run_chunks`
+
+    Args:
+        items (Sequence[_T]): 待处理的数据
+        func (Callable[[Sequence[_T]], Awaitable[_R]]): 处理单个分块的协程函数
+        chunk_size (int): 分块大小
+        concurrency (int, optional): 最大并发分块数. Defaults to 1.
+
+    Raises:
+        BatchOperationError: 部分分块失败
+
+    Returns:
+        List[_R]: 按分块顺序排列的结果
+    """
+    return await run_chunks(chunked(items, chunk_size), func, concurrency=concurrency)
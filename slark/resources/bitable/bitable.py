@@ -1,19 +1,77 @@
+import asyncio
+import functools
+import itertools
+import json
+import os
 import re
-from typing import List, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+import anyio
 import httpx
 import pandas as pd
+from loguru import logger
 from pydantic import BaseModel
+from typing_extensions import Literal
 
+from slark.client._loop import current_loop
 from slark.resources._resources import AsyncAPIResource
 from slark.types._utils import cached_property
-from slark.types.bitables.record.response import RecordResponseData
+from slark.types.bitables.common import UIType
+from slark.types.bitables.field.common import Field
+from slark.types.bitables.record.attachment import AttachmentDownload
+from slark.types.bitables.record.batch import CopyResult, UpsertResult
+from slark.types.bitables.record.request import (
+    SearchRecordFilter,
+    SearchRecordFilterCondition,
+    SearchRecordSort,
+)
+from slark.types.bitables.record.response import RecordResponseData, SearchRecordResponseData
+from slark.types.bitables.record.watch import WatchBatch, WatchCheckpoint
+from slark.types.exceptions import errors as err
 
+from .batch import halve, pack, run_chunks, run_in_chunks
+from .columnar import (
+    DEFAULT_ROW_GROUP_SIZE,
+    arrow_schema,
+    arrow_to_records,
+    pa,
+    pq,
+    records_to_arrow,
+    require_pyarrow,
+)
+from .copier import LINK_UI_TYPES, UNCOPIED_VALUE_UI_TYPES, copy_value, field_spec
 from .field import AsyncField
+from .journal import ChunkSplit, JournalChunk, WriteJournal
 from .meta import AsyncMeta
+from .mirror import BitableMirror
+from .query import Query
 from .record import AsyncRecord
 from .table import AsyncTable
-from .utils import dataframe_to_records, fields_records_to_dataframe
+from .utils import (
+    _get,
+    comparable_value,
+    dataframe_to_json_records,
+    field_ui_type,
+    fields_records_to_dataframe,
+    iter_record_chunks,
+    link_record_ids,
+    normalize_value,
+    records_to_columns,
+    timezone_offset,
+    write_value,
+)
 from .view import AsyncView
 
 
@@ -44,6 +102,29 @@ class AsyncBiTable(AsyncAPIResource):
     def meta(self) -> AsyncMeta:
         return AsyncMeta(self._client)
 
+    def mirror(self, url: str, path: Union[str, os.PathLike]) -> BitableMirror:
+        """创建多维表格的本地 SQLite 镜像，调用 `refresh` 同步后在本地查询
+
+        Args:
+            url (str): 多维表格分享链接
+            path (Union[str, os.PathLike]): SQLite 文件路径
+
+        Returns:
+            BitableMirror: 本地镜像
+        """
+        return BitableMirror(self, url, path)
+
+    def query(self, url: str) -> Query:
+        """构造查询，条件、排序和字段尽量在服务端执行
+
+        Args:
+            url (str): 多维表格分享链接
+
+        Returns:
+            Query: 查询
+        """
+        return Query(self, url)
+
     async def get_bitable_info(self, url: str) -> BitableInfo:
         """从多维表格分享链接中提取 app_token, table_id, view_id
 
@@ -53,6 +134,11 @@ class AsyncBiTable(AsyncAPIResource):
         Returns:
             BitableInfo: app_token, table_id, view_id
         """
+        return await self._client.metadata_cache.bitable_info.get_or_load(
+            url, lambda: self._resolve_bitable_info(url)
+        )
+
+    async def _resolve_bitable_info(self, url: str) -> BitableInfo:
         if "/base/" in url:
             app_token, table_id, view_id = re.findall(
                 r"\/base\/([^\/\?]+)(?:\?table=([^\/\&\?]+))?(?:\&view=([^\/]+))?", url
@@ -74,6 +160,229 @@ class AsyncBiTable(AsyncAPIResource):
             table_id = (await self.table.list(app_token)).data.items[0].table_id
         return BitableInfo(app_token=app_token, table_id=table_id, view_id=view_id)
 
+    async def iter_pages(
+        self,
+        url: str,
+        *,
+        field_names: Union[List[str], None] = None,
+        sort: Union[List[SearchRecordSort], None] = None,
+        filter: Union[SearchRecordFilter, None] = None,
+        automatic_fields: Union[bool, None] = None,
+        user_id_type: Union[Literal["open_id", "union_id", "user_id"], None] = None,
+        page_size: Union[int, None] = None,
+        prefetch: bool = True,
+        validate: bool = True,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> AsyncIterator[Union[SearchRecordResponseData, Dict[str, Any]]]:
+        """逐页查询多维表格中的记录，内存占用与表格大小无关
+
+        Args:
+            url (str): 多维表格分享链接，包含 view 时只查询该视图下的记录
+            field_names (Union[List[str], None], optional): 返回的字段. Defaults to None.
+            sort (Union[List[SearchRecordSort], None], optional): 排序条件. Defaults to None.
+            filter (Union[SearchRecordFilter, None], optional): 筛选条件. Defaults to None.
+            automatic_fields (Union[bool, None], optional): 是否返回自动计算的字段. Defaults to None.
+            user_id_type (Union[Literal["open_id", "union_id", "user_id"], None], optional): \
+                用户 ID 类型. Defaults to None.
+            page_size (Union[int, None], optional): 分页大小，最大为 500. Defaults to 500.
+            prefetch (bool, optional): 调用方处理当前页时是否提前请求下一页，最多预取一页，\
+                只在 asyncio 下生效，其他后端（如 trio）逐页请求. Defaults to True.
+            validate (bool, optional): 为 False 时不构建模型实例，直接产出响应中的 data JSON. \
+                Defaults to True.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Yields:
+            Union[SearchRecordResponseData, Dict[str, Any]]: 每一页的查询结果
+        """
+        info = await self.get_bitable_info(url)
+
+        async def fetch(
+            page_token: Union[str, None],
+        ) -> Union[SearchRecordResponseData, Dict[str, Any]]:
+            response = await self.record.search(
+                app_token=info.app_token,
+                table_id=info.table_id,
+                view_id=info.view_id or None,
+                field_names=field_names,
+                sort=sort,
+                filter=filter,
+                automatic_fields=automatic_fields,
+                user_id_type=user_id_type,
+                page_token=page_token,
+                page_size=page_size or self.record.MAX_RECORDS_PER_REQUEST,
+                validate=validate,
+                timeout=timeout,
+            )
+            return _get(response, "data")
+
+        # 预取请求是独立的 asyncio 任务，生成器不持有任务组或取消范围，
+        # 调用方提前结束迭代、生成器在其他任务中回收时也不会影响调用方
+        loop = current_loop() if prefetch else None
+        pending: Union[asyncio.Task, None] = None
+        page = await fetch(None)
+        try:
+            while True:
+                has_more = _get(page, "has_more")
+                if has_more and loop is not None:
+                    pending = loop.create_task(fetch(_get(page, "page_token")))
+                    pending.add_done_callback(_consume_exception)
+                yield page
+                if not has_more:
+                    return
+                if pending is None:
+                    page = await fetch(_get(page, "page_token"))
+                else:
+                    page, pending = await pending, None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def iter_records(
+        self,
+        url: str,
+        *,
+        rows: Union[int, None] = None,
+        field_names: Union[List[str], None] = None,
+        sort: Union[List[SearchRecordSort], None] = None,
+        filter: Union[SearchRecordFilter, None] = None,
+        automatic_fields: Union[bool, None] = None,
+        user_id_type: Union[Literal["open_id", "union_id", "user_id"], None] = None,
+        prefetch: bool = True,
+        validate: bool = True,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> AsyncIterator[Union[RecordResponseData, Dict[str, Any]]]:
+        """逐条查询多维表格中的记录，参数同 `iter_pages`
+
+        Args:
+            url (str): 多维表格分享链接
+            rows (Union[int, None], optional): 最多返回的记录数. Defaults to None.
+
+        Yields:
+            Union[RecordResponseData, Dict[str, Any]]: 记录，validate=False 时为原始 JSON
+        """
+        count = 0
+        page_size = None if rows is None else min(rows, self.record.MAX_RECORDS_PER_REQUEST)
+        pages = self.iter_pages(
+            url,
+            field_names=field_names,
+            sort=sort,
+            filter=filter,
+            automatic_fields=automatic_fields,
+            user_id_type=user_id_type,
+            page_size=page_size,
+            prefetch=prefetch,
+            validate=validate,
+            timeout=timeout,
+        )
+        try:
+            async for page in pages:
+                for item in _get(page, "items") or []:
+                    if rows is not None and count >= rows:
+                        return
+                    count += 1
+                    yield item
+        finally:
+            await pages.aclose()
+
+    async def watch(
+        self,
+        url: str,
+        *,
+        since: Union[WatchCheckpoint, None] = None,
+        field_names: Union[List[str], None] = None,
+        modified_field: Union[str, None] = None,
+        poll_interval: Union[float, None] = None,
+        page_size: Union[int, None] = None,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> AsyncIterator[WatchBatch]:
+        """增量读取自 since 以来新增或修改的记录。
+
+        数据表有“最后更新时间”字段时，按该字段筛选并升序排序，只请求 since 当天及之后修改的记录；
+        否则读取全表并按记录的 last_modified_time 在本地筛选。筛选按天进行，
+        since 当天已读取的记录由 checkpoint 中的 record_ids 去重。
+
+        没有“最后更新时间”字段时，每次轮询都会读取全表，请求数与表格行数成正比，
+        轮询大表前建议先添加该字段，否则会记录一条警告。
+
+        Args:
+            url (str): 多维表格分享链接
+            since (Union[WatchCheckpoint, None], optional): 上次读取到的位置，为 None 时从头开始. \
+                Defaults to None.
+            field_names (Union[List[str], None], optional): 返回的字段. Defaults to None.
+            modified_field (Union[str, None], optional): “最后更新时间”字段的名称，\
+                为 None 时自动查找. Defaults to None.
+            poll_interval (Union[float, None], optional): 轮询间隔，单位为秒，为 None 时读取一轮后结束. \
+                Defaults to None.
+            page_size (Union[int, None], optional): 分页大小，最大为 500. Defaults to 500.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Yields:
+            WatchBatch: 修改的记录和读取后的位置，调用方处理完 records 后保存 checkpoint
+        """
+        checkpoint = since or WatchCheckpoint()
+        if modified_field is None:
+            fields = await self._list_fields(url, None, timeout)
+            modified_field = next(
+                (
+                    field.field_name
+                    for field in fields
+                    if field_ui_type(field) == UIType.MODIFIED_TIME.value
+                ),
+                None,
+            )
+        sort = None if modified_field is None else [SearchRecordSort(field_name=modified_field)]
+        if modified_field is None and poll_interval is not None:
+            logger.warning(
+                "No ModifiedTime field in the table, every poll of watch reads the whole table"
+            )
+
+        def by_modified_time(record: RecordResponseData) -> int:
+            return record.last_modified_time or 0
+
+        while True:
+            start = checkpoint
+            filter = None
+            if modified_field is not None and start.timestamp:
+                # ExactDate 按天比较，大于前一天即包含 since 当天
+                filter = SearchRecordFilter(
+                    conjunction="and",
+                    conditions=[
+                        SearchRecordFilterCondition(
+                            field_name=modified_field,
+                            operator="isGreater",
+                            value=["ExactDate", str(start.timestamp - 24 * 60 * 60 * 1000)],
+                        )
+                    ],
+                )
+            pending: List[RecordResponseData] = []
+            pages = self.iter_pages(
+                url,
+                field_names=field_names,
+                sort=sort,
+                filter=filter,
+                automatic_fields=True,
+                page_size=page_size,
+                timeout=timeout,
+            )
+            try:
+                async for page in pages:
+                    records = [record for record in page.items if not start.is_seen(record)]
+                    if sort is None:
+                        pending.extend(records)
+                    elif records:
+                        records.sort(key=by_modified_time)
+                        checkpoint = checkpoint.advance(records)
+                        yield WatchBatch(records=records, checkpoint=checkpoint)
+            finally:
+                await pages.aclose()
+            if pending:
+                pending.sort(key=by_modified_time)
+                checkpoint = checkpoint.advance(pending)
+                yield WatchBatch(records=pending, checkpoint=checkpoint)
+            if poll_interval is None:
+                return
+            await anyio.sleep(poll_interval)
+
     async def read(
         self,
         url: str,
@@ -82,8 +391,11 @@ class AsyncBiTable(AsyncAPIResource):
         field_names: Union[List[str], None] = None,
         return_raw: bool = False,
         timezone: Union[str, None] = "Asia/Shanghai",
+        chunksize: Union[int, None] = None,
+        flatten: bool = True,
+        validate: bool = True,
         timeout: Union[httpx.Timeout, None] = None,
-    ) -> Union[dict, pd.DataFrame]:
+    ) -> Union[dict, pd.DataFrame, AsyncIterator[Union[dict, pd.DataFrame]]]:
         """从多维表格中读取数据
 
         Args:
@@ -92,48 +404,463 @@ class AsyncBiTable(AsyncAPIResource):
             field_names (Union[List[str], None], optional): 读取的列名. Defaults to None.
             raw (bool, optional): 是否返回原始数据. Defaults to False.
             timezone (Union[str, None], optional): 时区，仅在raw=False时有效. Defaults to "Asia/Shanghai".
+            chunksize (Union[int, None], optional): 指定时返回异步迭代器，每次产出最多 chunksize 行，\
+                各分块的列和类型一致. Defaults to None.
+            flatten (bool, optional): 是否将多选、人员等多值字段拼接为字符串，否则为列表. Defaults to True.
+            validate (bool, optional): 为 False 时跳过记录的模型校验，直接从原始 JSON 转换，\
+                raw=True 时 items 为原始 JSON. Defaults to True.
 
         Returns:
-            Union[dict, pd.DataFrame]: 当raw=True时返回原始数据，否则返回DataFrame\
+            Union[dict, pd.DataFrame, AsyncIterator[Union[dict, pd.DataFrame]]]: \
+                当raw=True时返回原始数据，否则返回DataFrame\
                 返回的 dataframe 的 index 为对应记录的 record id
         """
-        info = await self.get_bitable_info(url)
+        fields = await self._list_fields(url, field_names, timeout)
+        if chunksize is not None:
+            return self._read_chunks(
+                url,
+                fields,
+                chunksize=chunksize,
+                rows=rows,
+                field_names=field_names,
+                return_raw=return_raw,
+                timezone=timezone,
+                flatten=flatten,
+                validate=validate,
+                timeout=timeout,
+            )
+        items: List[Union[RecordResponseData, Dict[str, Any]]] = [
+            item
+            async for item in self.iter_records(
+                url, rows=rows, field_names=field_names, validate=validate, timeout=timeout
+            )
+        ]
 
-        items: List[RecordResponseData] = []
-        has_more: bool = True
-        page_token: str = None
-        if rows is None or rows > self.record.MAX_RECORDS_PER_REQUEST:
-            page_size = self.record.MAX_RECORDS_PER_REQUEST
+        if return_raw:
+            return {"items": items, "fields": fields}
         else:
-            page_size = rows
+            return fields_records_to_dataframe(fields, items, timezone=timezone, flatten=flatten)
 
-        def is_continue():
-            return has_more and (rows is None or len(items) < rows)
+    async def _read_chunks(
+        self,
+        url: str,
+        fields: List[Field],
+        *,
+        chunksize: int,
+        rows: Union[int, None],
+        field_names: Union[List[str], None],
+        return_raw: bool,
+        timezone: Union[str, None],
+        flatten: bool,
+        validate: bool,
+        timeout: Union[httpx.Timeout, None],
+    ) -> AsyncIterator[Union[dict, pd.DataFrame]]:
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        utcoffset = timezone_offset(timezone)
+
+        def make_chunk(
+            items: List[Union[RecordResponseData, Dict[str, Any]]],
+        ) -> Union[dict, pd.DataFrame]:
+            if return_raw:
+                return {"items": items, "fields": fields}
+            return fields_records_to_dataframe(fields, items, utcoffset=utcoffset, flatten=flatten)
+
+        items: List[Union[RecordResponseData, Dict[str, Any]]] = []
+        records = self.iter_records(
+            url, rows=rows, field_names=field_names, validate=validate, timeout=timeout
+        )
+        try:
+            async for item in records:
+                items.append(item)
+                if len(items) >= chunksize:
+                    yield make_chunk(items)
+                    items = []
+        finally:
+            await records.aclose()
+        if items:
+            yield make_chunk(items)
+
+    async def read_columns(
+        self,
+        url: str,
+        *,
+        rows: Union[int, None] = None,
+        field_names: Union[List[str], None] = None,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        flatten: bool = True,
+        arrow: bool = False,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> Union[Dict[str, List[Any]], "pa.Table"]:
+        """按列读取多维表格，每页的原始 JSON 直接转换为列，不构建模型实例和中间 DataFrame。
+
+        各列类型规则同 `read`，第一列为 record_id。
+
+        Args:
+            url (str): 多维表格分享链接
+            rows (Union[int, None], optional): 读取的行数. Defaults to None.
+            field_names (Union[List[str], None], optional): 读取的列名. Defaults to None.
+            timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+            flatten (bool, optional): 是否将多值字段拼接为字符串. Defaults to True.
+            arrow (bool, optional): 是否返回 pyarrow.Table，否则返回列名到列表的映射. Defaults to False.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            ImportError: arrow=True 但未安装 pyarrow
 
-        fields = (
-            await self.field.list(app_token=info.app_token, table_id=info.table_id)
-        ).data.items
+        Returns:
+            Union[Dict[str, List[Any]], pa.Table]: 列名到列数据的映射，或 pyarrow.Table
+        """
+        if arrow:
+            return await self.export_arrow(
+                url,
+                rows=rows,
+                field_names=field_names,
+                timezone=timezone,
+                flatten=flatten,
+                timeout=timeout,
+            )
+        fields = await self._list_fields(url, field_names, timeout)
+        utcoffset = timezone_offset(timezone)
+
+        count = 0
+        buffers: Dict[str, List[Any]] = {"record_id": []}
+        pages = self._iter_raw_pages(url, rows, field_names, timeout)
+        try:
+            async for items in pages:
+                columns = records_to_columns(fields, items, utcoffset=utcoffset, flatten=flatten)
+                buffers["record_id"].extend(item.get("record_id") for item in items)
+                for name, column in columns.items():
+                    # 不在 fields 中的字段可能只出现在部分页中，之前的行填充为空值
+                    buffers.setdefault(name, [None] * count).extend(pd.Series(column).tolist())
+                count += len(items)
+                for buffer in buffers.values():
+                    buffer.extend([None] * (count - len(buffer)))
+        finally:
+            await pages.aclose()
+        return buffers
+
+    async def _list_fields(
+        self,
+        url: str,
+        field_names: Union[List[str], None],
+        timeout: Union[httpx.Timeout, None],
+    ) -> List[Field]:
+        info = await self.get_bitable_info(url)
+        fields = await self.field.list_all(info.app_token, table_id=info.table_id, timeout=timeout)
         if field_names is not None:
             fields = [field for field in fields if field.field_name in field_names]
-        while is_continue():
-            response = await self.record.search(
+        return fields
+
+    async def _iter_raw_pages(
+        self,
+        url: str,
+        rows: Union[int, None],
+        field_names: Union[List[str], None],
+        timeout: Union[httpx.Timeout, None],
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """逐页产出未经校验的记录，最多 rows 条"""
+        count = 0
+        page_size = None if rows is None else min(rows, self.record.MAX_RECORDS_PER_REQUEST)
+        pages = self.iter_pages(
+            url, field_names=field_names, page_size=page_size, validate=False, timeout=timeout
+        )
+        try:
+            async for page in pages:
+                items = page.get("items") or []
+                if rows is not None:
+                    items = items[: rows - count]
+                count += len(items)
+                yield items
+                if rows is not None and count >= rows:
+                    return
+        finally:
+            await pages.aclose()
+
+    async def iter_arrow(
+        self,
+        url: str,
+        *,
+        rows: Union[int, None] = None,
+        field_names: Union[List[str], None] = None,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        flatten: bool = True,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> AsyncIterator["pa.Table"]:
+        """逐页读取多维表格并转为 pyarrow.Table，各页的 schema 相同，参数同 `read_columns`
+
+        Raises:
+            ImportError: 未安装 pyarrow
+
+        Yields:
+            pa.Table: 每一页的记录，第一列为 record_id
+        """
+        require_pyarrow()
+        fields = await self._list_fields(url, field_names, timeout)
+        utcoffset = timezone_offset(timezone)
+        pages = self._iter_raw_pages(url, rows, field_names, timeout)
+        try:
+            async for items in pages:
+                yield records_to_arrow(fields, items, utcoffset=utcoffset, flatten=flatten)
+        finally:
+            await pages.aclose()
+
+    async def export_arrow(
+        self,
+        url: str,
+        *,
+        rows: Union[int, None] = None,
+        field_names: Union[List[str], None] = None,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        flatten: bool = True,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> "pa.Table":
+        """读取多维表格为 pyarrow.Table，参数同 `read_columns`
+
+        Raises:
+            ImportError: 未安装 pyarrow
+
+        Returns:
+            pa.Table: 第一列为 record_id，各列类型由字段类型决定
+        """
+        require_pyarrow()
+        fields = await self._list_fields(url, field_names, timeout)
+        tables = [
+            table
+            async for table in self.iter_arrow(
+                url,
+                rows=rows,
+                field_names=field_names,
+                timezone=timezone,
+                flatten=flatten,
+                timeout=timeout,
+            )
+        ]
+        if not tables:
+            return arrow_schema(fields, flatten).empty_table()
+        return pa.concat_tables(tables)
+
+    async def export_parquet(
+        self,
+        url: str,
+        path: Union[str, os.PathLike],
+        *,
+        field_names: Union[List[str], None] = None,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        flatten: bool = True,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = "snappy",
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> int:
+        """将多维表格导出为 Parquet 文件，逐页读取并按 row group 写入，内存占用与表格大小无关。
+
+        先写入临时文件，导出完成后再重命名为 path，中断时不会留下不完整的文件。
+
+        Args:
+            url (str): 多维表格分享链接
+            path (Union[str, os.PathLike]): Parquet 文件路径
+            field_names (Union[List[str], None], optional): 导出的列名. Defaults to None.
+            timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+            flatten (bool, optional): 是否将多值字段拼接为字符串. Defaults to True.
+            row_group_size (int, optional): 每个 row group 的行数. Defaults to DEFAULT_ROW_GROUP_SIZE.
+            compression (str, optional): 压缩算法. Defaults to "snappy".
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            ImportError: 未安装 pyarrow
+
+        Returns:
+            int: 导出的行数
+        """
+        require_pyarrow()
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be at least 1")
+        fields = await self._list_fields(url, field_names, timeout)
+        schema = arrow_schema(fields, flatten)
+
+        count = 0
+        pending: List["pa.Table"] = []
+        pending_rows = 0
+        part = f"{os.fspath(path)}.part"
+        writer = pq.ParquetWriter(part, schema, compression=compression)
+        completed = False
+        tables = self.iter_arrow(
+            url, field_names=field_names, timezone=timezone, flatten=flatten, timeout=timeout
+        )
+        try:
+            async for table in tables:
+                pending.append(table)
+                pending_rows += table.num_rows
+                if pending_rows >= row_group_size:
+                    await anyio.to_thread.run_sync(
+                        writer.write_table, pa.concat_tables(pending), row_group_size
+                    )
+                    count += pending_rows
+                    pending, pending_rows = [], 0
+            if pending:
+                await anyio.to_thread.run_sync(
+                    writer.write_table, pa.concat_tables(pending), row_group_size
+                )
+                count += pending_rows
+            completed = True
+        finally:
+            writer.close()
+            if completed:
+                os.replace(part, path)
+            elif os.path.exists(part):
+                os.unlink(part)
+            await tables.aclose()
+        return count
+
+    async def import_arrow(
+        self,
+        data: "pa.Table",
+        url: str,
+        *,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        concurrency: int = 1,
+        journal: Union[str, os.PathLike, None] = None,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> int:
+        """将 pyarrow.Table 追加到多维表格，列名为字段名，record_id 列会被忽略
+
+        Args:
+            data (pa.Table): 要追加的数据
+            url (str): 多维表格分享链接
+            timezone (Union[str, None], optional): 没有时区的时间戳所在的时区. Defaults to "Asia/Shanghai".
+            concurrency (int, optional): 并发写入的分块数，每块最多 500 条记录. Defaults to 1.
+            journal (Union[str, os.PathLike, None], optional): 写入日志文件路径，中断后以相同的数据和 \
+                journal 重新调用时跳过已完成的分块，参见 `WriteJournal`. Defaults to None.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            ImportError: 未安装 pyarrow
+            BatchOperationError: 部分分块写入失败
+            ValueError: 数据与 journal 中已完成的分块不一致
+
+        Returns:
+            int: 追加的行数，包括之前已完成的分块
+        """
+        require_pyarrow()
+        info = await self.get_bitable_info(url)
+        utcoffset = timezone_offset(timezone)
+        write_journal = None if journal is None else WriteJournal(journal, url)
+        batch_rows = self.record.MAX_RECORDS_PER_REQUEST * concurrency
+        count = 0
+        for batch in data.to_batches(max_chunksize=batch_rows):
+            records = arrow_to_records(batch, utcoffset)
+            await self._create_chunks(
+                info,
+                self._pack(records),
+                concurrency=concurrency,
+                timeout=timeout,
+                journal=write_journal,
+            )
+            count += len(records)
+        return count
+
+    async def import_parquet(
+        self,
+        path: Union[str, os.PathLike],
+        url: str,
+        *,
+        columns: Union[List[str], None] = None,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        concurrency: int = 1,
+        journal: Union[str, os.PathLike, None] = None,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> int:
+        """将 Parquet 文件追加到多维表格，按批读取文件并并发写入，内存占用与文件大小无关。
+
+        写入失败时之前的批次不会回滚，BatchOperationError 中的行号相对于失败的批次。
+
+        Args:
+            path (Union[str, os.PathLike]): Parquet 文件路径
+            url (str): 多维表格分享链接
+            columns (Union[List[str], None], optional): 导入的列，默认导入全部列. Defaults to None.
+            timezone (Union[str, None], optional): 没有时区的时间戳所在的时区. Defaults to "Asia/Shanghai".
+            concurrency (int, optional): 并发写入的分块数，每块最多 500 条记录. Defaults to 1.
+            journal (Union[str, os.PathLike, None], optional): 写入日志文件路径，中断后以相同的数据和 \
+                journal 重新调用时跳过已完成的分块，参见 `WriteJournal`. Defaults to None.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            ImportError: 未安装 pyarrow
+            BatchOperationError: 部分分块写入失败
+            ValueError: 数据与 journal 中已完成的分块不一致
+
+        Returns:
+            int: 追加的行数，包括之前已完成的分块
+        """
+        require_pyarrow()
+        info = await self.get_bitable_info(url)
+        utcoffset = timezone_offset(timezone)
+        write_journal = None if journal is None else WriteJournal(journal, url)
+        file = pq.ParquetFile(path)
+        batches = file.iter_batches(
+            batch_size=self.record.MAX_RECORDS_PER_REQUEST * concurrency, columns=columns
+        )
+        count = 0
+        try:
+            while True:
+                batch = await anyio.to_thread.run_sync(next, batches, None)
+                if batch is None:
+                    break
+                records = arrow_to_records(batch, utcoffset)
+                await self._create_chunks(
+                    info,
+                    self._pack(records),
+                    concurrency=concurrency,
+                    timeout=timeout,
+                    journal=write_journal,
+                )
+                count += len(records)
+        finally:
+            file.close()
+        return count
+
+    def _pack(self, records: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """按单次请求的记录数和请求体大小限制将记录分块"""
+        return pack(
+            records,
+            max_items=self.record.MAX_RECORDS_PER_REQUEST,
+            max_bytes=self.record.MAX_BYTES_PER_REQUEST,
+        )
+
+    async def _create_chunks(
+        self,
+        info: BitableInfo,
+        chunks: Iterable[Sequence[Dict[str, Any]]],
+        *,
+        concurrency: int,
+        timeout: Union[httpx.Timeout, None],
+        journal: Union[WriteJournal, None] = None,
+    ) -> List[RecordResponseData]:
+        async def create(chunk: Sequence[dict]) -> List[RecordResponseData]:
+            if isinstance(chunk, JournalChunk) and chunk.done:
+                return []
+            if isinstance(chunk, JournalChunk) and chunk.was_split:
+                raise ChunkSplit(chunk.key)
+            response = await self.record.batch_create(
                 app_token=info.app_token,
                 table_id=info.table_id,
-                view_id=info.view_id,
-                field_names=field_names,
-                page_token=page_token,
-                page_size=page_size,
+                records=list(chunk),
+                client_token=chunk.token if isinstance(chunk, JournalChunk) else None,
                 timeout=timeout,
             )
-            has_more = response.data.has_more
-            page_token = response.data.page_token
-            items.extend(response.data.items)
+            if isinstance(chunk, JournalChunk):
+                journal.commit(chunk)
+            return response.data.records
 
-        items = items[:rows] if rows else items
-        if return_raw:
-            return {"items": items, "fields": fields}
-        else:
-            return fields_records_to_dataframe(fields, items, timezone=timezone)
+        def split(chunk: Sequence[dict], e: Exception) -> Union[List[Sequence[dict]], None]:
+            if not isinstance(e, ChunkSplit) and not _is_payload_too_large(e):
+                return None
+            return journal.split(chunk) if isinstance(chunk, JournalChunk) else halve(chunk)
+
+        if journal is not None:
+            chunks = journal.track(chunks)
+        results = await run_chunks(chunks, create, concurrency=concurrency, split=split)
+        return [record for chunk in results for record in chunk]
 
     async def append(
         self,
@@ -141,31 +868,47 @@ class AsyncBiTable(AsyncAPIResource):
         *,
         data: pd.DataFrame,
         timezone: Union[str, None] = "Asia/Shanghai",
+        concurrency: int = 1,
+        journal: Union[str, os.PathLike, None] = None,
         timeout: Union[httpx.Timeout, None] = None,
     ) -> List[RecordResponseData]:
-        """向多维表格中追加数据
+        """向多维表格中追加数据，按字段类型逐块编码 data（参见 `iter_record_chunks`），不修改 data
 
         Args:
             url (str): 多维表格分享链接
             data (pd.DataFrame): 要追加的数据
             timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+            concurrency (int, optional): 并发写入的分块数，每块最多 500 条记录. Defaults to 1.
+            journal (Union[str, os.PathLike, None], optional): 写入日志文件路径，中断后以相同的 data 和 \
+                journal 重新调用时跳过已完成的分块，参见 `WriteJournal`. Defaults to None.
             timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
 
+        Raises:
+            BatchOperationError: 部分分块写入失败，`report` 中包含各分块的结果
+            ValueError: data 与 journal 中已完成的分块不一致
+
         Returns:
-            List[RecordResponseData]: 追加的数据
+            List[RecordResponseData]: 追加的数据，顺序与输入一致，不包括之前已完成的分块
         """
         info = await self.get_bitable_info(url)
-        records = dataframe_to_records(data, timezone=timezone)
-        response_records: List[RecordResponseData] = []
-        for i in range(0, len(records), self.record.MAX_RECORDS_PER_REQUEST):
-            response = await self.record.batch_create(
-                app_token=info.app_token,
-                table_id=info.table_id,
-                records=records[i : i + self.record.MAX_RECORDS_PER_REQUEST],
-                timeout=timeout,
+        fields = await self._list_fields(url, None, timeout)
+        chunks = self._pack(
+            itertools.chain.from_iterable(
+                iter_record_chunks(
+                    data,
+                    fields,
+                    timezone=timezone,
+                    chunk_size=self.record.MAX_RECORDS_PER_REQUEST,
+                )
             )
-            response_records.extend(response.data.records)
-        return response_records
+        )
+        return await self._create_chunks(
+            info,
+            chunks,
+            concurrency=concurrency,
+            timeout=timeout,
+            journal=None if journal is None else WriteJournal(journal, url),
+        )
 
     async def update(
         self,
@@ -173,50 +916,635 @@ class AsyncBiTable(AsyncAPIResource):
         *,
         data: pd.DataFrame,
         timezone: Union[str, None] = "Asia/Shanghai",
+        concurrency: int = 1,
         timeout: Union[httpx.Timeout, None] = None,
     ):
-        """更新多维表格中的数据
+        """更新多维表格中的数据，按字段类型逐块编码 data（参见 `iter_record_chunks`），不修改 data
 
         Args:
             url (str): 多维表格分享链接
             data (pd.DataFrame): 要更新的数据，index 为更新记录的 record id
             timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+            concurrency (int, optional): 并发更新的分块数，每块最多 500 条记录. Defaults to 1.
             timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
 
+        Raises:
+            BatchOperationError: 部分分块更新失败，`report` 中包含各分块的结果
+
         Returns:
-            List[RecordResponseData]: 更新的数据
+            List[RecordResponseData]: 更新的数据，顺序与输入一致
         """
         info = await self.get_bitable_info(url)
-        records = dataframe_to_records(data, timezone=timezone, use_index_as_record_id=True)
-        response_records: List[RecordResponseData] = []
-        for i in range(0, len(records), self.record.MAX_RECORDS_PER_REQUEST):
+        fields = await self._list_fields(url, None, timeout)
+        chunks = self._pack(
+            itertools.chain.from_iterable(
+                iter_record_chunks(
+                    data,
+                    fields,
+                    timezone=timezone,
+                    chunk_size=self.record.MAX_RECORDS_PER_REQUEST,
+                    use_index_as_record_id=True,
+                )
+            )
+        )
+        return await self._update_chunks(info, chunks, concurrency=concurrency, timeout=timeout)
+
+    async def _update_chunks(
+        self,
+        info: BitableInfo,
+        chunks: Iterable[Sequence[Dict[str, Any]]],
+        *,
+        concurrency: int,
+        timeout: Union[httpx.Timeout, None],
+    ) -> List[RecordResponseData]:
+        async def update(chunk: Sequence[dict]) -> List[RecordResponseData]:
             response = await self.record.batch_update(
                 app_token=info.app_token,
                 table_id=info.table_id,
-                records=records[i : i + self.record.MAX_RECORDS_PER_REQUEST],
+                records=list(chunk),
                 timeout=timeout,
             )
-            response_records.extend(response.data.records)
-        return response_records
+            return response.data.records
+
+        def split(chunk: Sequence[dict], e: Exception) -> Union[List[Sequence[dict]], None]:
+            return halve(chunk) if _is_payload_too_large(e) else None
+
+        results = await run_chunks(chunks, update, concurrency=concurrency, split=split)
+        return [record for chunk in results for record in chunk]
 
     async def delete(
-        self, url: str, *, record_ids: List[str], timeout: Union[httpx.Timeout, None] = None
+        self,
+        url: str,
+        *,
+        record_ids: List[str],
+        concurrency: int = 1,
+        timeout: Union[httpx.Timeout, None] = None,
     ) -> None:
         """删除多维表格中的数据
 
         Args:
             url (str): 多维表格分享链接
             record_ids (List[str]): 要删除的记录ID
+            concurrency (int, optional): 并发删除的分块数，每块最多 500 条记录. Defaults to 1.
             timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            BatchOperationError: 部分分块删除失败，`report` 中包含各分块的结果
         """
         info = await self.get_bitable_info(url)
-        delete_response = []
-        for i in range(0, len(record_ids), self.record.MAX_RECORDS_PER_REQUEST):
+        return await self._delete_records(
+            info, record_ids, concurrency=concurrency, timeout=timeout
+        )
+
+    async def _delete_records(
+        self,
+        info: BitableInfo,
+        record_ids: List[str],
+        *,
+        concurrency: int,
+        timeout: Union[httpx.Timeout, None],
+    ):
+        async def delete(chunk: Sequence[str]):
             response = await self.record.batch_delete(
                 app_token=info.app_token,
                 table_id=info.table_id,
-                record_ids=record_ids[i : i + self.record.MAX_RECORDS_PER_REQUEST],
+                record_ids=list(chunk),
                 timeout=timeout,
             )
-            delete_response.extend(response.data.records)
-        return delete_response
+            return response.data.records
+
+        results = await run_in_chunks(
+            record_ids,
+            delete,
+            chunk_size=self.record.MAX_RECORDS_PER_REQUEST,
+            concurrency=concurrency,
+        )
+        return [record for chunk in results for record in chunk]
+
+    async def upsert(
+        self,
+        url: str,
+        *,
+        data: pd.DataFrame,
+        key: Union[str, List[str]],
+        delete_orphans: bool = False,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        concurrency: int = 1,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> UpsertResult:
+        """按主键将 DataFrame 同步到多维表格，只写入有变化的记录。
+
+        data 按字段类型编码（参见 `iter_record_chunks`），数据表中的记录转为相同的写入格式后比较，
+        只读取 data 中的列。主键不存在的行新增，取值有变化的行更新，没有变化的行跳过；
+        data 中的空值不写入也不参与比较，空文本、空列表和未勾选的复选框与数据表中缺失的值视为相同。
+        数据表中主键不在 data 里的记录视为孤儿记录，
+        delete_orphans=True 时删除。数据表中主键重复的记录只保留第一条，其余视为孤儿记录。
+
+        Args:
+            url (str): 多维表格分享链接
+            data (pd.DataFrame): 要同步的数据，列名为字段名
+            key (Union[str, List[str]]): 主键列，可以是多列
+            delete_orphans (bool, optional): 是否删除孤儿记录. Defaults to False.
+            timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+            concurrency (int, optional): 并发写入的分块数，每块最多 500 条记录. Defaults to 1.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            ValueError: 主键列不在 data 中，或 data 中主键重复
+            BatchOperationError: 部分分块写入失败
+
+        Returns:
+            UpsertResult: 新增、更新、跳过和删除的记录数
+        """
+        keys = [key] if isinstance(key, str) else list(key)
+        columns = [str(column) for column in data.columns]
+        missing = [column for column in keys if column not in columns]
+        if missing:
+            raise ValueError(f"Key columns not in data: {missing}")
+
+        def key_of(record: Dict[str, Any]) -> str:
+            return json.dumps(
+                [record.get(column) for column in keys], ensure_ascii=False, default=str
+            )
+
+        info = await self.get_bitable_info(url)
+        fields = await self._list_fields(url, columns, timeout)
+        schema = {field_.field_name: field_ for field_ in fields}
+        records = dataframe_to_json_records(data, timezone=timezone, fields=fields)
+        # 空文本、空列表和未勾选的复选框与缺失的值比较时视为相同
+        compared = [
+            {
+                column: comparable_value(schema.get(column), value)
+                for column, value in record.items()
+            }
+            for record in records
+        ]
+        incoming: Dict[str, int] = {}
+        for index, record in enumerate(compared):
+            record_key = key_of(record)
+            if record_key in incoming:
+                raise ValueError(f"Duplicate key in data: {record_key}")
+            incoming[record_key] = index
+
+        matched: Dict[str, int] = {}
+        updates: List[Dict[str, Any]] = []
+        orphans: List[str] = []
+        pages = self._iter_raw_pages(url, None, columns, timeout)
+        try:
+            async for items in pages:
+                for item in items:
+                    values = item.get("fields") or {}
+                    existing = {
+                        field_.field_name: comparable_value(
+                            field_,
+                            normalize_value(write_value(field_, values.get(field_.field_name))),
+                        )
+                        for field_ in fields
+                    }
+                    record_key = key_of(existing)
+                    index = incoming.get(record_key)
+                    if index is None or record_key in matched:
+                        orphans.append(item["record_id"])
+                        continue
+                    matched[record_key] = index
+                    if any(
+                        value is not None and existing.get(column) != compared[index][column]
+                        for column, value in records[index].items()
+                    ):
+                        updates.append(
+                            {"record_id": item["record_id"], "fields": _non_null(records[index])}
+                        )
+        finally:
+            await pages.aclose()
+
+        creates = [
+            _non_null(records[index])
+            for record_key, index in incoming.items()
+            if record_key not in matched
+        ]
+        result = UpsertResult(
+            created=len(creates),
+            updated=len(updates),
+            unchanged=len(matched) - len(updates),
+            orphaned=len(orphans),
+        )
+        if creates:
+            await self._create_chunks(
+                info,
+                self._pack(creates),
+                concurrency=concurrency,
+                timeout=timeout,
+            )
+        if updates:
+            await self._update_chunks(
+                info,
+                self._pack(updates),
+                concurrency=concurrency,
+                timeout=timeout,
+            )
+        if delete_orphans and orphans:
+            await self._delete_records(info, orphans, concurrency=concurrency, timeout=timeout)
+            result.deleted = len(orphans)
+        return result
+
+    async def copy_table(
+        self,
+        src_url: str,
+        dst_url: str,
+        *,
+        transform: Union[Callable[[Dict[str, Any]], Union[Dict[str, Any], None]], None] = None,
+        field_names: Union[List[str], None] = None,
+        user_map: Union[Dict[str, str], None] = None,
+        record_map: Union[Dict[str, str], None] = None,
+        concurrency: int = 2,
+        buffer: int = 4,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> CopyResult:
+        """将数据表复制到另一个数据表，可以跨多维表格。
+
+        读取源表、转换字段值、写入目标表三个阶段同时进行，阶段之间通过容量为 buffer 的队列连接，
+        内存中最多只有 buffer 页待转换的记录、buffer 个待写入的分块和 concurrency 个写入中的分块。
+
+        目标表没有记录时，按源表创建目标表中缺少的字段，目标表的索引列改为源表的索引列；
+        公式、查找引用字段不会创建。只复制两个表中同名的字段，自动计算的字段和附件不复制。
+
+        人员字段按 user_map 转换 ID。关联字段在全部记录写入后按新的 record_id 回填，
+        关联到源表自身的记录若未被复制则忽略，关联到其他数据表的记录按 record_map 转换。
+
+        Args:
+            src_url (str): 源多维表格分享链接，包含 view 时只复制该视图下的记录
+            dst_url (str): 目标多维表格分享链接
+            transform (Union[Callable[[Dict[str, Any]], Union[Dict[str, Any], None]], None], optional): \
+                写入前处理每条记录的字段（写入接口的格式，不含关联字段），返回 None 跳过该记录. Defaults to None.
+            field_names (Union[List[str], None], optional): 复制的字段，默认复制全部字段. Defaults to None.
+            user_map (Union[Dict[str, str], None], optional): 源人员 ID 到目标人员 ID 的映射. Defaults to None.
+            record_map (Union[Dict[str, str], None], optional): 已复制的其他数据表的 record_id 映射，\
+                如之前 `copy_table` 返回的 `record_ids`. Defaults to None.
+            concurrency (int, optional): 并发写入的分块数. Defaults to 2.
+            buffer (int, optional): 阶段之间队列的容量. Defaults to 4.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            BatchOperationError: 写入失败，之前写入的记录不会回滚
+
+        Returns:
+            CopyResult: 复制的结果
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        src_info = await self.get_bitable_info(src_url)
+        dst_info = await self.get_bitable_info(dst_url)
+        src_fields = await self._list_fields(src_url, field_names, timeout)
+        result = CopyResult()
+        dst_fields = await self._prepare_copy_fields(
+            src_info, src_fields, dst_info, result, timeout=timeout
+        )
+        dst_names = {
+            field_.field_name
+            for field_ in dst_fields
+            if field_ui_type(field_) not in UNCOPIED_VALUE_UI_TYPES
+        }
+        value_fields = [
+            field_
+            for field_ in src_fields
+            if field_.field_name in dst_names and field_ui_type(field_) not in LINK_UI_TYPES
+        ]
+        link_fields = [
+            field_
+            for field_ in src_fields
+            if field_.field_name in dst_names and field_ui_type(field_) in LINK_UI_TYPES
+        ]
+        # 关联字段的源记录 ID，在全部记录写入后回填
+        links: List[Tuple[str, Dict[str, List[str]]]] = []
+
+        send_pages, receive_pages = anyio.create_memory_object_stream(buffer)
+        send_chunks, receive_chunks = anyio.create_memory_object_stream(buffer)
+        errors: List[Exception] = []
+
+        async def read() -> None:
+            async with send_pages:
+                pages = self._iter_raw_pages(
+                    src_url, None, [field_.field_name for field_ in src_fields], timeout
+                )
+                try:
+                    async for items in pages:
+                        await send_pages.send(items)
+                finally:
+                    await pages.aclose()
+
+        async def convert() -> None:
+            async with send_chunks, receive_pages:
+                async for items in receive_pages:
+                    source_ids: List[str] = []
+                    records: List[Dict[str, Any]] = []
+                    for item in items:
+                        values = item.get("fields") or {}
+                        record = {}
+                        for field_ in value_fields:
+                            value = copy_value(field_, values.get(field_.field_name), user_map)
+                            if value is not None:
+                                record[field_.field_name] = value
+                        if transform is not None:
+                            record = transform(record)
+                            if record is None:
+                                result.skipped += 1
+                                continue
+                        linked = {
+                            field_.field_name: link_record_ids(values.get(field_.field_name))
+                            for field_ in link_fields
+                        }
+                        linked = {name: ids for name, ids in linked.items() if ids}
+                        if linked:
+                            links.append((item["record_id"], linked))
+                        source_ids.append(item["record_id"])
+                        records.append(record)
+                    start = 0
+                    for chunk in self._pack(records):
+                        await send_chunks.send((source_ids[start : start + len(chunk)], chunk))
+                        start += len(chunk)
+
+        async def write() -> None:
+            async with receive_chunks.clone() as receive:
+                async for source_ids, chunk in receive:
+                    created = await self._create_chunks(
+                        dst_info, [chunk], concurrency=1, timeout=timeout
+                    )
+                    for source_id, record in zip(source_ids, created):
+                        result.record_ids[source_id] = record.record_id
+                    result.copied += len(created)
+
+        async def stage(func: Callable[[], Awaitable[None]]) -> None:
+            try:
+                await func()
+            except Exception as e:
+                # 任一阶段失败时停止其他阶段，抛出原始异常
+                errors.append(e)
+                tg.cancel_scope.cancel()
+
+        async with receive_chunks:
+            async with anyio.create_task_group() as tg:
+                for _ in range(concurrency):
+                    tg.start_soon(stage, write)
+                tg.start_soon(stage, convert)
+                tg.start_soon(stage, read)
+        if errors:
+            raise errors[0]
+
+        self_linked = {
+            field_.field_name
+            for field_ in link_fields
+            if _get(field_.property, "table_id") == src_info.table_id
+        }
+        updates = []
+        for source_id, linked in links:
+            fields: Dict[str, List[str]] = {}
+            for name, ids in linked.items():
+                if name in self_linked:
+                    fields[name] = [
+                        result.record_ids[id_] for id_ in ids if id_ in result.record_ids
+                    ]
+                else:
+                    fields[name] = [(record_map or {}).get(id_, id_) for id_ in ids]
+            updates.append({"record_id": result.record_ids[source_id], "fields": fields})
+        if updates:
+            await self._update_chunks(
+                dst_info, self._pack(updates), concurrency=concurrency, timeout=timeout
+            )
+            result.linked = len(updates)
+        return result
+
+    async def _prepare_copy_fields(
+        self,
+        src_info: BitableInfo,
+        src_fields: List[Field],
+        dst_info: BitableInfo,
+        result: CopyResult,
+        *,
+        timeout: Union[httpx.Timeout, None],
+    ) -> List[Field]:
+        """目标表没有记录时按源表创建缺少的字段，返回目标表的字段"""
+        list_fields = functools.partial(
+            self.field.list_all, dst_info.app_token, table_id=dst_info.table_id, timeout=timeout
+        )
+        dst_fields = await list_fields()
+        response = await self.record.search(
+            app_token=dst_info.app_token,
+            table_id=dst_info.table_id,
+            page_size=1,
+            validate=False,
+            timeout=timeout,
+        )
+        if response["data"].get("items"):
+            return dst_fields
+
+        same_app = src_info.app_token == dst_info.app_token
+        src_primary = next((field_ for field_ in src_fields if field_.is_primary), None)
+        dst_primary = next((field_ for field_ in dst_fields if field_.is_primary), None)
+        names = {field_.field_name for field_ in dst_fields}
+        if (
+            src_primary is not None
+            and dst_primary is not None
+            and src_primary.field_name not in names
+        ):
+            spec = field_spec(src_primary, src_info.table_id, dst_info.table_id, same_app)
+            if spec is not None:
+                await self.field.update(
+                    dst_info.app_token,
+                    table_id=dst_info.table_id,
+                    field_id=dst_primary.field_id,
+                    timeout=timeout,
+                    **spec,
+                )
+                result.created_fields.append(src_primary.field_name)
+                dst_fields = await list_fields()
+                names = {field_.field_name for field_ in dst_fields}
+        for field_ in src_fields:
+            if field_.field_name in names:
+                continue
+            spec = field_spec(field_, src_info.table_id, dst_info.table_id, same_app)
+            if spec is None:
+                logger.warning(
+                    f"Field {field_.field_name} can not be created in {dst_info.table_id}"
+                )
+                continue
+            await self.field.create(
+                dst_info.app_token, table_id=dst_info.table_id, timeout=timeout, **spec
+            )
+            result.created_fields.append(field_.field_name)
+            # 双向关联字段会同时创建关联表中的字段
+            dst_fields = await list_fields()
+            names = {field_.field_name for field_ in dst_fields}
+        return dst_fields
+
+    async def download_attachments(
+        self,
+        url: str,
+        *,
+        dest: Union[str, os.PathLike],
+        field: Union[str, List[str], None] = None,
+        concurrency: int = 8,
+        manifest: Union[str, None] = "manifest.json",
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> List[AttachmentDownload]:
+        """并发下载多维表格中的附件。
+
+        逐页读取记录，按 file_token 去重后交给 concurrency 个下载任务流式写入 dest，
+        文件名为 `{file_token}_{附件名称}`。已存在且大小一致的文件跳过；附件没有返回大小时，
+        只跳过之前的 manifest 中已完成下载的文件。单个附件下载失败不会中断其他下载，
+        结果写入 dest 下的 manifest 文件，读取记录出错或被取消时同样写入。
+
+        Args:
+            url (str): 多维表格分享链接
+            dest (Union[str, os.PathLike]): 保存目录
+            field (Union[str, List[str], None], optional): 附件字段，默认为全部附件字段. Defaults to None.
+            concurrency (int, optional): 并发下载数. Defaults to 8.
+            manifest (Union[str, None], optional): 清单文件名，为 None 时不写入. Defaults to "manifest.json".
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Raises:
+            LarkException: 读取记录失败
+
+        Returns:
+            List[AttachmentDownload]: 各附件的下载结果，顺序与首次出现的顺序一致
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        fields = await self._list_fields(url, None, timeout)
+        attachment_fields = [
+            field_.field_name
+            for field_ in fields
+            if field_ui_type(field_) == UIType.ATTACHMENT.value
+        ]
+        if field is not None:
+            names = [field] if isinstance(field, str) else list(field)
+            unknown = [name for name in names if name not in attachment_fields]
+            if unknown:
+                raise ValueError(f"Not attachment fields: {unknown}")
+            attachment_fields = names
+        dest = anyio.Path(dest)
+        await dest.mkdir(parents=True, exist_ok=True)
+        finished = await _finished_downloads(dest / manifest) if manifest is not None else {}
+
+        downloads: Dict[str, AttachmentDownload] = {}
+        send_stream, receive_stream = anyio.create_memory_object_stream(concurrency)
+
+        async def download(item: AttachmentDownload) -> None:
+            path = anyio.Path(item.path)
+            try:
+                if await path.exists():
+                    if item.size is not None:
+                        complete = (await path.stat()).st_size == item.size
+                    else:
+                        complete = finished.get(item.file_token, {}).get("path") == item.path
+                    if complete:
+                        item.status = "skipped"
+                        return
+                await self._client.assets.download_to(item.file_token, path, timeout=timeout)
+                item.status = "downloaded"
+            except Exception as e:
+                logger.warning(f"Failed to download attachment {item.file_token}: {e}")
+                item.status, item.error = "failed", str(e)
+
+        async def worker() -> None:
+            async with receive_stream.clone() as receive:
+                async for item in receive:
+                    await download(item)
+
+        async def scan() -> None:
+            async with send_stream:
+                records = self.iter_records(
+                    url, field_names=attachment_fields, validate=False, timeout=timeout
+                )
+                try:
+                    async for record in records:
+                        for name in attachment_fields:
+                            for value in record["fields"].get(name) or []:
+                                file_token = value["file_token"]
+                                item = downloads.get(file_token)
+                                if item is None:
+                                    filename = _safe_filename(value.get("name") or "")
+                                    item = downloads[file_token] = AttachmentDownload(
+                                        file_token=file_token,
+                                        name=value.get("name"),
+                                        type=value.get("type"),
+                                        size=value.get("size"),
+                                        path=(dest / f"{file_token}_{filename}").as_posix(),
+                                    )
+                                    await send_stream.send(item)
+                                if record["record_id"] not in item.record_ids:
+                                    item.record_ids.append(record["record_id"])
+                finally:
+                    await records.aclose()
+
+        errors: List[Exception] = []
+
+        async def stage(func: Callable[[], Awaitable[None]]) -> None:
+            try:
+                await func()
+            except Exception as e:
+                # 读取记录失败时不再提交新的附件，已提交的附件下载完成后抛出原始异常
+                errors.append(e)
+
+        completed = False
+        try:
+            async with receive_stream:
+                async with anyio.create_task_group() as tg:
+                    for _ in range(concurrency):
+                        tg.start_soon(worker)
+                    tg.start_soon(stage, scan)
+            if errors:
+                raise errors[0]
+            completed = True
+        finally:
+            # 出错或被取消时同样写入 manifest，记录已完成的下载
+            if manifest is not None:
+                entries = [item.model_dump() for item in downloads.values()]
+                if not completed:
+                    # 保留之前的 manifest 中本次尚未读取到的已完成下载，恢复时仍可跳过
+                    entries.extend(
+                        entry for token, entry in finished.items() if token not in downloads
+                    )
+                content = json.dumps(entries, ensure_ascii=False, indent=2)
+                with anyio.CancelScope(shield=True):
+                    await (dest / manifest).write_text(content, encoding="utf-8")
+        return list(downloads.values())
+
+
+async def _finished_downloads(path: anyio.Path) -> Dict[str, Dict[str, Any]]:
+    """读取之前的 manifest，返回已完成下载的 file_token 到清单条目的映射"""
+    try:
+        entries = json.loads(await path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        entry["file_token"]: entry
+        for entry in entries
+        if entry.get("status") in ("downloaded", "skipped")
+    }
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    """取回未被等待的预取任务的异常，避免 asyncio 记录未取回异常的警告"""
+    if not task.cancelled():
+        task.exception()
+
+
+def _safe_filename(name: str) -> str:
+    """去掉附件名称中的路径分隔符"""
+    return re.sub(r"[\\/\x00]", "_", name)
+
+
+_PAYLOAD_TOO_LARGE_CODES = {
+    err.LarkStatusCode.PAYLOAD_TOO_LARGE,
+    err.LarkStatusCode.BITABLE_TOO_MANY_RECORDS,
+    err.LarkStatusCode.BITABLE_CELL_TOO_LARGE,
+}
+
+
+def _is_payload_too_large(e: Exception) -> bool:
+    """是否因请求体过大失败，拆分分块后可以写入其中的其他记录"""
+    return isinstance(e, err.LarkException) and e.code in _PAYLOAD_TOO_LARGE_CODES
+
+
+def _non_null(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {column: value for column, value in record.items() if value is not None}
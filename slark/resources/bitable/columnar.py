@@ -0,0 +1,154 @@
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from slark.types.bitables.field.common import Field
+from slark.types.bitables.record.response import FieldValueType, RecordResponseData
+
+from .utils import (
+    CHECKBOX_UI_TYPES,
+    DATETIME_UI_TYPES,
+    INTEGER_UI_TYPES,
+    LIST_UI_TYPES,
+    NUMBER_UI_TYPES,
+    _get,
+    field_ui_type,
+    records_to_columns,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+RECORD_ID_COLUMN = "record_id"
+"""Arrow 表中记录 ID 所在的列"""
+
+DEFAULT_ROW_GROUP_SIZE = 50000
+"""导出 Parquet 时每个 row group 的行数"""
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required, install it with `pip install slark[arrow]`")
+
+
+def _arrow_type(field: Field, flatten: bool) -> "pa.DataType":
+    ui_type = field_ui_type(field)
+    if ui_type in NUMBER_UI_TYPES:
+        return pa.float64()
+    if ui_type in INTEGER_UI_TYPES:
+        return pa.int64()
+    if ui_type in DATETIME_UI_TYPES:
+        return pa.timestamp("ns")
+    if ui_type in CHECKBOX_UI_TYPES:
+        return pa.bool_()
+    if not flatten and ui_type in LIST_UI_TYPES:
+        return pa.list_(pa.string())
+    return pa.string()
+
+
+def arrow_schema(fields: List[Field], flatten: bool = True) -> "pa.Schema":
+    """由数据表字段得到 Arrow schema，第一列为 record_id，同一组 fields 的各页结果可以直接合并
+
+    Args:
+        fields (List[Field]): 数据表字段
+        flatten (bool, optional): 多值字段是否拼接为字符串，否则为字符串列表. Defaults to True.
+
+    Returns:
+        pa.Schema: Arrow schema
+    """
+    require_pyarrow()
+    return pa.schema(
+        [pa.field(RECORD_ID_COLUMN, pa.string())]
+        + [pa.field(field.field_name, _arrow_type(field, flatten)) for field in fields]
+    )
+
+
+def _to_str(value: Any) -> Union[str, None]:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _arrow_array(column: Any, type_: "pa.DataType") -> "pa.Array":
+    if pa.types.is_string(type_):
+        if isinstance(column, pd.Categorical):
+            column = np.asarray(column, dtype=object)
+        return pa.array([_to_str(value) for value in column], type=type_)
+    if pa.types.is_list(type_):
+        return pa.array(
+            [None if value is None else [_to_str(item) for item in value] for value in column],
+            type=type_,
+        )
+    return pa.array(column, type=type_, from_pandas=True)
+
+
+def records_to_arrow(
+    fields: List[Field],
+    records: List[Union[RecordResponseData, Dict[str, Any]]],
+    timezone: Union[str, None] = "Asia/Shanghai",
+    utcoffset: Union[pd.Timedelta, None] = None,
+    flatten: bool = True,
+) -> "pa.Table":
+    """按字段类型将记录转为 pyarrow.Table，schema 为 `arrow_schema(fields, flatten)`，\
+        不在 fields 中的字段会被忽略
+
+    Raises:
+        ImportError: 未安装 pyarrow
+    """
+    schema = arrow_schema(fields, flatten)
+    columns = records_to_columns(
+        fields, records, timezone=timezone, utcoffset=utcoffset, flatten=flatten
+    )
+    arrays = [pa.array([_get(record, "record_id") for record in records], type=pa.string())]
+    for field in fields:
+        arrays.append(_arrow_array(columns[field.field_name], schema.field(field.field_name).type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def arrow_to_records(
+    data: Union["pa.Table", "pa.RecordBatch"],
+    utcoffset: pd.Timedelta,
+) -> List[Dict[str, FieldValueType]]:
+    """将 Arrow 数据转为 batch_create 所需的记录，record_id 列和空值会被忽略
+
+    没有时区的时间戳视为 utcoffset 对应时区的本地时间，与 `records_to_arrow` 的转换相反。
+
+    Args:
+        data (Union[pa.Table, pa.RecordBatch]): Arrow 数据
+        utcoffset (pd.Timedelta): 时区偏移量
+
+    Returns:
+        List[Dict[str, FieldValueType]]: 记录的字段
+    """
+    offset = int(utcoffset.total_seconds() * 1000)
+    names: List[str] = []
+    columns: List[List[Any]] = []
+    for name, column in zip(data.schema.names, data.columns):
+        if name == RECORD_ID_COLUMN:
+            continue
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        if pa.types.is_date(column.type):
+            column = column.cast(pa.timestamp("ms"))
+        if pa.types.is_timestamp(column.type):
+            # 转为 unix timestamp，单位为 ms
+            shift = offset if column.type.tz is None else 0
+            values = column.cast(pa.timestamp("ms", column.type.tz), safe=False)
+            values = [
+                None if value is None else value - shift
+                for value in values.cast(pa.int64()).to_pylist()
+            ]
+        else:
+            values = column.to_pylist()
+        names.append(name)
+        columns.append(values)
+    if not columns:
+        return [{} for _ in range(data.num_rows)]
+    return [
+        {name: value for name, value in zip(names, row) if value is not None}
+        for row in zip(*columns)
+    ]
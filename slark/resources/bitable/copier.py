@@ -0,0 +1,68 @@
+from typing import Any, Dict, Union
+
+from slark.types.bitables.common import UIType
+from slark.types.bitables.field.common import Field
+
+from .utils import READONLY_UI_TYPES, _get, field_ui_type, write_value
+
+LINK_UI_TYPES = {UIType.SINGLE_LINK.value, UIType.DUPLEX_LINK.value}
+"""关联字段，值为记录 ID，复制时在全部记录写入后按新的记录 ID 回填"""
+
+UNCOPIED_VALUE_UI_TYPES = READONLY_UI_TYPES | {UIType.ATTACHMENT.value}
+"""不复制值的字段：自动计算的字段由目标表重新计算，附件的 file_token 只在所属的多维表格中有效"""
+
+UNCREATED_UI_TYPES = {UIType.FORMULA.value, "Lookup"}
+"""不自动创建的字段：公式和查找引用的属性中引用了源表的字段 ID"""
+
+
+def copy_value(field: Field, value: Any, user_map: Union[Dict[str, str], None] = None) -> Any:
+    """将查询接口返回的字段值转为写入目标表的值，返回 None 表示不写入
+
+    Args:
+        field (Field): 源表字段
+        value (Any): 查询接口返回的字段值
+        user_map (Union[Dict[str, str], None], optional): 源人员 ID 到目标人员 ID 的映射，\
+            不在映射中的 ID 保持不变. Defaults to None.
+
+    Returns:
+        Any: 写入接口的值
+    """
+    ui_type = field_ui_type(field)
+    if ui_type in UNCOPIED_VALUE_UI_TYPES or ui_type in LINK_UI_TYPES:
+        return None
+    value = write_value(field, value)
+    if value is not None and ui_type == UIType.USER.value and user_map:
+        value = [{"id": user_map.get(item["id"], item["id"])} for item in value]
+    return value
+
+
+def field_spec(
+    field: Field,
+    src_table_id: str,
+    dst_table_id: str,
+    same_app: bool,
+) -> Union[Dict[str, Any], None]:
+    """在目标表中创建与 field 相同的字段所需的参数，无法创建时返回 None
+
+    关联到源表自身的字段改为关联到目标表，跨多维表格复制时无法创建关联到其他数据表的字段。
+    """
+    ui_type = field_ui_type(field)
+    if ui_type in UNCREATED_UI_TYPES:
+        return None
+    property = field.property
+    if ui_type in LINK_UI_TYPES:
+        table_id = _get(property, "table_id")
+        if table_id == src_table_id:
+            table_id = dst_table_id
+        elif not same_app:
+            return None
+        # 只在响应中返回的属性不能用于创建
+        property = property.model_copy(
+            update={"table_id": table_id, "table_name": None, "back_field_id": None}
+        )
+    return {
+        "field_name": field.field_name,
+        "type": field.type,
+        "property": property,
+        "ui_type": field.ui_type,
+    }
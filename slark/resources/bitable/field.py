@@ -1,10 +1,11 @@
-from typing import Union
+from typing import List, Union
 
 import httpx
 
 from slark.resources._resources import AsyncAPIResource
 from slark.resources.api_path import API_PATH
 from slark.types.bitables.field.common import (
+    Field,
     FieldDescription,
     FieldPropertyType,
     FieldType,
@@ -25,6 +26,8 @@ from slark.types.bitables.field.response import (
 
 
 class AsyncField(AsyncAPIResource):
+    MAX_FIELDS_PER_REQUEST = 100
+
     async def list(
         self,
         app_token: str,
@@ -67,6 +70,43 @@ class AsyncField(AsyncAPIResource):
             cast_to=ListFieldResponse,
         )
 
+    async def list_all(
+        self,
+        app_token: str,
+        *,
+        table_id: str,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> List[Field]:
+        """获取数据表的全部字段，自动翻页。开启元数据缓存时结果会被缓存
+
+        Args:
+            app_token (str): 多维表格的 app_token
+            table_id (str): 多维表格的 table_id
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Returns:
+            List[Field]: 数据表的全部字段
+        """
+
+        async def load() -> List[Field]:
+            fields: List[Field] = []
+            page_token = None
+            has_more = True
+            while has_more:
+                response = await self.list(
+                    app_token,
+                    table_id=table_id,
+                    page_token=page_token,
+                    page_size=self.MAX_FIELDS_PER_REQUEST,
+                    timeout=timeout,
+                )
+                fields.extend(response.data.items)
+                has_more = response.data.has_more
+                page_token = response.data.page_token
+            return fields
+
+        return await self._client.metadata_cache.fields.get_or_load((app_token, table_id), load)
+
     async def create(
         self,
         app_token: str,
@@ -111,7 +151,7 @@ class AsyncField(AsyncAPIResource):
             raise ValueError("disable_sync and text must be set together")
         else:
             desp = None
-        return await self._post(
+        response = await self._post(
             API_PATH.bitables.create_field.format(app_token=app_token, table_id=table_id),
             body=CreateFieldBody(
                 field_name=field_name,
@@ -126,6 +166,8 @@ class AsyncField(AsyncAPIResource):
             },
             cast_to=CreateFieldResponse,
         )
+        self._client.metadata_cache.invalidate_fields(app_token, table_id)
+        return response
 
     async def update(
         self,
@@ -169,7 +211,7 @@ class AsyncField(AsyncAPIResource):
             raise ValueError("disable_sync and text must be set together")
         else:
             desp = None
-        return await self._put(
+        response = await self._put(
             API_PATH.bitables.update_field.format(
                 app_token=app_token,
                 table_id=table_id,
@@ -185,6 +227,8 @@ class AsyncField(AsyncAPIResource):
             options={"timeout": timeout},
             cast_to=UpdateFieldResponse,
         )
+        self._client.metadata_cache.invalidate_fields(app_token, table_id)
+        return response
 
     async def delete(
         self,
@@ -204,9 +248,11 @@ class AsyncField(AsyncAPIResource):
         Returns:
             DeleteFieldResponse: 删除字段的返回值
         """
-        return await self._delete(
+        response = await self._delete(
             API_PATH.bitables.delete_field.format(
                 app_token=app_token, table_id=table_id, field_id=field_id
             ),
             cast_to=DeleteFieldResponse,
         )
+        self._client.metadata_cache.invalidate_fields(app_token, table_id)
+        return response
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set, Union
+
+from .batch import halve
+
+
+def _chunk_digest(chunk: Sequence[Dict[str, Any]]) -> str:
+    content = json.dumps(list(chunk), ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class ChunkSplit(Exception):
+    """分块已在之前的写入中拆分，应直接按拆分后的部分写入"""
+
+
+class JournalChunk(Sequence):
+    """带有标识和 client_token 的分块，done 表示已在之前的写入中完成，
+    was_split 表示已在之前的写入中拆分。
+
+    key 为分块序号，拆分后的部分在其后追加 ".0"、".1"，如 "3.1.0"。
+    """
+
+    def __init__(
+        self, key: str, token: str, digest: str, records: Sequence, done: bool, was_split: bool
+    ):
+        self.key = key
+        self.token = token
+        self.digest = digest
+        self.records = records
+        self.done = done
+        self.was_split = was_split
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+
+class WriteJournal:
+    """可恢复的批量写入日志，每个分块使用由日志 ID 和分块标识确定的 client_token，
+    写入成功的分块追加到日志文件中。
+
+    中断后使用同一个日志文件和相同的数据重新写入：已完成的分块被跳过，其余分块以相同的
+    client_token 重新提交，服务端对已处理的请求幂等返回，不会产生重复记录。
+    恢复时会校验分块内容，数据或分块方式变化时抛出 ValueError。
+    请求体过大而拆分的分块以各部分为单位记录，恢复时同样按确定的方式拆分。
+
+    日志文件为 JSON Lines，第一行记录多维表格链接和日志 ID，之后每行为一个完成或拆分的分块。
+
+    Args:
+        path (Union[str, os.PathLike]): 日志文件路径，不存在时创建
+        url (str): 多维表格分享链接
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], url: str):
+        self.path = path
+        self.url = url
+        self._done: Dict[str, str] = {}
+        self._split: Set[str] = set()
+        self._next_index = 0
+        header = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 写入中断留下的不完整行
+                        break
+                    if header is None:
+                        header = entry
+                    elif entry.get("split"):
+                        self._split.add(entry["chunk"])
+                    else:
+                        self._done[entry["chunk"]] = entry["digest"]
+        if header is None:
+            header = {"url": url, "load_id": str(uuid.uuid4())}
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(header) + "\n")
+        elif header["url"] != url:
+            raise ValueError(f"{path} is a journal of {header['url']}, not {url}")
+        self.load_id = header["load_id"]
+
+    @property
+    def completed(self) -> int:
+        """已完成的分块数"""
+        return len(self._done)
+
+    def client_token(self, key: str) -> str:
+        """分块的 client_token"""
+        return str(uuid.uuid5(uuid.UUID(self.load_id), key))
+
+    def _chunk(self, key: str, records: Sequence[Dict[str, Any]]) -> JournalChunk:
+        digest = _chunk_digest(records)
+        done = key in self._done
+        if done and self._done[key] != digest:
+            raise ValueError(f"Chunk {key} does not match the journal {self.path}")
+        return JournalChunk(key, self.client_token(key), digest, records, done, key in self._split)
+
+    def track(self, chunks: Iterable[Sequence[Dict[str, Any]]]) -> Iterator[JournalChunk]:
+        """为分块分配标识和 client_token，序号在同一个日志的多次调用间连续
+
+        Raises:
+            ValueError: 分块内容与日志中已完成的分块不一致
+        """
+        for records in chunks:
+            key = str(self._next_index)
+            self._next_index += 1
+            yield self._chunk(key, records)
+
+    def split(self, chunk: JournalChunk) -> List[JournalChunk]:
+        """将分块对半拆分并记录，各部分使用各自的 client_token，此后恢复时不再提交整个分块
+
+        Raises:
+            ValueError: 拆分后的部分与日志中已完成的分块不一致
+        """
+        if chunk.key not in self._split:
+            self._split.add(chunk.key)
+            self._append({"chunk": chunk.key, "split": True})
+        return [
+            self._chunk(f"{chunk.key}.{position}", records)
+            for position, records in enumerate(halve(chunk.records))
+        ]
+
+    def commit(self, chunk: JournalChunk) -> None:
+        """记录分块写入成功"""
+        self._done[chunk.key] = chunk.digest
+        self._append({"chunk": chunk.key, "digest": chunk.digest, "count": len(chunk)})
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
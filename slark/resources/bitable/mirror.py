@@ -0,0 +1,231 @@
+import json
+import os
+import sqlite3
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Union
+
+import httpx
+import pandas as pd
+
+from slark.types.bitables.field.common import Field
+from slark.types.bitables.record.response import RecordResponseData
+from slark.types.bitables.record.watch import WatchCheckpoint
+
+from .utils import (
+    CHECKBOX_UI_TYPES,
+    DATETIME_UI_TYPES,
+    INTEGER_UI_TYPES,
+    NUMBER_UI_TYPES,
+    TEXT_UI_TYPES,
+    _segments_to_text,
+    _value_to_text,
+    field_ui_type,
+    fields_records_to_dataframe,
+)
+
+if TYPE_CHECKING:
+    from .bitable import AsyncBiTable
+
+ROWS_VIEW = "rows"
+"""本地查询使用的视图，每个字段一列"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS fields (
+    field_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    field_name TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    record_id TEXT PRIMARY KEY,
+    last_modified_time INTEGER,
+    fields TEXT NOT NULL,
+    flat TEXT NOT NULL
+);
+"""
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _flat_value(field: Union[Field, None], value: Any) -> Any:
+    """将字段值转为 SQLite 可以直接比较和聚合的标量"""
+    if value is None:
+        return None
+    ui_type = field_ui_type(field) if field is not None else None
+    if ui_type in NUMBER_UI_TYPES or ui_type in INTEGER_UI_TYPES or ui_type in DATETIME_UI_TYPES:
+        try:
+            return float(value) if ui_type in NUMBER_UI_TYPES else int(value)
+        except (TypeError, ValueError):
+            return None
+    if ui_type in CHECKBOX_UI_TYPES:
+        return 1 if value else 0
+    if ui_type in TEXT_UI_TYPES:
+        return _segments_to_text(value)
+    return _value_to_text(value)
+
+
+class BitableMirror:
+    """多维表格在本地 SQLite 中的镜像，按 record_id 保存记录和字段，增量刷新后在本地查询。
+
+    增量刷新基于 `AsyncBiTable.watch`，只读取上次同步后修改的记录，无法感知删除的记录，
+    需要时使用 `refresh(full=True)` 重新同步全表。
+
+    视图 `rows` 的第一列为 record_id，其余每个字段一列：数字、评分为数值，日期为 ms 时间戳，
+    复选框为 0/1，其他字段为文本，多值字段以 ", " 拼接。
+
+    Args:
+        bitables (AsyncBiTable): 多维表格资源
+        url (str): 多维表格分享链接
+        path (Union[str, os.PathLike]): SQLite 文件路径，":memory:" 表示内存数据库
+    """
+
+    def __init__(self, bitables: "AsyncBiTable", url: str, path: Union[str, os.PathLike]):
+        self._bitables = bitables
+        self.url = url
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'url'").fetchone()
+            if row is None:
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('url', ?)", (url,))
+        if row is not None and row[0] != url:
+            self._conn.close()
+            raise ValueError(f"{path} is a mirror of {row[0]}, not {url}")
+
+    def __enter__(self) -> "BitableMirror":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @property
+    def checkpoint(self) -> WatchCheckpoint:
+        """上次同步到的位置"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'checkpoint'").fetchone()
+        return WatchCheckpoint() if row is None else WatchCheckpoint.model_validate_json(row[0])
+
+    @property
+    def fields(self) -> List[Field]:
+        """镜像中保存的字段，顺序与数据表一致"""
+        rows = self._conn.execute("SELECT data FROM fields ORDER BY position").fetchall()
+        return [Field.model_validate_json(data) for (data,) in rows]
+
+    async def refresh(
+        self,
+        *,
+        full: bool = False,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> int:
+        """同步字段和上次同步后修改的记录
+
+        Args:
+            full (bool, optional): 是否清空本地记录后重新同步全表. Defaults to False.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Returns:
+            int: 写入的记录数
+        """
+        fields = await self._bitables._list_fields(self.url, None, timeout)
+        schema = {field.field_name: field for field in fields}
+        # 字段变化后已保存记录的 flat 列需要重新计算，此时重新同步全表
+        full = full or [field.field_name for field in self.fields] != list(schema)
+        with self._conn:
+            self._conn.execute("DELETE FROM fields")
+            self._conn.executemany(
+                "INSERT INTO fields (field_id, position, field_name, data) VALUES (?, ?, ?, ?)",
+                [
+                    (field.field_id, position, field.field_name, field.model_dump_json())
+                    for position, field in enumerate(fields)
+                ],
+            )
+            self._create_view(fields)
+            if full:
+                self._conn.execute("DELETE FROM records")
+                self._conn.execute("DELETE FROM meta WHERE key = 'checkpoint'")
+
+        count = 0
+        async for batch in self._bitables.watch(self.url, since=self.checkpoint, timeout=timeout):
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records (record_id, last_modified_time, fields, flat) "
+                    "VALUES (?, ?, ?, ?)",
+                    [self._record_row(schema, record) for record in batch.records],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('checkpoint', ?)",
+                    (batch.checkpoint.model_dump_json(),),
+                )
+            count += len(batch.records)
+        return count
+
+    def _create_view(self, fields: List[Field]) -> None:
+        columns = ["record_id"]
+        for field in fields:
+            if '"' in field.field_name:
+                # JSON path 中无法转义双引号
+                continue
+            path = '$."' + field.field_name.replace("'", "''") + '"'
+            columns.append(f"json_extract(flat, '{path}') AS {_quote(field.field_name)}")
+        self._conn.execute(f"DROP VIEW IF EXISTS {ROWS_VIEW}")
+        self._conn.execute(f"CREATE VIEW {ROWS_VIEW} AS SELECT {', '.join(columns)} FROM records")
+
+    @staticmethod
+    def _record_row(schema: Dict[str, Field], record: RecordResponseData) -> tuple:
+        fields = record.model_dump(mode="json", exclude_none=True)["fields"]
+        flat = {name: _flat_value(schema.get(name), value) for name, value in fields.items()}
+        return (
+            record.record_id,
+            record.last_modified_time,
+            json.dumps(fields, ensure_ascii=False),
+            json.dumps(flat, ensure_ascii=False),
+        )
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        """在本地执行 SQL 查询，可以使用视图 `rows`
+
+        Example:
+            ```
+            mirror.query('SELECT "状态", count(*) AS n FROM rows GROUP BY "状态"')
+            ```
+
+        Args:
+            sql (str): SQL 语句
+            params (Sequence[Any], optional): SQL 参数. Defaults to ().
+
+        Returns:
+            pd.DataFrame: 查询结果
+        """
+        return pd.read_sql_query(sql, self._conn, params=params)
+
+    def read(
+        self,
+        where: Union[str, None] = None,
+        params: Sequence[Any] = (),
+        *,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        flatten: bool = True,
+    ) -> pd.DataFrame:
+        """读取本地记录，返回与 `AsyncBiTable.read` 相同类型的 DataFrame
+
+        Args:
+            where (Union[str, None], optional): 视图 `rows` 上的筛选条件. Defaults to None.
+            params (Sequence[Any], optional): 筛选条件的参数. Defaults to ().
+            timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+            flatten (bool, optional): 是否将多值字段拼接为字符串. Defaults to True.
+
+        Returns:
+            pd.DataFrame: index 为记录的 record id
+        """
+        sql = "SELECT record_id, fields FROM records"
+        if where is not None:
+            sql += f" WHERE record_id IN (SELECT record_id FROM {ROWS_VIEW} WHERE {where})"
+        rows = self._conn.execute(sql + " ORDER BY rowid", tuple(params)).fetchall()
+        records = [
+            {"record_id": record_id, "fields": json.loads(fields)} for record_id, fields in rows
+        ]
+        return fields_records_to_dataframe(self.fields, records, timezone=timezone, flatten=flatten)
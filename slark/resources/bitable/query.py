@@ -0,0 +1,382 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from slark.types.bitables.common import UIType
+from slark.types.bitables.field.common import Field
+from slark.types.bitables.record.request import (
+    SearchRecordFilter,
+    SearchRecordFilterCondition,
+    SearchRecordSort,
+)
+
+from .utils import (
+    CATEGORY_UI_TYPES,
+    CHECKBOX_UI_TYPES,
+    INTEGER_UI_TYPES,
+    NUMBER_UI_TYPES,
+    TEXT_UI_TYPES,
+    field_ui_type,
+    fields_records_to_dataframe,
+)
+
+if TYPE_CHECKING:
+    from .bitable import AsyncBiTable
+
+_EMPTY_OPERATORS = {"isEmpty", "isNotEmpty"}
+_COMPARE_OPERATORS = {"isGreater", "isGreaterEqual", "isLess", "isLessEqual"}
+
+# 各类字段可以在服务端执行的运算符，其他条件在本地执行
+_PUSHDOWN_OPERATORS: List[Tuple[set, set]] = [
+    (NUMBER_UI_TYPES | INTEGER_UI_TYPES, {"is", "isNot"} | _COMPARE_OPERATORS),
+    (TEXT_UI_TYPES, {"is", "isNot", "contains", "doesNotContain"}),
+    (CATEGORY_UI_TYPES, {"is", "isNot"}),
+    ({UIType.MULTI_SELECT.value}, {"contains", "doesNotContain"}),
+    (CHECKBOX_UI_TYPES, {"is"}),
+]
+
+
+class Condition:
+    """单个字段的筛选条件，由 `F` 的运算符构造"""
+
+    def __init__(self, field_name: str, operator: str, value: Any = None):
+        self.field_name = field_name
+        self.operator = operator
+        self.value = value
+
+    def __and__(self, other: "Predicate") -> "ConditionGroup":
+        return ConditionGroup("and", [self, other])
+
+    def __or__(self, other: "Predicate") -> "ConditionGroup":
+        return ConditionGroup("or", [self, other])
+
+    def __repr__(self) -> str:
+        return f"Condition({self.field_name!r}, {self.operator!r}, {self.value!r})"
+
+    def pushdown(self, fields: Dict[str, Field]) -> Union[SearchRecordFilterCondition, None]:
+        """转为服务端的筛选条件，服务端无法表达时返回 None"""
+        if self.operator == "in":
+            return None
+        if self.operator in _EMPTY_OPERATORS:
+            return SearchRecordFilterCondition(
+                field_name=self.field_name, operator=self.operator, value=[]
+            )
+        ui_type = field_ui_type(fields[self.field_name])
+        for ui_types, operators in _PUSHDOWN_OPERATORS:
+            if ui_type in ui_types and self.operator in operators:
+                if isinstance(self.value, bool):
+                    value = "true" if self.value else "false"
+                elif isinstance(self.value, (int, float, str)):
+                    value = str(self.value)
+                else:
+                    return None
+                return SearchRecordFilterCondition(
+                    field_name=self.field_name, operator=self.operator, value=[value]
+                )
+        return None
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        """在本地对 `fields_records_to_dataframe` 转换的 DataFrame 求值"""
+        column = df[self.field_name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(object)
+        empty = column.isna() | column.map(lambda value: value == "" or value == [])
+        if self.operator == "isEmpty":
+            return empty
+        if self.operator == "isNotEmpty":
+            return ~empty
+        if self.operator == "in":
+            return column.isin(list(self.value))
+        if self.operator in ("contains", "doesNotContain"):
+            contains = column.map(lambda value: _contains(value, self.value)).astype(bool)
+            return contains if self.operator == "contains" else ~contains
+        value = self.value
+        if pd.api.types.is_datetime64_any_dtype(column) and not isinstance(value, pd.Timestamp):
+            value = pd.Timestamp(value)
+        if self.operator == "is":
+            return (column == value).fillna(False).astype(bool)
+        if self.operator == "isNot":
+            return ~(column == value).fillna(False).astype(bool)
+        compare = {
+            "isGreater": column.gt,
+            "isGreaterEqual": column.ge,
+            "isLess": column.lt,
+            "isLessEqual": column.le,
+        }[self.operator]
+        return compare(value).fillna(False).astype(bool) & ~empty
+
+
+def _contains(value: Any, target: Any) -> bool:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return False
+    if isinstance(value, list):
+        return target in value
+    return str(target) in str(value)
+
+
+class ConditionGroup:
+    """以 and / or 连接的一组条件"""
+
+    def __init__(self, conjunction: str, conditions: List["Predicate"]):
+        self.conjunction = conjunction
+        self.conditions: List[Predicate] = []
+        for condition in conditions:
+            # 展开相同连接词的嵌套分组
+            if isinstance(condition, ConditionGroup) and condition.conjunction == conjunction:
+                self.conditions.extend(condition.conditions)
+            else:
+                self.conditions.append(condition)
+
+    def __and__(self, other: "Predicate") -> "ConditionGroup":
+        return ConditionGroup("and", [self, other])
+
+    def __or__(self, other: "Predicate") -> "ConditionGroup":
+        return ConditionGroup("or", [self, other])
+
+    def __repr__(self) -> str:
+        return f"ConditionGroup({self.conjunction!r}, {self.conditions!r})"
+
+    def field_names(self) -> List[str]:
+        return [name for condition in self.conditions for name in _field_names(condition)]
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        masks = [condition.evaluate(df) for condition in self.conditions]
+        result = masks[0]
+        for mask in masks[1:]:
+            result = (result & mask) if self.conjunction == "and" else (result | mask)
+        return result
+
+
+Predicate = Union[Condition, ConditionGroup]
+
+
+def _field_names(predicate: Predicate) -> List[str]:
+    if isinstance(predicate, Condition):
+        return [predicate.field_name]
+    return predicate.field_names()
+
+
+class F:
+    """字段引用，用于构造查询条件
+
+    Example:
+        ```
+        F("分数") >= 60
+        (F("状态") == "完成") | F("负责人").is_empty()
+        ```
+    """
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+
+    def __eq__(self, value: Any) -> Condition:  # type: ignore[override]
+        return Condition(self.field_name, "is", value)
+
+    def __ne__(self, value: Any) -> Condition:  # type: ignore[override]
+        return Condition(self.field_name, "isNot", value)
+
+    def __gt__(self, value: Any) -> Condition:
+        return Condition(self.field_name, "isGreater", value)
+
+    def __ge__(self, value: Any) -> Condition:
+        return Condition(self.field_name, "isGreaterEqual", value)
+
+    def __lt__(self, value: Any) -> Condition:
+        return Condition(self.field_name, "isLess", value)
+
+    def __le__(self, value: Any) -> Condition:
+        return Condition(self.field_name, "isLessEqual", value)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def contains(self, value: Any) -> Condition:
+        return Condition(self.field_name, "contains", value)
+
+    def not_contains(self, value: Any) -> Condition:
+        return Condition(self.field_name, "doesNotContain", value)
+
+    def is_empty(self) -> Condition:
+        return Condition(self.field_name, "isEmpty")
+
+    def is_not_empty(self) -> Condition:
+        return Condition(self.field_name, "isNotEmpty")
+
+    def isin(self, values: Iterable[Any]) -> Condition:
+        return Condition(self.field_name, "in", list(values))
+
+
+class CompiledQuery:
+    """查询编译的结果：服务端的 field_names / filter / sort 和需要在本地执行的条件"""
+
+    def __init__(
+        self,
+        field_names: Union[List[str], None],
+        filter: Union[SearchRecordFilter, None],
+        sort: Union[List[SearchRecordSort], None],
+        local: List[Predicate],
+        output_names: Union[List[str], None],
+    ):
+        self.field_names = field_names
+        self.filter = filter
+        self.sort = sort
+        self.local = local
+        """服务端无法表达，需要在本地执行的条件，以 and 连接"""
+        self.output_names = output_names
+        """最终返回的列，为 None 时返回全部列"""
+
+
+class Query:
+    """多维表格查询，条件和排序尽量在服务端执行，服务端无法表达的条件在本地执行
+
+    Example:
+        ```
+        df = await (
+            lark.bitables.query(url)
+            .where(F("状态") == "完成", F("分数") >= 60)
+            .order_by("分数", desc=True)
+            .select("姓名", "分数")
+            .read()
+        )
+        ```
+    """
+
+    def __init__(self, bitables: "AsyncBiTable", url: str):
+        self._bitables = bitables
+        self.url = url
+        self._predicates: List[Predicate] = []
+        self._sort: List[SearchRecordSort] = []
+        self._select: Union[List[str], None] = None
+        self._limit: Union[int, None] = None
+
+    def where(self, *predicates: Predicate) -> "Query":
+        """添加筛选条件，多个条件以 and 连接"""
+        self._predicates.extend(predicates)
+        return self
+
+    def order_by(self, field_name: str, desc: bool = False) -> "Query":
+        """添加排序字段，先添加的优先"""
+        self._sort.append(SearchRecordSort(field_name=field_name, desc=desc))
+        return self
+
+    def select(self, *field_names: str) -> "Query":
+        """只返回指定的字段"""
+        self._select = list(field_names)
+        return self
+
+    def limit(self, rows: int) -> "Query":
+        """最多返回 rows 条记录"""
+        self._limit = rows
+        return self
+
+    def compile(self, fields: Sequence[Field]) -> CompiledQuery:
+        """按字段类型将查询编译为 search 接口的参数
+
+        Raises:
+            ValueError: 条件中的字段不存在
+        """
+        schema = {field.field_name: field for field in fields}
+        names = [name for predicate in self._predicates for name in _field_names(predicate)]
+        names += [sort.field_name for sort in self._sort] + (self._select or [])
+        unknown = sorted({name for name in names if name not in schema})
+        if unknown:
+            raise ValueError(f"Unknown fields: {unknown}")
+
+        if len(self._predicates) == 1 and isinstance(self._predicates[0], ConditionGroup):
+            group = self._predicates[0]
+        else:
+            group = ConditionGroup("and", self._predicates)
+        # 服务端的筛选条件不支持嵌套，分组中的复合条件在本地执行
+        compiled = [
+            condition.pushdown(schema) if isinstance(condition, Condition) else None
+            for condition in group.conditions
+        ]
+        pushed: List[SearchRecordFilterCondition] = []
+        local: List[Predicate] = []
+        if all(condition is not None for condition in compiled):
+            pushed = compiled
+        elif group.conjunction == "and":
+            # and 连接时可以只在服务端执行部分条件
+            for condition, pushdown in zip(group.conditions, compiled):
+                if pushdown is None:
+                    local.append(condition)
+                else:
+                    pushed.append(pushdown)
+        else:
+            local.append(group)
+
+        field_names = None
+        if self._select is not None:
+            # 本地执行的条件需要读取相关字段，筛选后再去掉
+            field_names = list(self._select)
+            for predicate in local:
+                for name in _field_names(predicate):
+                    if name not in field_names:
+                        field_names.append(name)
+        return CompiledQuery(
+            field_names=field_names,
+            filter=SearchRecordFilter(conjunction=group.conjunction, conditions=pushed)
+            if pushed
+            else None,
+            sort=list(self._sort) or None,
+            local=local,
+            output_names=self._select,
+        )
+
+    async def read(
+        self,
+        *,
+        timezone: Union[str, None] = "Asia/Shanghai",
+        flatten: bool = True,
+        timeout: Union[httpx.Timeout, None] = None,
+    ) -> pd.DataFrame:
+        """执行查询，返回与 `AsyncBiTable.read` 相同类型的 DataFrame
+
+        Args:
+            timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+            flatten (bool, optional): 是否将多值字段拼接为字符串. Defaults to True.
+            timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
+
+        Returns:
+            pd.DataFrame: index 为记录的 record id
+        """
+        fields = await self._bitables._list_fields(self.url, None, timeout)
+        compiled = self.compile(fields)
+        if compiled.field_names is not None:
+            fields = [field for field in fields if field.field_name in compiled.field_names]
+        # 有本地条件时无法在服务端限制行数
+        rows = self._limit if not compiled.local else None
+        max_page_size = self._bitables.record.MAX_RECORDS_PER_REQUEST
+        records: List[Dict[str, Any]] = []
+        pages = self._bitables.iter_pages(
+            self.url,
+            field_names=compiled.field_names,
+            sort=compiled.sort,
+            filter=compiled.filter,
+            page_size=None if rows is None else min(rows, max_page_size),
+            validate=False,
+            timeout=timeout,
+        )
+        try:
+            async for page in pages:
+                items = page.get("items") or []
+                if compiled.local:
+                    df = fields_records_to_dataframe(
+                        fields, items, timezone=timezone, flatten=flatten
+                    )
+                    mask = np.ones(len(df), dtype=bool)
+                    for predicate in compiled.local:
+                        mask &= predicate.evaluate(df).to_numpy()
+                    items = [item for item, keep in zip(items, mask) if keep]
+                records.extend(items)
+                if self._limit is not None and len(records) >= self._limit:
+                    break
+        finally:
+            await pages.aclose()
+        if self._limit is not None:
+            records = records[: self._limit]
+        df = fields_records_to_dataframe(fields, records, timezone=timezone, flatten=flatten)
+        if compiled.output_names is not None:
+            df = df[compiled.output_names]
+        return df
@@ -1,4 +1,4 @@
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
 import httpx
 from typing_extensions import Literal
@@ -35,6 +35,8 @@ from slark.types.bitables.record.response import (
 
 class AsyncRecord(AsyncAPIResource):
     MAX_RECORDS_PER_REQUEST = 500
+    MAX_BYTES_PER_REQUEST = 4 * 1024 * 1024
+    """批量写入时单个请求体的目标大小，AsyncBiTable 按此值和记录数限制分块"""
 
     async def create(
         self,
@@ -157,8 +159,9 @@ class AsyncRecord(AsyncAPIResource):
         user_id_type: Union[Literal["open_id", "union_id", "user_id"], None] = None,
         page_token: Union[str, None] = None,
         page_size: Union[int, None] = None,
+        validate: bool = True,
         timeout: Union[httpx.Timeout, None] = None,
-    ) -> SearchRecordResponse:
+    ) -> Union[SearchRecordResponse, Dict[str, Any]]:
         """该接口用于查询数据表中的现有记录，单次最多查询 500 行记录，支持分页获取。
         https://open.feishu.cn/document/uAjLw4CM/ukTMukTMukTM/reference/bitable-v1/app-table-record/search
 
@@ -173,10 +176,12 @@ class AsyncRecord(AsyncAPIResource):
             user_id_type (Union[Literal[&quot;open_id&quot;, &quot;union_id&quot;, &quot;user_id&quot;], None], optional): 用户 ID 类型. Defaults to None.
             page_token (Union[str, None], optional): 分页标记，第一次请求不填，表示从头开始遍历；分页查询结果还有更多项时会同时返回新的 page_token，下次遍历可采用该 page_token 获取查询结果. Defaults to None.
             page_size (Union[int, None], optional): 分页大小。最大值为 500. Defaults to None.
+            validate (bool, optional): 是否校验为 SearchRecordResponse，为 False 时直接返回解析后的 JSON，\
+                适用于不需要模型实例的批量导出. Defaults to True.
             timeout (Union[httpx.Timeout, None], optional): Timeout. Defaults to None.
 
         Returns:
-            SearchRecordResponse: 查询记录的返回结果
+            Union[SearchRecordResponse, Dict[str, Any]]: 查询记录的返回结果
         """
         return await self._post(
             API_PATH.bitables.search_record.format(app_token=app_token, table_id=table_id),
@@ -189,13 +194,14 @@ class AsyncRecord(AsyncAPIResource):
             ).model_dump(),
             options={
                 "timeout": timeout,
+                "coalesce": True,
                 "params": SearchRecordParams(
                     user_id_type=user_id_type,
                     page_token=page_token,
                     page_size=page_size,
                 ).model_dump(),
             },
-            cast_to=SearchRecordResponse,
+            cast_to=SearchRecordResponse if validate else dict,
         )
 
     async def batch_get(
@@ -232,7 +238,7 @@ class AsyncRecord(AsyncAPIResource):
                 with_shared_url=with_shared_url,
                 automatic_fields=automatic_fields,
             ).model_dump(),
-            options={"timeout": timeout},
+            options={"timeout": timeout, "coalesce": True},
             cast_to=BatchGetRecordResponse,
         )
 
@@ -1,56 +1,478 @@
-from typing import Dict, List, Union
+from typing import Any, Dict, Iterator, List, Union
 
 import arrow
+import numpy as np
 import pandas as pd
 
+from slark.types.bitables.common import FieldType
 from slark.types.bitables.field.common import Field, UIType
-from slark.types.bitables.record.common import Empty
 from slark.types.bitables.record.response import FieldValueType, RecordResponseData
 
 
+def timezone_offset(timezone: Union[str, None] = "Asia/Shanghai") -> pd.Timedelta:
+    """时区相对 UTC 的偏移量"""
+    return pd.Timedelta(arrow.now(timezone).utcoffset())
+
+
+# 字段值在 DataFrame 中的列类型，按 ui_type 区分
+NUMBER_UI_TYPES = {
+    UIType.NUMBER.value,
+    UIType.PROGRESS.value,
+    UIType.CURRENCY.value,
+}
+INTEGER_UI_TYPES = {UIType.RATING.value}
+DATETIME_UI_TYPES = {
+    UIType.DATE_TIME.value,
+    UIType.CREATED_TIME.value,
+    UIType.MODIFIED_TIME.value,
+}
+CHECKBOX_UI_TYPES = {UIType.CHECKBOX.value}
+CATEGORY_UI_TYPES = {UIType.SINGLE_SELECT.value}
+TEXT_UI_TYPES = {UIType.TEXT.value, UIType.BARCODE.value}
+"""多行文本的值为若干文本片段，直接拼接"""
+LIST_UI_TYPES = {
+    UIType.MULTI_SELECT.value,
+    UIType.USER.value,
+    UIType.GROUP_CHAT.value,
+    UIType.ATTACHMENT.value,
+    UIType.SINGLE_LINK.value,
+    UIType.DUPLEX_LINK.value,
+    UIType.FORMULA.value,
+    UIType.CREATED_USER.value,
+    UIType.MODIFIED_USER.value,
+    "Lookup",
+}
+"""多值字段，flatten=False 时转为列表"""
+
+# ui_type 缺失时按字段类型推断
+_FIELD_TYPE_UI_TYPES = {
+    FieldType.TEXT.value: UIType.TEXT.value,
+    FieldType.NUMBER.value: UIType.NUMBER.value,
+    FieldType.SINGLE_SELECT.value: UIType.SINGLE_SELECT.value,
+    FieldType.MULTI_SELECT.value: UIType.MULTI_SELECT.value,
+    FieldType.DATE.value: UIType.DATE_TIME.value,
+    FieldType.CHECKBOX.value: UIType.CHECKBOX.value,
+    FieldType.CREATED_TIME.value: UIType.CREATED_TIME.value,
+    FieldType.MODIFIED_TIME.value: UIType.MODIFIED_TIME.value,
+    FieldType.PERSON.value: UIType.USER.value,
+    FieldType.ATTACHMENT.value: UIType.ATTACHMENT.value,
+    FieldType.LOOKUP.value: UIType.SINGLE_LINK.value,
+    FieldType.FORMULA.value: UIType.FORMULA.value,
+    FieldType.DUPLEX_LINK.value: UIType.DUPLEX_LINK.value,
+    FieldType.GROUP_CHAT.value: UIType.GROUP_CHAT.value,
+    FieldType.CREATED_USER.value: UIType.CREATED_USER.value,
+    FieldType.MODIFIED_USER.value: UIType.MODIFIED_USER.value,
+}
+
+
+def field_ui_type(field: Field) -> Union[str, None]:
+    return field.ui_type or _FIELD_TYPE_UI_TYPES.get(field.type)
+
+
+def _get(value: Any, key: str) -> Any:
+    """兼容 pydantic 模型和原始 JSON 的取值"""
+    if isinstance(value, dict):
+        return value.get(key)
+    return getattr(value, key, None)
+
+
+def _value_to_text(value: Any) -> Union[str, None]:
+    """将单个字段值转为文本，多值字段以 ", " 拼接"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, list):
+        texts = [text for text in (_value_to_text(item) for item in value) if text is not None]
+        return ", ".join(str(text) for text in texts) if texts else None
+    for key in ("text", "name", "full_address"):
+        text = _get(value, key)
+        if text is not None:
+            return text
+    for key in ("value", "link_record_ids", "record_ids"):
+        # 公式、查找引用的值和关联记录
+        inner = _get(value, key)
+        if inner is not None:
+            return _value_to_text(inner)
+    return None
+
+
+def _value_to_list(value: Any) -> Union[List[Any], None]:
+    """将多值字段转为列表"""
+    if value is None:
+        return None
+    inner = _get(value, "value")
+    if inner is None:
+        inner = _get(value, "link_record_ids")
+    if inner is None:
+        inner = _get(value, "record_ids")
+    if inner is not None:
+        value = inner
+    if not isinstance(value, list):
+        value = [value]
+    return [_value_to_text(item) for item in value]
+
+
+def _segments_to_text(value: Any) -> Union[str, None]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "".join(str(_get(item, "text") or "") for item in value)
+    return _value_to_text(value)
+
+
+def _column(
+    field: Union[Field, None],
+    values: List[Any],
+    *,
+    utcoffset: pd.Timedelta,
+    flatten: bool,
+) -> Union[pd.Series, List[Any], np.ndarray, pd.Categorical]:
+    ui_type = field_ui_type(field) if field is not None else None
+    if ui_type in NUMBER_UI_TYPES:
+        return pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce").astype("float64")
+    if ui_type in INTEGER_UI_TYPES:
+        return pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce").astype("Int64")
+    if ui_type in DATETIME_UI_TYPES:
+        timestamps = pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce")
+        return pd.to_datetime(timestamps, unit="ms") + utcoffset
+    if ui_type in CHECKBOX_UI_TYPES:
+        # 未勾选的复选框不会出现在返回结果中
+        return np.array([bool(value) for value in values], dtype=bool)
+    if ui_type in CATEGORY_UI_TYPES:
+        options = _get(field.property, "options") or []
+        categories = [_get(option, "name") for option in options]
+        texts = [_value_to_text(value) for value in values]
+        categories += sorted({text for text in texts if text is not None} - set(categories))
+        return pd.Categorical(texts, categories=categories)
+    if ui_type in TEXT_UI_TYPES:
+        return [_segments_to_text(value) for value in values]
+    if not flatten and (
+        ui_type in LIST_UI_TYPES
+        or (field is None and any(isinstance(value, list) for value in values))
+    ):
+        return [_value_to_list(value) for value in values]
+    return [_value_to_text(value) for value in values]
+
+
+def _field_names(schema: Dict[str, Field], rows: List[Dict[str, Any]]) -> List[str]:
+    """fields 中的字段在前，其余出现在记录中的字段按出现顺序排在后面"""
+    names = list(schema)
+    seen = set(names)
+    for row in rows:
+        for name in row:
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names
+
+
+def records_to_columns(
+    fields: List[Field],
+    records: List[Union[RecordResponseData, Dict[str, Any]]],
+    timezone: Union[str, None] = "Asia/Shanghai",
+    utcoffset: Union[pd.Timedelta, None] = None,
+    flatten: bool = True,
+) -> Dict[str, Any]:
+    """按字段类型将记录逐列转换，类型规则同 `fields_records_to_dataframe`
+
+    Returns:
+        Dict[str, Any]: 列名到列数据的映射，列数据为 ndarray、Categorical 或 list，不含 record id
+    """
+    if utcoffset is None:
+        utcoffset = timezone_offset(timezone)
+    rows = [_get(record, "fields") or {} for record in records]
+    schema = {field.field_name: field for field in fields}
+    columns = {}
+    for name in _field_names(schema, rows):
+        values = [row.get(name) for row in rows]
+        column = _column(schema.get(name), values, utcoffset=utcoffset, flatten=flatten)
+        columns[name] = column.values if isinstance(column, pd.Series) else column
+    return columns
+
+
 def fields_records_to_dataframe(
     fields: List[Field],
-    records: List[RecordResponseData],
+    records: List[Union[RecordResponseData, Dict[str, Any]]],
     timezone: Union[str, None] = "Asia/Shanghai",
+    utcoffset: Union[pd.Timedelta, None] = None,
+    flatten: bool = True,
 ) -> pd.DataFrame:
-    def field_value_to_text(field: FieldValueType) -> str:
-        if hasattr(field, "text"):
-            return field.text
-        if isinstance(field, list):
-            return ", ".join([field_value_to_text(f) for f in field])
-        if isinstance(field, Empty):
-            return None
-        return field
-
-    data = [{k: field_value_to_text(v) for k, v in record.fields.items()} for record in records]
-    index = [record.record_id for record in records]
-    df = pd.DataFrame(data, index=index)
-    for field in fields:
-        if field.ui_type in [
-            UIType.DATE_TIME.value,
-            UIType.CREATED_TIME.value,
-            UIType.MODIFIED_TIME.value,
-        ]:
-            df[field.field_name] = (
-                pd.to_datetime(df[field.field_name], unit="ms") + arrow.now(timezone).utcoffset()
-            )
+    """按字段类型将记录逐列转为 DataFrame，列按 fields 的顺序排列，记录中缺失的字段填充为空值。
+
+    - 数字、进度、货币为 float64，评分为 Int64
+    - 日期、创建时间、最后更新时间为 datetime64，按时区转换为本地时间
+    - 复选框为 bool，单选为 category（类别为字段的全部选项）
+    - 多行文本拼接为字符串
+    - 多选、人员、附件、关联等多值字段在 flatten=True 时以 ", " 拼接为字符串，否则为列表
+
+    同一组 fields 转换的 DataFrame 列和类型一致。
 
+    Args:
+        fields (List[Field]): 数据表字段
+        records (List[Union[RecordResponseData, Dict[str, Any]]]): 记录，也可以是未经校验的原始 JSON
+        timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+        utcoffset (Union[pd.Timedelta, None], optional): 预先计算的时区偏移量，\
+            指定时忽略 timezone. Defaults to None.
+        flatten (bool, optional): 是否将多值字段拼接为字符串. Defaults to True.
+
+    Returns:
+        pd.DataFrame: index 为记录的 record id
+    """
+    data = records_to_columns(
+        fields, records, timezone=timezone, utcoffset=utcoffset, flatten=flatten
+    )
+    index = [_get(record, "record_id") for record in records]
+    schema = {field.field_name for field in fields}
+    df = pd.DataFrame(data, index=index, columns=list(data))
+    for name in data:
+        # 不在 fields 中的列无法确定类型，统一为 object 以保证各分块类型一致
+        if name not in schema and df[name].dtype != object:
+            df[name] = df[name].astype(object)
     return df
 
 
+READONLY_UI_TYPES = {
+    UIType.FORMULA.value,
+    UIType.CREATED_TIME.value,
+    UIType.MODIFIED_TIME.value,
+    UIType.CREATED_USER.value,
+    UIType.MODIFIED_USER.value,
+    UIType.AUTO_NUMBER.value,
+    "Lookup",
+}
+"""自动计算的字段，写入时忽略"""
+
+
+def _to_list(value: Any) -> List[Any]:
+    """多值字段的输入：列表原样返回，字符串按 ", " 拆分（与读取时 flatten 的拼接相反）"""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    if isinstance(value, str):
+        return [item for item in value.split(", ") if item]
+    return [value]
+
+
+def _datetime_to_ms(series: pd.Series, timezone: Union[str, None]) -> List[Any]:
+    if series.dt.tz is None:
+        # 没有时区的时间视为 timezone 的本地时间
+        series = series.dt.tz_localize(timezone or "UTC")
+    ms = (series - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)
+    return [None if pd.isna(value) else int(value) for value in ms.tolist()]
+
+
+def _encode_column(
+    series: pd.Series,
+    field: Union[Field, None],
+    timezone: Union[str, None],
+) -> Union[List[Any], None]:
+    """按字段类型将一列转为写入接口需要的值，返回 None 表示忽略该列"""
+    ui_type = field_ui_type(field) if field is not None else None
+    if ui_type in READONLY_UI_TYPES:
+        return None
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return _datetime_to_ms(series, timezone)
+    if ui_type in DATETIME_UI_TYPES:
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            # 数值视为 ms 时间戳
+            return [None if pd.isna(value) else int(value) for value in series.tolist()]
+        return _datetime_to_ms(pd.to_datetime(series), timezone)
+    if ui_type in NUMBER_UI_TYPES or ui_type in INTEGER_UI_TYPES:
+        numbers = pd.to_numeric(series, errors="coerce").tolist()
+        cast = int if ui_type in INTEGER_UI_TYPES else float
+        return [None if pd.isna(value) else cast(value) for value in numbers]
+    if ui_type in CHECKBOX_UI_TYPES:
+        return [bool(value) for value in series.tolist()]
+    if ui_type in CATEGORY_UI_TYPES or ui_type in TEXT_UI_TYPES or ui_type == UIType.PHONE.value:
+        return [value if isinstance(value, str) else str(value) for value in series.tolist()]
+    if ui_type == UIType.MULTI_SELECT.value:
+        return [[str(item) for item in _to_list(value)] for value in series.tolist()]
+    if ui_type in (UIType.USER.value, UIType.GROUP_CHAT.value):
+        return [
+            [{"id": item} if isinstance(item, str) else item for item in _to_list(value)]
+            for value in series.tolist()
+        ]
+    if ui_type in (UIType.SINGLE_LINK.value, UIType.DUPLEX_LINK.value):
+        return [[str(item) for item in _to_list(value)] for value in series.tolist()]
+    if ui_type == UIType.ATTACHMENT.value:
+        return [
+            [{"file_token": item} if isinstance(item, str) else item for item in _to_list(value)]
+            for value in series.tolist()
+        ]
+    if ui_type == UIType.URL.value:
+        return [
+            {"text": value, "link": value} if isinstance(value, str) else value
+            for value in series.tolist()
+        ]
+    # 未知类型：tolist 已将 numpy 标量转为 Python 类型
+    return series.tolist()
+
+
+def _encode_frame(
+    df: pd.DataFrame,
+    schema: Dict[str, Field],
+    timezone: Union[str, None],
+    keep_nulls: bool,
+) -> List[Dict[str, Any]]:
+    """按字段类型逐列编码 df，keep_nulls 为 False 时不包含空值"""
+    records: List[Dict[str, Any]] = [{} for _ in range(len(df))]
+    for position, name in enumerate(df.columns):
+        series = df.iloc[:, position]
+        values = _encode_column(series, schema.get(str(name)), timezone)
+        if values is None:
+            continue
+        nulls = series.isna().to_numpy()
+        for record, value, null in zip(records, values, nulls):
+            if null or value is None:
+                if keep_nulls:
+                    record[str(name)] = None
+            else:
+                record[str(name)] = value
+    return records
+
+
+def iter_record_chunks(
+    df: pd.DataFrame,
+    fields: Union[List[Field], None] = None,
+    timezone: Union[str, None] = "Asia/Shanghai",
+    chunk_size: int = 500,
+    use_index_as_record_id: bool = False,
+) -> Iterator[List[Dict[str, Any]]]:
+    """按字段类型将 DataFrame 逐块编码为写入接口的记录，不修改 df，每次只转换一个分块。
+
+    - 空值（None、NaN、NaT）不写入
+    - 时间列转为 ms 时间戳，没有时区的时间视为 timezone 的本地时间
+    - 数字、评分转为 float / int，复选框转为 bool，单选、文本转为字符串
+    - 多选、关联字段转为字符串列表，字符串按 ", " 拆分
+    - 人员、群组的字符串转为 {"id": ...}，附件的字符串转为 {"file_token": ...}，超链接的字符串转为 {"text", "link"}
+    - 公式、创建时间等自动计算的字段被忽略
+
+    Args:
+        df (pd.DataFrame): 要写入的数据，列名为字段名
+        fields (Union[List[Field], None], optional): 数据表字段，为 None 时只转换时间列和 numpy 类型. \
+            Defaults to None.
+        timezone (Union[str, None], optional): 时区. Defaults to "Asia/Shanghai".
+        chunk_size (int, optional): 每块的记录数. Defaults to 500.
+        use_index_as_record_id (bool, optional): 是否以 index 为 record id，\
+            为 True 时记录为 {"record_id", "fields"}. Defaults to False.
+
+    Yields:
+        List[Dict[str, Any]]: 每块的记录
+    """
+    schema = {field.field_name: field for field in fields or []}
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start : start + chunk_size]
+        records = _encode_frame(chunk, schema, timezone, keep_nulls=False)
+        if use_index_as_record_id:
+            yield [
+                {"record_id": index, "fields": record}
+                for index, record in zip(chunk.index, records)
+            ]
+        else:
+            yield records
+
+
 def dataframe_to_records(
     df: pd.DataFrame,
     timezone: Union[str, None] = "Asia/Shanghai",
     use_index_as_record_id: bool = False,
+    fields: Union[List[Field], None] = None,
 ) -> List[Dict[str, FieldValueType]]:
-    for col in df.columns:
-        if df[col].dtype == "datetime64[ns]":
-            # 转为 unix timestamp，单位为 ms
-            df[col] = df[col].dt.tz_localize(timezone).astype(int) // 10**6
-    df_records = df.to_dict(orient="records")
-    if use_index_as_record_id:
-        return [
-            {"record_id": index, "fields": record} for index, record in zip(df.index, df_records)
-        ]
-    else:
-        return df_records
+    """将 DataFrame 转为写入接口的记录，不修改 df，参见 `iter_record_chunks`"""
+    return [
+        record
+        for chunk in iter_record_chunks(
+            df, fields, timezone=timezone, use_index_as_record_id=use_index_as_record_id
+        )
+        for record in chunk
+    ]
+
+
+def link_record_ids(value: Any) -> List[str]:
+    """关联字段的值中的记录 ID"""
+    if value is None:
+        return []
+    for key in ("link_record_ids", "record_ids"):
+        inner = _get(value, key)
+        if inner is not None:
+            return list(inner)
+    if isinstance(value, list):
+        return [record_id for item in value for record_id in link_record_ids(item)]
+    return [value] if isinstance(value, str) else []
+
+
+def write_value(field: Field, value: Any) -> Any:
+    """将查询接口返回的字段值转为写入接口的格式，与 `iter_record_chunks` 的编码结果一致，\
+        自动计算的字段和空值返回 None"""
+    ui_type = field_ui_type(field)
+    if value is None or ui_type in READONLY_UI_TYPES:
+        return None
+    if ui_type in TEXT_UI_TYPES:
+        return _segments_to_text(value)
+    if ui_type in (UIType.USER.value, UIType.GROUP_CHAT.value):
+        return [{"id": _get(item, "id")} for item in value if _get(item, "id") is not None]
+    if ui_type in (UIType.SINGLE_LINK.value, UIType.DUPLEX_LINK.value):
+        return link_record_ids(value) or None
+    if ui_type == UIType.ATTACHMENT.value:
+        return [{"file_token": _get(item, "file_token")} for item in value]
+    if ui_type == UIType.URL.value:
+        return {"text": _get(value, "text"), "link": _get(value, "link")}
+    if ui_type == UIType.LOCATION.value:
+        # 写入时为 "经度,纬度"
+        return _get(value, "location")
+    return value
+
+
+def comparable_value(field: Union[Field, None], value: Any) -> Any:
+    """将写入格式的值转为用于比较的值。
+
+    查询接口不返回空文本、空列表和未勾选的复选框，这些值与缺失的值统一为 None。
+    """
+    if value is None or value == "" or value == [] or value == {}:
+        return None
+    if value is False and field is not None and field_ui_type(field) in CHECKBOX_UI_TYPES:
+        return None
+    return value
+
+
+def normalize_value(value: Any) -> Any:
+    """将字段值转为可比较的 JSON 值：空值统一为 None，整数值的浮点数转为 int，时间转为 ms 时间戳"""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [normalize_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: normalize_value(item) for key, item in value.items()}
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        if value.tzinfo is None:
+            value = value.tz_localize("UTC")
+        return value.value // 10**6
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if np.isnan(value):
+            return None
+        return int(value) if value.is_integer() else value
+    return value
+
+
+def dataframe_to_json_records(
+    df: pd.DataFrame,
+    timezone: Union[str, None] = "Asia/Shanghai",
+    fields: Union[List[Field], None] = None,
+) -> List[Dict[str, Any]]:
+    """按字段类型将 DataFrame 编码为写入接口的记录（与 `iter_record_chunks` 相同），不修改 df，
+    取值经过 `normalize_value`，空值保留为 None，用于比较
+
+    Args:
+        df (pd.DataFrame): 要转换的数据，列名为字段名
+        timezone (Union[str, None], optional): 没有时区的时间所在的时区. Defaults to "Asia/Shanghai".
+        fields (Union[List[Field], None], optional): 数据表字段，为 None 时只转换时间列和 numpy 类型. \
+            Defaults to None.
+
+    Returns:
+        List[Dict[str, Any]]: 各行的记录
+    """
+    schema = {field.field_name: field for field in fields or []}
+    return [
+        {column: normalize_value(value) for column, value in record.items()}
+        for record in _encode_frame(df, schema, timezone, keep_nulls=True)
+    ]
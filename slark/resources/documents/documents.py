@@ -66,6 +66,11 @@ class AsyncDocuments(AsyncAPIResource):
         Returns:
             DocumentInfo: document_id
         """
+        return await self._client.metadata_cache.document_info.get_or_load(
+            url, lambda: self._resolve_document_info(url)
+        )
+
+    async def _resolve_document_info(self, url: str) -> DocumentInfo:
         if "/docx/" in url:
             document_id = re.findall(r"\/docx\/([^\/\?]+)", url)[0]
         elif "/wiki/" in url:
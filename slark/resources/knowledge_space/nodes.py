@@ -15,11 +15,14 @@ class Nodes(AsyncAPIResource):
         obj_type: NodeTypes = "wiki",
         timeout: Union[httpx.Timeout, None] = None,
     ) -> GetNodeResponse:
-        return await self._get(
-            API_PATH.knowledge_space.nodes.get_node,
-            cast_to=GetNodeResponse,
-            options={
-                "timeout": timeout,
-                "params": GetNodeQuery(token=token, obj_type=obj_type).model_dump(),
-            },
+        return await self._client.metadata_cache.wiki_nodes.get_or_load(
+            (token, obj_type),
+            lambda: self._get(
+                API_PATH.knowledge_space.nodes.get_node,
+                cast_to=GetNodeResponse,
+                options={
+                    "timeout": timeout,
+                    "params": GetNodeQuery(token=token, obj_type=obj_type).model_dump(),
+                },
+            ),
         )
@@ -38,6 +38,19 @@ class AsyncSpreadsheets(AsyncAPIResource):
         return AsyncData(client=self._client)
 
     async def get_sheet_info(self, url: str) -> SheetInfo:
+        """从电子表格分享链接中提取 spreadsheet_token, sheet_id 及工作表范围
+
+        Args:
+            url (str): URL of the spreadsheet
+
+        Returns:
+            SheetInfo: spreadsheet_token, sheet_id, sheet_range
+        """
+        return await self._client.metadata_cache.sheet_info.get_or_load(
+            url, lambda: self._resolve_sheet_info(url)
+        )
+
+    async def _resolve_sheet_info(self, url: str) -> SheetInfo:
         if "/sheets/" in url:
             spreadsheet_token, sheet_id = re.findall(
                 r"\/sheets\/([^\/\?]+)(?:\?sheet=([^\/]+))?", url
@@ -218,13 +231,17 @@ class AsyncSpreadsheets(AsyncAPIResource):
         )
 
         logger.debug(f"Writing data to {url} with mode {mode}, range {write_range}")
-        return await self._write_batch(
-            info.spreadsheet_token,
-            write_range,
-            values,
-            mode=mode,
-            insertDataOption=insertDataOption,
-        )
+        try:
+            return await self._write_batch(
+                info.spreadsheet_token,
+                write_range,
+                values,
+                mode=mode,
+                insertDataOption=insertDataOption,
+            )
+        finally:
+            # 写入可能改变工作表的行列数
+            self._client.metadata_cache.sheet_info.invalidate(url)
 
     async def write(
         self,
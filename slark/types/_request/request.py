@@ -3,7 +3,7 @@ from typing import Dict, Iterable, TypedDict, Union
 import httpx
 from typing_extensions import Literal
 
-from slark._constants import DEFAULT_MAX_RETRIES
+from slark.client._retry import RetryPolicy
 from slark.types._common import BaseModel
 
 
@@ -17,6 +17,9 @@ class RequestOptions(TypedDict):
     files: Dict
     data: Dict
     content: Union[bytes, str, Iterable[bytes], Iterable[str]]
+    retry_policy: RetryPolicy
+    coalesce: bool
+    stream: bool
 
 
 class FinalRequestOptions(BaseModel):
@@ -24,7 +27,7 @@ class FinalRequestOptions(BaseModel):
     url: str
     headers: dict = {}
     params: dict = {}
-    max_retries: Union[int, None] = DEFAULT_MAX_RETRIES
+    max_retries: Union[int, None] = None
     timeout: Union[httpx.Timeout, None] = None
     json_data: Union[Dict, None] = None
     files: Union[Dict, None] = None
@@ -32,6 +35,12 @@ class FinalRequestOptions(BaseModel):
     content: Union[bytes, str, Iterable[bytes], Iterable[str], None] = None
     no_auth: bool = False
     raw_response: bool = False
+    retry_policy: Union[RetryPolicy, None] = None
+    """本次调用使用的 RetryPolicy，为 None 时使用客户端的重试策略"""
+    coalesce: Union[bool, None] = None
+    """是否合并相同的并发请求，为 None 时仅合并 GET 请求（需客户端开启 coalesce_requests）"""
+    stream: bool = False
+    """是否流式读取响应体，为 True 时返回未读取响应体的 httpx.Response，调用方负责 aclose"""
 
     def get_max_retries(self, max_retries: int) -> int:
         return self.max_retries if self.max_retries is not None else max_retries
@@ -0,0 +1,26 @@
+from typing import List, Union
+
+from typing_extensions import Literal
+
+from slark.types._common import BaseModel
+
+
+class AttachmentDownload(BaseModel):
+    """附件的下载结果，同一 file_token 的附件只下载一次"""
+
+    file_token: str
+    """附件 token"""
+    name: Union[str, None] = None
+    """附件名称"""
+    type: Union[str, None] = None
+    """附件的 mime 类型"""
+    size: Union[int, None] = None
+    """附件大小，单位为字节"""
+    path: str
+    """保存路径"""
+    status: Literal["downloaded", "skipped", "failed"] = "failed"
+    """downloaded：已下载，skipped：文件已存在，failed：下载失败"""
+    error: Union[str, None] = None
+    """下载失败的原因"""
+    record_ids: List[str] = []
+    """引用该附件的记录"""
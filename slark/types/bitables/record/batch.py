@@ -0,0 +1,70 @@
+from typing import Dict, List, Union
+
+from slark.types._common import BaseModel
+
+
+class BatchChunkResult(BaseModel):
+    index: int
+    """分块序号，从 0 开始"""
+    offset: int
+    """分块第一行在输入数据中的位置"""
+    size: int
+    """分块的行数"""
+    success: bool
+    """是否写入成功"""
+    code: Union[int, None] = None
+    """失败时的错误码"""
+    msg: Union[str, None] = None
+    """失败时的错误信息"""
+
+
+class BatchReport(BaseModel):
+    """分块批量操作的执行结果"""
+
+    chunks: List[BatchChunkResult]
+    """按输入顺序排列的各分块结果"""
+
+    @property
+    def succeeded(self) -> List[BatchChunkResult]:
+        return [chunk for chunk in self.chunks if chunk.success]
+
+    @property
+    def failed(self) -> List[BatchChunkResult]:
+        return [chunk for chunk in self.chunks if not chunk.success]
+
+    @property
+    def failed_rows(self) -> List[int]:
+        """失败分块包含的行在输入数据中的位置"""
+        return [
+            row for chunk in self.failed for row in range(chunk.offset, chunk.offset + chunk.size)
+        ]
+
+
+class UpsertResult(BaseModel):
+    """按主键同步数据的结果"""
+
+    created: int = 0
+    """新增的记录数"""
+    updated: int = 0
+    """有变化而更新的记录数"""
+    unchanged: int = 0
+    """没有变化而跳过的记录数"""
+    orphaned: int = 0
+    """数据表中主键不在输入数据里的记录数，包括主键重复的记录"""
+    deleted: int = 0
+    """删除的记录数，delete_orphans=True 时等于 orphaned"""
+
+
+class CopyResult(BaseModel):
+    """复制数据表的结果"""
+
+    copied: int = 0
+    """写入目标表的记录数"""
+    skipped: int = 0
+    """transform 返回 None 而跳过的记录数"""
+    linked: int = 0
+    """回填了关联字段的记录数"""
+    created_fields: List[str] = []
+    """在目标表中创建的字段"""
+    record_ids: Dict[str, str] = {}
+    """源表 record_id 到目标表 record_id 的映射"""
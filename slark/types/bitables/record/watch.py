@@ -0,0 +1,39 @@
+from typing import List
+
+from slark.types._common import BaseModel
+
+from .response import RecordResponseData
+
+
+class WatchCheckpoint(BaseModel):
+    """增量读取的位置，可以用 `model_dump_json` 持久化，`model_validate_json` 恢复"""
+
+    timestamp: int = 0
+    """已读取记录的最大 last_modified_time，单位为 ms，0 表示从头开始"""
+    record_ids: List[str] = []
+    """last_modified_time 等于 timestamp 的已读取记录，用于在边界上去重"""
+
+    def is_seen(self, record: RecordResponseData) -> bool:
+        """记录是否已在该位置之前读取过"""
+        modified = record.last_modified_time or 0
+        if modified != self.timestamp:
+            return modified < self.timestamp
+        return record.record_id in self.record_ids
+
+    def advance(self, records: List[RecordResponseData]) -> "WatchCheckpoint":
+        """返回读取了 records 之后的位置"""
+        timestamp, record_ids = self.timestamp, list(self.record_ids)
+        for record in records:
+            modified = record.last_modified_time or 0
+            if modified > timestamp:
+                timestamp, record_ids = modified, [record.record_id]
+            elif modified == timestamp and record.record_id not in record_ids:
+                record_ids.append(record.record_id)
+        return WatchCheckpoint(timestamp=timestamp, record_ids=record_ids)
+
+
+class WatchBatch(BaseModel):
+    records: List[RecordResponseData]
+    """自上一个位置以来新增或修改的记录，按 last_modified_time 升序排列"""
+    checkpoint: WatchCheckpoint
+    """读取了 records 之后的位置"""
@@ -1,7 +1,10 @@
-from typing import Dict, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Union
 
 from slark.types.exceptions._base import LarkException
 
+if TYPE_CHECKING:
+    from slark.types.bitables.record.batch import BatchReport
+
 
 class LarkStatusCode:
     SUCCESS = 0
@@ -14,6 +17,21 @@ class LarkStatusCode:
     BAD_RESPONSE = 10002
     APITimeout = 10003
     APIConnectionError = 10004
+    BATCH_PARTIAL_FAILURE = 10005
+    PAYLOAD_TOO_LARGE = 413
+    """HTTP 413，请求体超过网关限制"""
+    TOO_MANY_REQUESTS = 99991400
+    TENANT_ACCESS_TOKEN_INVALID = 99991663
+    USER_ACCESS_TOKEN_INVALID = 99991668
+    ACCESS_TOKEN_EXPIRED = 99991677
+    BITABLE_TOO_MANY_RECORDS = 1254104
+    BITABLE_CELL_TOO_LARGE = 1254130
+    BITABLE_TOO_MANY_REQUESTS = 1254290
+    BITABLE_WRITE_CONFLICT = 1254291
+    BITABLE_DATA_NOT_READY = 1254607
+    BITABLE_INTERNAL_ERROR = 1255001
+    BITABLE_RPC_ERROR = 1255002
+    BITABLE_TIMEOUT = 1255040
 
 
 class AuthenticationRequiredException(LarkException):
@@ -39,3 +57,28 @@ class APITimeoutError(LarkException):
 class APIConnectionError(LarkException):
     def __init__(self, msg: str = "API Connection Error", context: Union[Dict, None] = None):
         super().__init__(LarkStatusCode.APIConnectionError, msg, context)
+
+
+class BatchOperationError(LarkException):
+    """分块批量操作中部分分块失败。
+
+    Attributes:
+        report (BatchReport): 各分块的执行结果
+        results (List[Any]): 按分块顺序排列的返回结果，失败的分块为 None
+    """
+
+    def __init__(
+        self,
+        report: "BatchReport",
+        results: List[Any],
+        msg: Union[str, None] = None,
+        context: Union[Dict, None] = None,
+    ):
+        failed = report.failed
+        super().__init__(
+            LarkStatusCode.BATCH_PARTIAL_FAILURE,
+            msg or f"{len(failed)} of {len(report.chunks)} chunks failed",
+            context,
+        )
+        self.report = report
+        self.results = results
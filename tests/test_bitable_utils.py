@@ -0,0 +1,946 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+from loguru import logger
+
+from slark import AsyncLark
+from slark.resources.bitable.batch import PAYLOAD_OVERHEAD, pack, payload_size, run_in_chunks
+from slark.resources.bitable.query import F
+from slark.resources.bitable.utils import (
+    dataframe_to_json_records,
+    fields_records_to_dataframe,
+    iter_record_chunks,
+)
+from slark.types.bitables.field.common import Field
+from slark.types.bitables.record.response import RecordResponseData
+from slark.types.exceptions.errors import BatchOperationError, LarkException
+
+URL = "https://example.feishu.cn/base/app?table=tbl"
+
+
+def make_lark(handler) -> AsyncLark:
+    """构造不访问网络的客户端，handler(request, body) 返回响应的 data 字段"""
+
+    async def respond(options, request, call_next):
+        if request.url.path.endswith("tenant_access_token/internal"):
+            return httpx.Response(
+                200, json={"code": 0, "msg": "ok", "tenant_access_token": "t", "expire": 7200}
+            )
+        body = json.loads(request.content) if request.content else None
+        data = await handler(request, body)
+        return httpx.Response(200, json={"code": 0, "msg": "ok", "data": data})
+
+    return AsyncLark(app_id="app", app_secret="secret", middlewares=[respond])
+
+
+FIELDS = [
+    {"field_id": "fld1", "field_name": "text", "type": 1, "ui_type": "Text"},
+    {"field_id": "fld2", "field_name": "number", "type": 2, "ui_type": "Number"},
+    {"field_id": "fld3", "field_name": "date", "type": 5, "ui_type": "DateTime"},
+]
+
+
+def search_page(start: int, stop: int, total: int) -> dict:
+    return {
+        "items": [
+            {
+                "record_id": f"rec{i}",
+                # 空值字段不会出现在返回结果中
+                "fields": {"text": f"row {i}", "date": 1700000000000 + i}
+                if i % 2
+                else {"text": f"row {i}", "number": i},
+            }
+            for i in range(start, stop)
+        ],
+        "has_more": stop < total,
+        "page_token": str(stop) if stop < total else None,
+        "total": total,
+    }
+
+
+async def test_run_in_chunks():
+    running = 0
+    peak = 0
+
+    async def handle(chunk):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # 先提交的分块后完成，结果仍按输入顺序返回
+        await anyio.sleep(0.01 * (10 - chunk[0] // 3))
+        running -= 1
+        if chunk[0] == 6:
+            raise LarkException(code=1254104, msg="RequestTooLarge")
+        return sum(chunk)
+
+    results = await run_in_chunks(list(range(6)), handle, chunk_size=3, concurrency=2)
+    assert results == [3, 12]
+
+    with pytest.raises(BatchOperationError) as e:
+        await run_in_chunks(list(range(10)), handle, chunk_size=3, concurrency=2)
+    assert peak == 2
+    assert e.value.results == [3, 12, None, 9]
+    assert [chunk.code for chunk in e.value.report.failed] == [1254104]
+    assert e.value.report.failed_rows == [6, 7, 8]
+
+
+def test_pack():
+    items = ["a" * 10, "b" * 10, "c" * 50, "d" * 10, "e" * 10, "f" * 10]
+    chunks = list(pack(items, max_items=2, max_bytes=30, size=len))
+    # 超过 max_bytes 的单条数据单独成块
+    assert chunks == [items[:2], [items[2]], items[3:5], [items[5]]]
+    assert list(pack(items, max_items=4)) == [items[:4], items[4:]]
+
+
+async def test_payload_size_matches_request_body():
+    bodies = []
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        bodies.append(request.content)
+        return {"records": [{"record_id": "rec", **record} for record in body["records"]]}
+
+    lark = make_lark(handler)
+    await lark.bitables.append(URL, data=pd.DataFrame({"text": ["多维表格"]}))
+    record = {"fields": {"text": "多维表格"}}
+    encoded = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # 请求体中的中文不转义，估计值为 UTF-8 字节数
+    assert encoded in bodies[0]
+    assert payload_size(record) == len(encoded) + PAYLOAD_OVERHEAD
+
+
+async def test_iter_pages_prefetch():
+    events = []
+
+    async def handler(request, body):
+        start = int(request.url.params.get("page_token") or 0)
+        events.append(f"fetch {start}")
+        return search_page(start, min(start + 2, 5), 5)
+
+    lark = make_lark(handler)
+    async for page in lark.bitables.iter_pages(URL, page_size=2):
+        events.append(f"page {page.items[0].record_id}")
+        await anyio.sleep(0.01)
+        events.append(f"done {page.items[0].record_id}")
+    # 处理当前页时已经请求了下一页，但最多只预取一页
+    assert events.index("fetch 2") < events.index("done rec0")
+    assert events.index("fetch 4") < events.index("done rec2")
+    assert events.index("fetch 4") > events.index("done rec0")
+    assert [event for event in events if event.startswith("page")] == [
+        "page rec0",
+        "page rec2",
+        "page rec4",
+    ]
+
+    records = [record.record_id async for record in lark.bitables.iter_records(URL, rows=3)]
+    assert records == ["rec0", "rec1", "rec2"]
+
+
+@pytest.mark.parametrize("backend", ["asyncio", "trio"])
+def test_read_with_prefetch_backends(backend):
+    fetched = []
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        start = int(request.url.params.get("page_token") or 0)
+        fetched.append(start)
+        return search_page(start, min(start + 2, 5), 5)
+
+    async def main():
+        lark = make_lark(handler)
+        df = await lark.bitables.read(URL)
+        assert list(df.index) == [f"rec{i}" for i in range(5)]
+        # 提前结束迭代时取消预取请求
+        records = [record.record_id async for record in lark.bitables.iter_records(URL, rows=1)]
+        assert records == ["rec0"]
+        await lark.aclose()
+
+    # 在独立线程中运行，不影响其他测试所用的事件循环
+    with ThreadPoolExecutor(1) as pool:
+        pool.submit(anyio.run, main, backend=backend).result()
+    assert fetched[:3] == [0, 2, 4]
+
+
+@pytest.mark.parametrize("backend", ["asyncio", "trio"])
+def test_iter_pages_early_break(backend):
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        start = int(request.url.params.get("page_token") or 0)
+        await anyio.sleep(0.01)
+        return search_page(start, min(start + 2, 5), 5)
+
+    async def main():
+        lark = make_lark(handler)
+        # 不调用 aclose 直接跳出循环，生成器由事件循环在其他任务中回收
+        async for page in lark.bitables.iter_pages(URL, page_size=2):
+            break
+        async for record in lark.bitables.iter_records(URL):
+            break
+        # 之后同一任务中的 await 不会被取消
+        await anyio.sleep(0.05)
+        df = await lark.bitables.read(URL)
+        assert len(df) == 5
+        await lark.aclose()
+
+    with ThreadPoolExecutor(1) as pool:
+        pool.submit(anyio.run, main, backend=backend).result()
+
+
+async def test_read_chunks():
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        start = int(request.url.params.get("page_token") or 0)
+        return search_page(start, min(start + 2, 5), 5)
+
+    lark = make_lark(handler)
+    chunks = [df async for df in await lark.bitables.read(URL, chunksize=2)]
+    assert [len(df) for df in chunks] == [2, 2, 1]
+    for df in chunks:
+        assert list(df.columns) == ["text", "number", "date"]
+        assert str(df["number"].dtype) == "float64"
+        assert str(df["date"].dtype) == "datetime64[ns]"
+    assert chunks[2].index.tolist() == ["rec4"]
+
+
+def test_fields_records_to_dataframe():
+    fields = [
+        Field.model_validate(field)
+        for field in [
+            {"field_id": "f1", "field_name": "text", "type": 1, "ui_type": "Text"},
+            {"field_id": "f2", "field_name": "rating", "type": 2, "ui_type": "Rating"},
+            {"field_id": "f3", "field_name": "done", "type": 7, "ui_type": "Checkbox"},
+            {
+                "field_id": "f4",
+                "field_name": "status",
+                "type": 3,
+                "ui_type": "SingleSelect",
+                "property": {"options": [{"name": "todo"}, {"name": "done"}]},
+            },
+            {"field_id": "f5", "field_name": "tags", "type": 4, "ui_type": "MultiSelect"},
+            {"field_id": "f6", "field_name": "owner", "type": 11, "ui_type": "User"},
+        ]
+    ]
+    raw = [
+        {
+            "record_id": "rec1",
+            "fields": {
+                "text": [{"text": "hello ", "type": "text"}, {"text": "@Tom", "type": "mention"}],
+                "rating": 3,
+                "done": True,
+                "status": "done",
+                "tags": ["a", "b"],
+                "owner": [{"id": "ou_1", "name": "Tom"}],
+            },
+        },
+        {"record_id": "rec2", "fields": {"text": "plain"}},
+    ]
+    records = [RecordResponseData.model_validate(record) for record in raw]
+    for data in (records, raw):
+        df = fields_records_to_dataframe(fields, data)
+        assert df["text"].tolist() == ["hello @Tom", "plain"]
+        assert str(df["rating"].dtype) == "Int64"
+        assert df["done"].tolist() == [True, False]
+        assert list(df["status"].cat.categories) == ["todo", "done"]
+        assert df["tags"].tolist() == ["a, b", None]
+        assert df["owner"].tolist() == ["Tom", None]
+
+    df = fields_records_to_dataframe(fields, raw, flatten=False)
+    assert df["tags"].tolist() == [["a", "b"], None]
+    assert df["owner"].tolist() == [["Tom"], None]
+
+
+async def test_read_without_validation():
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        start = int(request.url.params.get("page_token") or 0)
+        return search_page(start, min(start + 2, 5), 5)
+
+    lark = make_lark(handler)
+    raw = await lark.bitables.read(URL, return_raw=True, validate=False)
+    assert raw["items"][0] == {"record_id": "rec0", "fields": {"text": "row 0", "number": 0}}
+    df = await lark.bitables.read(URL, validate=False)
+    assert df.equals(await lark.bitables.read(URL))
+
+    # 默认返回列表，与是否安装 pyarrow 无关
+    columns = await lark.bitables.read_columns(URL, rows=3)
+    assert isinstance(columns, dict)
+    assert columns["record_id"] == ["rec0", "rec1", "rec2"]
+    assert columns["text"] == ["row 0", "row 1", "row 2"]
+    assert columns["number"][0] == 0 and columns["number"][2] == 2
+
+    pa = pytest.importorskip("pyarrow")
+    table = await lark.bitables.read_columns(URL, arrow=True)
+    assert isinstance(table, pa.Table)
+    assert table.column_names == ["record_id", "text", "number", "date"]
+    assert table.num_rows == 5
+    assert table.schema.field("number").type == pa.float64()
+    assert pa.types.is_timestamp(table.schema.field("date").type)
+
+
+async def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    created = []
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        if request.url.path.endswith("/batch_create"):
+            created.extend(record["fields"] for record in body["records"])
+            return {"records": [{"record_id": "new", **record} for record in body["records"]]}
+        start = int(request.url.params.get("page_token") or 0)
+        return search_page(start, min(start + 2, 5), 5)
+
+    lark = make_lark(handler)
+    path = tmp_path / "table.parquet"
+    assert await lark.bitables.export_parquet(URL, path, row_group_size=4) == 5
+    file = pq.ParquetFile(path)
+    assert file.metadata.num_row_groups == 2
+    assert file.schema_arrow.names == ["record_id", "text", "number", "date"]
+
+    assert await lark.bitables.import_parquet(path, URL, concurrency=2) == 5
+    raw = search_page(0, 5, 5)["items"]
+    assert created == [item["fields"] for item in raw]
+
+
+async def test_export_parquet_failure(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        start = int(request.url.params.get("page_token") or 0)
+        if start >= 4:
+            raise RuntimeError("connection lost")
+        return search_page(start, min(start + 2, 5), 5)
+
+    lark = make_lark(handler)
+    lark.max_retries = 0
+    path = tmp_path / "table.parquet"
+    with pytest.raises(LarkException):
+        await lark.bitables.export_parquet(URL, path, row_group_size=2)
+    # 中断时不留下不完整的文件
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_upsert():
+    writes = {}
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        if request.url.path.endswith("/search"):
+            start = int(request.url.params.get("page_token") or 0)
+            return search_page(start, min(start + 2, 5), 5)
+        action = request.url.path.rsplit("/", 1)[-1]
+        writes.setdefault(action, []).extend(body.get("records") or body.get("record_ids"))
+        if action == "batch_delete":
+            return {"records": [{"record_id": id_, "deleted": True} for id_ in body["records"]]}
+        return {"records": [{"record_id": "rec", **record} for record in body["records"]]}
+
+    lark = make_lark(handler)
+    local = pd.Timedelta(hours=8)
+    data = pd.DataFrame(
+        {
+            "text": ["row 0", "row 1", "row 2", "row 9"],
+            "number": [0, None, 5, 9],
+            "date": [pd.NaT, pd.Timestamp(1700000000001, unit="ms") + local, pd.NaT, pd.NaT],
+        }
+    )
+    result = await lark.bitables.upsert(URL, data=data, key="text", delete_orphans=True)
+    assert (result.created, result.updated, result.unchanged) == (1, 1, 2)
+    assert (result.orphaned, result.deleted) == (2, 2)
+    assert writes["batch_create"] == [{"fields": {"text": "row 9", "number": 9}}]
+    # 空值不写入
+    assert writes["batch_update"] == [
+        {"record_id": "rec2", "fields": {"text": "row 2", "number": 5}}
+    ]
+    assert writes["batch_delete"] == ["rec3", "rec4"]
+    # 输入数据不会被修改
+    assert str(data["date"].dtype) == "datetime64[ns]"
+
+
+async def test_upsert_encodes_with_schema():
+    fields = [
+        {"field_id": "fld1", "field_name": "text", "type": 1, "ui_type": "Text"},
+        {"field_id": "fld2", "field_name": "owner", "type": 11, "ui_type": "User"},
+        {"field_id": "fld3", "field_name": "tags", "type": 4, "ui_type": "MultiSelect"},
+        {"field_id": "fld4", "field_name": "date", "type": 5, "ui_type": "DateTime"},
+    ]
+    existing = {
+        "owner": [{"id": "ou_1", "name": "A", "email": "a@example.com"}],
+        "tags": ["x", "y"],
+        "date": 1700000000000,
+    }
+    writes = {}
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": fields, "has_more": False, "total": len(fields)}
+        if request.url.path.endswith("/search"):
+            items = [
+                {
+                    "record_id": "rec0",
+                    "fields": {"text": [{"type": "text", "text": "same"}], **existing},
+                },
+                {"record_id": "rec1", "fields": {"text": "changed", **existing}},
+            ]
+            return {"items": items, "has_more": False, "total": 2}
+        action = request.url.path.rsplit("/", 1)[-1]
+        writes.setdefault(action, []).extend(body["records"])
+        return {"records": [{"record_id": "rec", **record} for record in body["records"]]}
+
+    lark = make_lark(handler)
+    date = pd.Timestamp(1700000000000, unit="ms", tz="UTC")
+    data = pd.DataFrame(
+        {
+            "text": ["same", "changed", "new"],
+            "owner": ["ou_1", "ou_2", "ou_1"],
+            "tags": [["x", "y"], ["x", "y"], ["z"]],
+            "date": [date, date, pd.NaT],
+        }
+    )
+    result = await lark.bitables.upsert(URL, data=data, key="text")
+    assert (result.created, result.updated, result.unchanged) == (1, 1, 1)
+    assert writes["batch_update"] == [
+        {
+            "record_id": "rec1",
+            "fields": {
+                "text": "changed",
+                "owner": [{"id": "ou_2"}],
+                "tags": ["x", "y"],
+                "date": 1700000000000,
+            },
+        }
+    ]
+    assert writes["batch_create"] == [
+        {"fields": {"text": "new", "owner": [{"id": "ou_1"}], "tags": ["z"]}}
+    ]
+
+
+async def test_upsert_empty_values_unchanged():
+    fields = [
+        {"field_id": "fld1", "field_name": "text", "type": 1, "ui_type": "Text"},
+        {"field_id": "fld2", "field_name": "done", "type": 7, "ui_type": "Checkbox"},
+        {"field_id": "fld3", "field_name": "note", "type": 1, "ui_type": "Text"},
+        {"field_id": "fld4", "field_name": "tags", "type": 4, "ui_type": "MultiSelect"},
+    ]
+    writes = []
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": fields, "has_more": False, "total": len(fields)}
+        if request.url.path.endswith("/search"):
+            # 未勾选的复选框、空文本和空列表不会出现在返回结果中
+            items = [
+                {"record_id": "rec0", "fields": {"text": "a"}},
+                {"record_id": "rec1", "fields": {"text": "b", "done": True}},
+            ]
+            return {"items": items, "has_more": False, "total": 2}
+        writes.extend(body["records"])
+        return {"records": body["records"]}
+
+    lark = make_lark(handler)
+    data = pd.DataFrame(
+        {"text": ["a", "b"], "done": [False, False], "note": ["", ""], "tags": [[], []]}
+    )
+    result = await lark.bitables.upsert(URL, data=data, key="text")
+    assert (result.updated, result.unchanged) == (1, 1)
+    # 取消勾选仍然写入
+    assert [record["record_id"] for record in writes] == ["rec1"]
+    assert writes[0]["fields"]["done"] is False
+
+
+async def test_append_with_journal(tmp_path):
+    tokens = []
+    failing = {"row 500"}
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        first = body["records"][0]["fields"]["text"]
+        tokens.append((first, request.url.params["client_token"]))
+        if first in failing:
+            raise RuntimeError("connection lost")
+        return {"records": [{"record_id": "rec", **record} for record in body["records"]]}
+
+    lark = make_lark(handler)
+    lark.max_retries = 0
+    data = pd.DataFrame({"text": [f"row {i}" for i in range(1200)]})
+    journal = tmp_path / "load.journal"
+    with pytest.raises(BatchOperationError) as e:
+        await lark.bitables.append(URL, data=data, journal=journal)
+    assert e.value.report.failed_rows == list(range(500, 1000))
+    assert len({token for _, token in tokens}) == 3
+
+    # 恢复时只重新提交失败的分块，client_token 不变
+    first_attempt = dict(tokens)
+    tokens.clear()
+    failing.clear()
+    records = await lark.bitables.append(URL, data=data, journal=journal)
+    assert len(records) == 500
+    assert tokens == [("row 500", first_attempt["row 500"])]
+
+    tokens.clear()
+    assert await lark.bitables.append(URL, data=data, journal=journal) == []
+    assert tokens == []
+    with pytest.raises(ValueError):
+        await lark.bitables.append(URL, data=data.iloc[::-1], journal=journal)
+
+
+async def test_append_splits_oversized_chunks(tmp_path):
+    limit = {"bytes": 4000}
+    sent = []
+
+    async def respond(options, request, call_next):
+        if request.url.path.endswith("tenant_access_token/internal"):
+            return httpx.Response(
+                200, json={"code": 0, "msg": "ok", "tenant_access_token": "t", "expire": 7200}
+            )
+        if request.url.path.endswith("/fields"):
+            data = {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+            return httpx.Response(200, json={"code": 0, "msg": "ok", "data": data})
+        if len(request.content) > limit["bytes"]:
+            return httpx.Response(413, text="<html>Request Entity Too Large</html>")
+        records = json.loads(request.content)["records"]
+        sent.append([record["fields"]["text"][:6] for record in records])
+        data = {"records": [{"record_id": "rec", **record} for record in records]}
+        return httpx.Response(200, json={"code": 0, "msg": "ok", "data": data})
+
+    lark = AsyncLark(app_id="app", app_secret="secret", middlewares=[respond])
+    lark.max_retries = 0
+    texts = [f"row {i}" for i in range(20)]
+    texts[7] = "x" * 5000
+    data = pd.DataFrame({"text": texts})
+    journal = tmp_path / "load.journal"
+    with pytest.raises(BatchOperationError) as e:
+        await lark.bitables.append(URL, data=data, journal=journal)
+    # 只有过大的一行写入失败
+    assert e.value.report.failed_rows == [7]
+    assert e.value.report.failed[0].code == 413
+    assert sorted(text for chunk in sent for text in chunk) == sorted(
+        text for i, text in enumerate(texts) if i != 7
+    )
+
+    # 恢复时直接按拆分后的部分写入，已写入的部分不会重复
+    sent.clear()
+    limit["bytes"] = 10000
+    await lark.bitables.append(URL, data=data, journal=journal)
+    assert sent == [["xxxxxx"]]
+
+    # 按请求体大小分块时过大的一行单独成块
+    sent.clear()
+    lark.bitables.record.MAX_BYTES_PER_REQUEST = 1000
+    await lark.bitables.append(URL, data=data)
+    assert [len(chunk) for chunk in sent] == [7, 1, 12]
+
+
+async def test_copy_table():
+    src_fields = [
+        {"field_id": "f1", "field_name": "name", "type": 1, "ui_type": "Text", "is_primary": True},
+        {"field_id": "f2", "field_name": "owner", "type": 11, "ui_type": "User"},
+        {
+            "field_id": "f3",
+            "field_name": "parent",
+            "type": 18,
+            "ui_type": "SingleLink",
+            "property": {"table_id": "tblsrc", "multiple": True},
+        },
+        {"field_id": "f4", "field_name": "created", "type": 1001, "ui_type": "CreatedTime"},
+        {
+            "field_id": "f5",
+            "field_name": "total",
+            "type": 20,
+            "ui_type": "Formula",
+            "property": {"formula_expression": "1"},
+        },
+    ]
+    tables = {
+        "tblsrc": {"fields": src_fields, "records": []},
+        "tbldst": {
+            "fields": [
+                {
+                    "field_id": "d1",
+                    "field_name": "多行文本",
+                    "type": 1,
+                    "ui_type": "Text",
+                    "is_primary": True,
+                }
+            ],
+            "records": [],
+        },
+    }
+    for i in range(1200):
+        fields = {"name": [{"type": "text", "text": f"task {i}"}], "created": 1700000000000}
+        if i % 3 == 0:
+            fields["owner"] = [{"id": "ou_old", "name": "someone"}]
+        if i:
+            # 关联到后面的记录，需要在全部记录写入后回填
+            fields["parent"] = {"link_record_ids": [f"src{(i + 600) % 1200}"]}
+        tables["tblsrc"]["records"].append({"record_id": f"src{i}", "fields": fields})
+    updates = []
+
+    async def handler(request, body):
+        parts = request.url.path.split("/")
+        table = tables[parts[parts.index("tables") + 1]]
+        action = parts[-1]
+        if action == "fields" and request.method == "GET":
+            return {"items": table["fields"], "has_more": False, "total": len(table["fields"])}
+        if action == "fields":
+            field = {"field_id": f"d{len(table['fields']) + 1}", **body}
+            table["fields"].append(field)
+            return {"field": field}
+        if parts[-2] == "fields":
+            field = next(field for field in table["fields"] if field["field_id"] == action)
+            field.update(body)
+            return {"field": field}
+        if action == "search":
+            start = int(request.url.params.get("page_token") or 0)
+            stop = min(start + int(request.url.params["page_size"]), len(table["records"]))
+            return {
+                "items": table["records"][start:stop],
+                "has_more": stop < len(table["records"]),
+                "page_token": str(stop),
+                "total": len(table["records"]),
+            }
+        if action == "batch_create":
+            created = []
+            for record in body["records"]:
+                record = {"record_id": f"dst{len(table['records'])}", **record}
+                table["records"].append(record)
+                created.append(record)
+            return {"records": created}
+        updates.extend(body["records"])
+        return {"records": body["records"]}
+
+    lark = make_lark(handler)
+    result = await lark.bitables.copy_table(
+        "https://example.feishu.cn/base/app?table=tblsrc",
+        "https://example.feishu.cn/base/app?table=tbldst",
+        transform=lambda record: None if record["name"] == "task 5" else record,
+        user_map={"ou_old": "ou_new"},
+    )
+    assert (result.copied, result.skipped, result.linked) == (1199, 1, 1198)
+    assert result.created_fields == ["name", "owner", "parent", "created"]
+    dst = tables["tbldst"]
+    assert [field["field_name"] for field in dst["fields"]] == result.created_fields
+    assert dst["fields"][2]["property"]["table_id"] == "tbldst"
+    assert dst["records"][0]["fields"] == {"name": "task 0", "owner": [{"id": "ou_new"}]}
+    assert result.record_ids["src6"] == "dst5"
+    # src605 关联到被跳过的 src5
+    parents = {update["record_id"]: update["fields"]["parent"] for update in updates}
+    assert parents[result.record_ids["src1"]] == [result.record_ids["src601"]]
+    assert parents[result.record_ids["src605"]] == []
+
+
+async def test_watch():
+    table = {f"rec{i}": 1000 * (i // 2) for i in range(5)}
+    bodies = []
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            fields = FIELDS + [
+                {
+                    "field_id": "fld4",
+                    "field_name": "modified",
+                    "type": 1002,
+                    "ui_type": "ModifiedTime",
+                }
+            ]
+            return {"items": fields, "has_more": False, "total": len(fields)}
+        bodies.append(body)
+        # 服务端按天筛选，这里返回全部记录，由 checkpoint 去重
+        items = [
+            {"record_id": id_, "fields": {}, "last_modified_time": modified}
+            for id_, modified in sorted(table.items(), key=lambda item: item[1])
+        ]
+        return {"items": items, "has_more": False, "total": len(items)}
+
+    lark = make_lark(handler)
+    batches = [batch async for batch in lark.bitables.watch(URL)]
+    assert [record.record_id for record in batches[0].records] == list(table)
+    checkpoint = batches[-1].checkpoint
+    assert (checkpoint.timestamp, checkpoint.record_ids) == (2000, ["rec4"])
+    assert bodies[0]["automatic_fields"] is True
+    assert bodies[0]["sort"] == [{"field_name": "modified"}]
+
+    table["rec5"] = 2000
+    table["rec1"] = 3000
+    restored = type(checkpoint).model_validate_json(checkpoint.model_dump_json())
+    batches = [batch async for batch in lark.bitables.watch(URL, since=restored)]
+    assert [record.record_id for record in batches[0].records] == ["rec5", "rec1"]
+    assert batches[-1].checkpoint.timestamp == 3000
+    condition = bodies[-1]["filter"]["conditions"][0]
+    assert condition["field_name"] == "modified"
+    assert condition["value"] == ["ExactDate", str(2000 - 86400000)]
+
+
+async def test_watch_without_modified_field():
+    bodies = []
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        bodies.append(body)
+        items = [
+            {"record_id": f"rec{i}", "fields": {}, "last_modified_time": 1000 * (2 - i)}
+            for i in range(3)
+        ]
+        return {"items": items, "has_more": False, "total": len(items)}
+
+    lark = make_lark(handler)
+    warnings = []
+    sink = logger.add(warnings.append, level="WARNING")
+    try:
+        batches = lark.bitables.watch(URL, poll_interval=60)
+        batch = await batches.__anext__()
+        await batches.aclose()
+    finally:
+        logger.remove(sink)
+    # 在本地按 last_modified_time 排序，每次轮询读取全表
+    assert [record.record_id for record in batch.records] == ["rec2", "rec1", "rec0"]
+    assert "sort" not in bodies[0] and "filter" not in bodies[0]
+    assert len(warnings) == 1 and "whole table" in warnings[0]
+
+
+async def test_mirror(tmp_path):
+    table = {f"rec{i}": (1000 * i, {"text": f"row {i}", "number": i % 3}) for i in range(5)}
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        items = [
+            {"record_id": id_, "fields": fields, "last_modified_time": modified}
+            for id_, (modified, fields) in sorted(table.items(), key=lambda item: item[1][0])
+        ]
+        return {"items": items, "has_more": False, "total": len(items)}
+
+    lark = make_lark(handler)
+    with lark.bitables.mirror(URL, tmp_path / "mirror.db") as mirror:
+        assert await mirror.refresh() == 5
+        counts = mirror.query('SELECT "number", count(*) AS n FROM rows GROUP BY "number"')
+        assert counts["n"].tolist() == [2, 2, 1]
+
+        table["rec0"] = (9000, {"text": "changed", "number": 7})
+        assert await mirror.refresh() == 1
+        assert mirror.checkpoint.timestamp == 9000
+        df = mirror.read('"number" > ?', (1,))
+        assert df.index.tolist() == ["rec2", "rec0"]
+        assert df.loc["rec0", "text"] == "changed"
+        assert str(df["number"].dtype) == "float64"
+
+    with pytest.raises(ValueError):
+        lark.bitables.mirror(URL + "2", tmp_path / "mirror.db")
+
+
+async def test_query():
+    bodies = []
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": FIELDS, "has_more": False, "total": len(FIELDS)}
+        bodies.append(body)
+        page = search_page(0, 5, 5)
+        # 模拟服务端执行 number > 0
+        page["items"] = [item for item in page["items"] if item["fields"].get("number")]
+        return page
+
+    fields = [Field.model_validate(field) for field in FIELDS]
+    lark = make_lark(handler)
+    query = (
+        lark.bitables.query(URL)
+        .where(F("number") > 0, F("text").isin(["row 4"]))
+        .order_by("number", desc=True)
+        .select("text")
+    )
+    compiled = query.compile(fields)
+    assert compiled.filter.model_dump() == {
+        "conjunction": "and",
+        "conditions": [{"field_name": "number", "operator": "isGreater", "value": ["0"]}],
+    }
+    assert compiled.field_names == ["text"]
+    assert len(compiled.local) == 1
+
+    df = await query.read()
+    assert df.index.tolist() == ["rec4"]
+    assert list(df.columns) == ["text"]
+    assert bodies[0]["sort"] == [{"field_name": "number", "desc": True}]
+    assert bodies[0]["field_names"] == ["text"]
+
+    compiled = lark.bitables.query(URL).where((F("number") == 1) | F("text").is_empty())
+    compiled = compiled.compile(fields)
+    assert compiled.filter.conjunction == "or" and not compiled.local
+    with pytest.raises(ValueError):
+        lark.bitables.query(URL).where(F("missing") == 1).compile(fields)
+
+
+async def test_download_attachments(tmp_path):
+    downloaded = []
+    fields = FIELDS + [
+        {"field_id": "fld5", "field_name": "files", "type": 17, "ui_type": "Attachment"}
+    ]
+
+    def attachment(token):
+        return {"file_token": token, "name": f"{token}.txt", "size": 5, "type": "text/plain"}
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": fields, "has_more": False, "total": len(fields)}
+        items = [
+            {"record_id": "rec0", "fields": {"files": [attachment("a"), attachment("b")]}},
+            {"record_id": "rec1", "fields": {"files": [attachment("b"), attachment("c")]}},
+            # 没有返回大小的附件
+            {"record_id": "rec2", "fields": {"files": [{"file_token": "d", "name": "d.txt"}]}},
+            {"record_id": "rec3", "fields": {}},
+        ]
+        return {"items": items, "has_more": False, "total": len(items)}
+
+    lark = make_lark(handler)
+
+    async def download(options, request, call_next):
+        if "/medias/" not in request.url.path:
+            return await call_next(request)
+        token = request.url.path.split("/")[-2]
+        downloaded.append(token)
+        if token == "c":
+            return httpx.Response(400, json={"code": 1061045, "msg": "no permission"})
+        return httpx.Response(200, content=b"hello")
+
+    lark.middlewares.insert(0, download)
+    (tmp_path / "a_a.txt").write_bytes(b"hello")
+    # 大小未知且不在之前的 manifest 中的文件可能不完整，需要重新下载
+    (tmp_path / "d_d.txt").write_bytes(b"hel")
+    results = await lark.bitables.download_attachments(URL, dest=tmp_path, concurrency=2)
+    assert sorted(downloaded) == ["b", "c", "d"]
+    assert [(item.file_token, item.status) for item in results] == [
+        ("a", "skipped"),
+        ("b", "downloaded"),
+        ("c", "failed"),
+        ("d", "downloaded"),
+    ]
+    assert results[1].record_ids == ["rec0", "rec1"]
+    assert (tmp_path / "b_b.txt").read_bytes() == b"hello"
+    assert (tmp_path / "d_d.txt").read_bytes() == b"hello"
+    assert not (tmp_path / "c_c.txt").exists()
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert [item["status"] for item in manifest] == [
+        "skipped",
+        "downloaded",
+        "failed",
+        "downloaded",
+    ]
+
+    # 再次下载时按 manifest 跳过已完成的文件
+    downloaded.clear()
+    results = await lark.bitables.download_attachments(URL, dest=tmp_path, concurrency=2)
+    assert downloaded == ["c"]
+    assert [item.status for item in results] == ["skipped", "skipped", "failed", "skipped"]
+
+
+async def test_download_attachments_scan_error(tmp_path):
+    downloaded = []
+    fields = FIELDS + [
+        {"field_id": "fld5", "field_name": "files", "type": 17, "ui_type": "Attachment"}
+    ]
+
+    async def handler(request, body):
+        if request.url.path.endswith("/fields"):
+            return {"items": fields, "has_more": False, "total": len(fields)}
+        # 附件没有返回大小
+        items = [{"record_id": "rec0", "fields": {"files": [{"file_token": "a", "name": "a"}]}}]
+        return {"items": items, "has_more": True, "page_token": "1", "total": 2}
+
+    lark = make_lark(handler)
+    lark.max_retries = 0
+
+    async def respond(options, request, call_next):
+        if "/medias/" in request.url.path:
+            downloaded.append(request.url.path.split("/")[-2])
+            return httpx.Response(200, content=b"hello")
+        if request.url.params.get("page_token") == "1":
+            return httpx.Response(400, json={"code": 1254000, "msg": "WrongRequestBody"})
+        return await call_next(request)
+
+    lark.middlewares.insert(0, respond)
+    # 读取记录失败时抛出原始异常，已完成的下载仍写入 manifest
+    with pytest.raises(LarkException) as e:
+        await lark.bitables.download_attachments(URL, dest=tmp_path)
+    assert e.value.code == 1254000
+    assert downloaded == ["a"]
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert [(item["file_token"], item["status"]) for item in manifest] == [("a", "downloaded")]
+
+    with pytest.raises(LarkException):
+        await lark.bitables.download_attachments(URL, dest=tmp_path)
+    assert downloaded == ["a"]
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert [(item["file_token"], item["status"]) for item in manifest] == [("a", "skipped")]
+
+
+def test_iter_record_chunks():
+    fields = [
+        Field.model_validate(field)
+        for field in [
+            {"field_id": "f1", "field_name": "score", "type": 2, "ui_type": "Number"},
+            {"field_id": "f2", "field_name": "date", "type": 5, "ui_type": "DateTime"},
+            {"field_id": "f3", "field_name": "tags", "type": 4, "ui_type": "MultiSelect"},
+            {"field_id": "f4", "field_name": "owner", "type": 11, "ui_type": "User"},
+            {"field_id": "f5", "field_name": "created", "type": 1001, "ui_type": "CreatedTime"},
+        ]
+    ]
+    df = pd.DataFrame(
+        {
+            "score": np.array([1, np.nan, 3], dtype="float64"),
+            "date": pd.to_datetime(["2024-01-01 08:00", None, "2024-01-02 08:00"]),
+            "tags": ["a, b", None, ["c"]],
+            "owner": ["ou_1", None, None],
+            "created": [1, 2, 3],
+        }
+    )
+    snapshot = df.copy()
+    chunks = list(iter_record_chunks(df, fields, chunk_size=2))
+    pd.testing.assert_frame_equal(df, snapshot)
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0] == [
+        {"score": 1.0, "date": 1704067200000, "tags": ["a", "b"], "owner": [{"id": "ou_1"}]},
+        {},
+    ]
+    assert chunks[1] == [{"score": 3.0, "date": 1704153600000, "tags": ["c"]}]
+    assert isinstance(chunks[0][0]["score"], float)
+
+    records = list(iter_record_chunks(df[["score"]], use_index_as_record_id=True))[0]
+    assert records[0] == {"record_id": 0, "fields": {"score": 1.0}}
+
+
+def test_dataframe_to_json_records():
+    naive = pd.Series([pd.Timestamp("2023-11-15 06:13:20"), pd.NaT])
+    df = pd.DataFrame(
+        {
+            "ns": naive,
+            "us": naive.astype("datetime64[us]"),
+            "ms": naive.astype("datetime64[ms]"),
+            "aware": naive.dt.tz_localize("Asia/Shanghai").dt.tz_convert("UTC"),
+            "number": [1.0, np.nan],
+        }
+    )
+    fields = [Field(field_id="fld", field_name="number", type=2, ui_type="Number")]
+    records = dataframe_to_json_records(df, fields=fields)
+    # 各种精度和时区的时间列都转为相同的 ms 时间戳
+    assert records[0] == {
+        "ns": 1700000000000,
+        "us": 1700000000000,
+        "ms": 1700000000000,
+        "aware": 1700000000000,
+        "number": 1,
+    }
+    assert records[1] == dict.fromkeys(df.columns)
+    assert str(df["ns"].dtype) == "datetime64[ns]"
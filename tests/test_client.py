@@ -0,0 +1,397 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import httpx
+import pytest
+
+from slark import AsyncLark, Middleware
+from slark.client import _client
+from slark.client._cache import MetadataCache, TTLCache
+from slark.client._client import AsyncAPIClient
+from slark.client._coalesce import RequestCoalescer
+from slark.client._decode import loads
+from slark.client._ratelimit import RateLimiter, TokenBucket
+from slark.client._retry import RetryPolicy, RetryState
+from slark.resources.api_path import API_PATH, resolve_api_path
+from slark.resources.auth import FileTokenStore, TokenManager
+from slark.resources.bitable.bitable import BitableInfo
+from slark.types._request.request import FinalRequestOptions
+from slark.types.auth import TenantAccessToken
+from slark.types.exceptions.errors import HttpStatusError, LarkException
+
+
+def test_resolve_api_path():
+    assert (
+        resolve_api_path("/bitable/v1/apps/app/tables/tbl/records/search")
+        == API_PATH.bitables.search_record
+    )
+    assert (
+        resolve_api_path("/bitable/v1/apps/app/tables/tbl/records/rec")
+        == API_PATH.bitables.get_record
+    )
+    assert resolve_api_path("/im/v1/messages?receive_id_type=chat_id") == API_PATH.message.send
+    assert resolve_api_path("/not/a/lark/api") is None
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    first = bucket.reserve()
+    second = bucket.reserve()
+    assert 0 < first < second
+
+
+async def test_rate_limiter_acquire():
+    limiter = RateLimiter(endpoint_rates={API_PATH.documents.get_raw_content: 20})
+    url = API_PATH.documents.get_raw_content.format(document_id="doc")
+    # 首次 sleep 会加载 anyio 后端，提前加载以免多睡的时间补充令牌
+    await anyio.sleep(0)
+    start = time.monotonic()
+    for _ in range(25):
+        await limiter.acquire(url)
+    assert time.monotonic() - start >= 0.2
+    stats = limiter.stats()["docx/v1/documents/{document_id}/raw_content"]
+    assert stats.acquired == 25
+    assert stats.throttled == 5
+
+
+async def test_default_rate_limits(client: AsyncLark):
+    assert client.rate_limiter._bucket_for("/docx/v1/documents/doc/raw_content") is not None
+
+
+def test_retry_policy_classification():
+    policy = RetryPolicy()
+    throttled = httpx.Response(400, json={"code": 99991400, "msg": "frequency limit"})
+    assert policy.is_retryable(throttled, 99991400)
+    assert not policy.is_retryable(httpx.Response(400), 1254000)
+    assert policy.is_retryable(httpx.Response(503))
+
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(initial_delay=0.5, max_delay=8, total_budget=10)
+    state = RetryState()
+    delays = [policy.next_delay(state) for _ in range(5)]
+    assert all(0.5 <= delay <= 8 for delay in delays)
+    assert state.attempts == 5
+
+    reset = httpx.Response(400, headers={"x-ogw-ratelimit-reset": "3"})
+    assert 3 <= policy.next_delay(RetryState(), reset) <= 3.5
+    assert (
+        policy.next_delay(RetryState(), httpx.Response(429, headers={"Retry-After": "20"})) is None
+    )
+
+
+async def test_response_decoded_once(monkeypatch):
+    decoded = []
+
+    def counting_loads(content):
+        decoded.append(content)
+        return loads(content)
+
+    monkeypatch.setattr(_client, "loads", counting_loads)
+    responses = {
+        "ok": httpx.Response(200, json={"code": 0, "msg": "ok", "data": {"text": "多维表格"}}),
+        "error": httpx.Response(400, json={"code": 1254000, "msg": "WrongRequestBody"}),
+        "gateway": httpx.Response(413, text="Request Entity Too Large"),
+    }
+
+    async def respond(options, request, call_next):
+        return responses[options.url]
+
+    client = AsyncAPIClient(
+        base_url="https://open.feishu.cn/open-apis/", max_retries=0, middlewares=[respond]
+    )
+    assert (await client.get("ok", cast_to=dict))["data"] == {"text": "多维表格"}
+    assert len(decoded) == 1
+
+    decoded.clear()
+    with pytest.raises(LarkException) as e:
+        await client.get("error", cast_to=dict)
+    assert e.value.code == 1254000
+    assert len(decoded) == 1
+
+    decoded.clear()
+    with pytest.raises(HttpStatusError):
+        await client.get("gateway", cast_to=dict)
+    assert len(decoded) == 1
+
+
+async def test_token_manager_single_flight():
+    fetched = []
+
+    async def fetch():
+        await anyio.sleep(0.01)
+        fetched.append(1)
+        return TenantAccessToken(
+            access_token=f"t{len(fetched)}", expires_at=int(time.time()) + 7200
+        )
+
+    manager = TokenManager(fetch)
+    tokens = await asyncio.gather(*[manager.get() for _ in range(20)])
+    assert len(fetched) == 1
+    assert {token.access_token for token in tokens} == {"t1"}
+
+    manager.invalidate("stale")
+    assert manager.token is not None
+    manager.invalidate("t1")
+    assert (await manager.get()).access_token == "t2"
+
+
+async def test_file_token_store(tmp_path):
+    fetched = []
+
+    async def fetch():
+        fetched.append(1)
+        return TenantAccessToken(access_token="shared", expires_at=int(time.time()) + 7200)
+
+    managers = [TokenManager(fetch, store=FileTokenStore(tmp_path), key="app") for _ in range(4)]
+    tokens = await asyncio.gather(*[manager.get() for manager in managers])
+    assert len(fetched) == 1
+    assert {token.access_token for token in tokens} == {"shared"}
+
+
+async def test_file_token_store_lock_cancelled(tmp_path):
+    holder, waiter = FileTokenStore(tmp_path), FileTokenStore(tmp_path)
+    async with holder.lock("app"):
+        # 等待文件锁时被取消，不会在之后占用锁
+        with anyio.move_on_after(0.1) as scope:
+            async with waiter.lock("app"):
+                pass
+        assert scope.cancelled_caught
+    with anyio.fail_after(1):
+        async with waiter.lock("app"):
+            pass
+        async with holder.lock("app"):
+            pass
+
+
+def _auth_lark(respond, expire: int = 7200, **kwargs) -> AsyncLark:
+    """token 接口依次返回 t1、t2……，其余请求交给 respond(request) 处理"""
+    issued = []
+
+    async def transport(options, request, call_next):
+        if request.url.path.endswith("tenant_access_token/internal"):
+            issued.append(f"t{len(issued) + 1}")
+            return httpx.Response(
+                200,
+                json={"code": 0, "msg": "ok", "tenant_access_token": issued[-1], "expire": expire},
+            )
+        return respond(request)
+
+    lark = AsyncLark(app_id="app", app_secret="secret", middlewares=[transport], **kwargs)
+    lark.issued = issued
+    return lark
+
+
+async def test_reauthenticate_invalid_token():
+    auths = []
+
+    def respond(request):
+        auths.append(request.headers["Authorization"])
+        if request.headers["Authorization"] == "Bearer t1":
+            return httpx.Response(400, json={"code": 99991663, "msg": "Invalid access token"})
+        return httpx.Response(200, json={"code": 0, "msg": "ok"})
+
+    lark = _auth_lark(respond, max_retries=0)
+    assert await lark.get("ping", cast_to=dict) == {"code": 0, "msg": "ok"}
+    assert auths == ["Bearer t1", "Bearer t2"]
+    assert lark.issued == ["t1", "t2"]
+
+
+async def test_reauthenticate_only_once():
+    auths = []
+
+    def respond(request):
+        auths.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"code": 99991663, "msg": "Invalid access token"})
+
+    lark = _auth_lark(respond, max_retries=0)
+    # 换新 token 后仍然无效时抛出异常，不会反复刷新
+    with pytest.raises(LarkException) as e:
+        await lark.get("ping", cast_to=dict)
+    assert e.value.code == 99991663
+    assert auths == ["Bearer t1", "Bearer t2"]
+    assert lark.issued == ["t1", "t2"]
+
+
+async def test_background_token_refresh():
+    auths = []
+
+    def respond(request):
+        auths.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"code": 0, "msg": "ok"})
+
+    # token 有效期短于提前刷新的时间，获取后即进入刷新窗口
+    lark = _auth_lark(respond, expire=600, token_refresh_ahead=3600)
+    await lark.get("ping", cast_to=dict)
+    # 过期前在后台刷新，当前请求继续使用旧 token
+    await lark.get("ping", cast_to=dict)
+    with anyio.fail_after(1):
+        while lark._token_manager.token.access_token != "t2":
+            await anyio.sleep(0.01)
+    await lark.get("ping", cast_to=dict)
+    assert auths == ["Bearer t1", "Bearer t1", "Bearer t2"]
+    assert lark.issued == ["t1", "t2"]
+
+
+async def test_request_coalescer():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await anyio.sleep(0.01)
+        return {"code": 0}
+
+    options = FinalRequestOptions(method="post", url="records/search", json_data={"a": 1, "b": 2})
+    same = FinalRequestOptions(method="post", url="records/search", json_data={"b": 2, "a": 1})
+    key = coalescer.make_key(options, dict)
+    assert key == coalescer.make_key(same, dict)
+    assert coalescer.make_key(options.model_copy(update={"raw_response": True}), dict) is None
+
+    results = await asyncio.gather(*[coalescer.run(key, fetch) for _ in range(10)])
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert coalescer.stats().followers == 9
+
+    await coalescer.run(key, fetch)
+    assert len(calls) == 2
+
+
+async def test_ttl_cache():
+    cache = TTLCache(ttl=0.05, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    await anyio.sleep(0.06)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations) == (2, 2, 1, 1)
+
+    disabled = TTLCache(ttl=0)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+
+
+def test_metadata_cache_invalidate():
+    cache = MetadataCache(ttl=60)
+    url = "https://example.feishu.cn/wiki/wikcn?table=tbl"
+    cache.bitable_info.set(url, BitableInfo(app_token="app", table_id="tbl"))
+    cache.wiki_nodes.set(("wikcn", "wiki"), object())
+    cache.fields.set(("app", "tbl"), [])
+    cache.invalidate(url)
+    assert all(stats.size == 0 for stats in cache.stats().values())
+
+
+async def test_middleware_chain():
+    calls = []
+
+    class Record(Middleware):
+        def __init__(self, name):
+            self.name = name
+
+        async def __call__(self, options, request, call_next):
+            calls.append(self.name)
+            response = await call_next(request)
+            calls.append(f"/{self.name}")
+            return response
+
+    async def short_circuit(options, request, call_next):
+        assert options.url == "ping"
+        return httpx.Response(200, json={"code": 0, "msg": "cached"})
+
+    client = AsyncAPIClient(
+        base_url="https://open.feishu.cn/open-apis/",
+        middlewares=[Record("outer"), Record("inner")],
+    )
+    client.add_middleware(short_circuit)
+    assert await client.get("ping", cast_to=dict) == {"code": 0, "msg": "cached"}
+    assert calls == ["outer", "inner", "/inner", "/outer"]
+
+
+def _ping_client(seen: list) -> AsyncAPIClient:
+    """记录每次请求使用的 httpx.AsyncClient"""
+
+    async def respond(options, request, call_next):
+        seen.append(client._clients.peek())
+        return httpx.Response(200, json={"code": 0, "msg": "ok"})
+
+    client = AsyncAPIClient(base_url="https://open.feishu.cn/open-apis/", middlewares=[respond])
+    return client
+
+
+def test_client_per_event_loop():
+    seen = []
+    client = _ping_client(seen)
+
+    async def main():
+        await client.get("ping", cast_to=dict)
+        await client.get("ping", cast_to=dict)
+
+    # 在其他线程中运行事件循环，避免影响测试所在线程的事件循环
+    with ThreadPoolExecutor(1) as pool:
+        pool.submit(asyncio.run, main()).result()
+        pool.submit(asyncio.run, main()).result()
+    assert all(isinstance(http_client, httpx.AsyncClient) for http_client in seen)
+    # 同一个事件循环复用连接池，不同的事件循环各自创建
+    assert seen[0] is seen[1]
+    assert seen[2] is seen[3]
+    assert seen[0] is not seen[2]
+
+
+async def test_aclose_all_loops():
+    seen = []
+    client = _ping_client(seen)
+    # 空闲的事件循环和在其他线程中运行的事件循环
+    idle, running = asyncio.new_event_loop(), asyncio.new_event_loop()
+    thread = threading.Thread(target=running.run_forever)
+    thread.start()
+    try:
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(idle.run_until_complete, client.get("ping", cast_to=dict)).result()
+        asyncio.run_coroutine_threadsafe(client.get("ping", cast_to=dict), running).result()
+        await client.get("ping", cast_to=dict)
+        assert len(set(map(id, seen))) == 3
+
+        await client.aclose()
+        assert all(http_client.is_closed for http_client in seen)
+        assert list(client._clients.values()) == []
+
+        # 关闭后再次请求时创建新的连接池
+        await client.get("ping", cast_to=dict)
+        assert seen[-1] not in seen[:3] and not seen[-1].is_closed
+        await client.aclose()
+    finally:
+        running.call_soon_threadsafe(running.stop)
+        thread.join()
+        running.close()
+        idle.close()
+
+
+async def test_metrics():
+    async def respond(options, request, call_next):
+        return httpx.Response(200, json={"code": 1254043, "msg": "RecordIdNotFound"})
+
+    client = AsyncAPIClient(
+        base_url="https://open.feishu.cn/open-apis/", max_retries=0, middlewares=[respond]
+    )
+    url = API_PATH.bitables.search_record.format(app_token="app", table_id="tbl")
+    with pytest.raises(LarkException) as e:
+        await client.post(url, body={"page_size": 10}, cast_to=dict)
+    assert e.value.code == 1254043
+    stats = client.metrics.stats()[API_PATH.bitables.search_record]
+    assert stats.requests == 1
+    assert stats.request_bytes > 0 and stats.response_bytes > 0
+    assert stats.errors == {"1254043": 1}
+    text = client.metrics.render_prometheus()
+    assert (
+        'slark_errors_total{path="%s",code="1254043"} 1' % API_PATH.bitables.search_record in text
+    )
+    assert 'phase="network",le="+Inf"} 1' in text